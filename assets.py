@@ -0,0 +1,228 @@
+"""Build resized, content-hashed image derivatives and the minified theme stylesheet.
+
+Derivatives are written to `static/build/` and listed in `static/build/manifest.json`.
+Each entry is keyed by the source file's mtime/size and the target height, so a
+derivative is only rebuilt when its source image, `styles/theme.css` or
+`HEADER_MAX_HEIGHT` changes.
+
+Streamlit serves `static/` at `app/static/` when `server.enableStaticServing` is on
+(see `.streamlit/config.toml`). URLs carry a `?v=<hash>` query so Tornado sends
+long-lived cache headers and browsers keep the images across sessions.
+
+Static serving only sends image types with their real MIME type (anything else is
+`text/plain` + `nosniff`, which browsers refuse as a stylesheet), so the build
+directory is also registered as a component path and stylesheets are linked from
+`component/...`, where Streamlit sends `text/css`. The content hash is in the
+file name, so the URL changes whenever the theme does.
+
+Run `python assets.py` to build ahead of time; the app also builds on first use.
+"""
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import threading
+import time
+
+# PIL is only needed when a derivative is (re)built, so it is imported then
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+import metrics
+from profiler import timed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(BASE_DIR, "static", "build")
+MANIFEST_PATH = os.path.join(BUILD_DIR, "manifest.json")
+STATIC_URL_PREFIX = "app/static/build"
+
+
+def header_max_height() -> int:
+	return int(os.environ.get("HEADER_MAX_HEIGHT", 260))
+
+
+def asset_specs() -> dict:
+	"""Return {name: (source candidates, format, target height, shrink_only)}.
+
+	A target height of None keeps the source size and only re-encodes.
+	"""
+	return {
+		"header": (["images/header.jpg"], "JPEG", header_max_height(), True),
+		# prefer logo.png in images/, fall back to existing logo files
+		"logo": (["images/logo.png", "images/logo.jpg"], "PNG", 84, False),
+		"spade": (["images/Royal flush of spade.png"], "PNG", None, False),
+		"theme": (["styles/theme.css"], "CSS", None, False),
+	}
+
+
+# strings are kept verbatim, comments are dropped
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+
+
+def minify_css(text: str) -> str:
+	"""Strip comments and insignificant whitespace from a stylesheet."""
+	strings = []
+
+	def stash(m):
+		if m.group(1) is None:
+			return " "
+		strings.append(m.group(1))
+		return f"\x00{len(strings) - 1}\x00"
+
+	text = _CSS_TOKENS.sub(stash, text)
+	text = re.sub(r"\s+", " ", text)
+	text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+	text = re.sub(r":\s+", ":", text)
+	text = text.replace(";}", "}").strip()
+	return re.sub("\x00(\\d+)\x00", lambda m: strings[int(m.group(1))], text)
+
+
+_lock = threading.Lock()
+_manifest = None
+_manifest_key = None
+
+
+def _source_key(source: str, height: int | None) -> dict:
+	st = os.stat(os.path.join(BASE_DIR, source))
+	return {"source": source, "mtime": st.st_mtime, "size": st.st_size, "height": height}
+
+
+def _resolve_source(candidates: list[str]) -> str | None:
+	return next((p for p in candidates if os.path.exists(os.path.join(BASE_DIR, p))), None)
+
+
+@timed("image resize/encode")
+def _encode(path: str, fmt: str, height: int | None, shrink_only: bool) -> bytes:
+	"""Resize (if asked) and re-encode an image; without PIL the source bytes are used.
+
+	Stylesheets are minified.
+	"""
+	if fmt == "CSS":
+		with open(path, encoding="utf-8") as f:
+			return minify_css(f.read()).encode("utf-8")
+	if not PIL_AVAILABLE:
+		with open(path, "rb") as f:
+			return f.read()
+	from PIL import Image
+	img = original = Image.open(path)
+	w, h = img.size
+	if height and (h > height or (h != height and not shrink_only)):
+		img = img.resize((int(w * (height / h)), height), Image.LANCZOS)
+	buf = io.BytesIO()
+	if fmt == "JPEG":
+		if img.mode not in ("RGB", "L"):
+			img = img.convert("RGB")
+		img.save(buf, format="JPEG", quality=85, optimize=True, progressive=True)
+	else:
+		img.save(buf, format="PNG", optimize=True)
+	data = buf.getvalue()
+	if img is original and img.format == fmt and os.path.getsize(path) <= len(data):
+		# nothing was resized and re-encoding didn't help: ship the source bytes
+		with open(path, "rb") as f:
+			return f.read()
+	return data
+
+
+def _read_manifest() -> dict:
+	try:
+		with open(MANIFEST_PATH) as f:
+			return json.load(f)
+	except Exception:
+		return {}
+
+
+def build_assets(force: bool = False) -> dict:
+	"""Build any missing or out-of-date derivatives and return the manifest."""
+	os.makedirs(BUILD_DIR, exist_ok=True)
+	manifest = _read_manifest()
+	changed = False
+	for name, (candidates, fmt, height, shrink_only) in asset_specs().items():
+		source = _resolve_source(candidates)
+		if source is None:
+			if manifest.pop(name, None) is not None:
+				changed = True
+			continue
+		key = _source_key(source, height)
+		entry = manifest.get(name)
+		if (
+			not force and entry
+			and all(entry.get(k) == v for k, v in key.items())
+			and os.path.exists(os.path.join(BUILD_DIR, entry["file"]))
+		):
+			continue
+		started = time.perf_counter()
+		data = _encode(os.path.join(BASE_DIR, source), fmt, height, shrink_only)
+		metrics.observe("asset_encode_seconds", time.perf_counter() - started, asset=name)
+		if fmt == "CSS":
+			ext = ".css"
+		elif PIL_AVAILABLE:
+			ext = ".jpg" if fmt == "JPEG" else ".png"
+		else:
+			ext = os.path.splitext(source)[1].lower()
+		digest = hashlib.sha256(data).hexdigest()[:12]
+		filename = f"{name}.{digest}{ext}"
+		tmp = os.path.join(BUILD_DIR, filename + ".tmp")
+		with open(tmp, "wb") as f:
+			f.write(data)
+		os.replace(tmp, os.path.join(BUILD_DIR, filename))
+		# remove the derivative this entry replaces
+		if entry and entry.get("file") != filename:
+			try:
+				os.remove(os.path.join(BUILD_DIR, entry["file"]))
+			except OSError:
+				pass
+		manifest[name] = dict(key, file=filename, hash=digest, bytes=len(data))
+		changed = True
+	if changed:
+		tmp = MANIFEST_PATH + ".tmp"
+		with open(tmp, "w") as f:
+			json.dump(manifest, f, indent=2, sort_keys=True)
+		os.replace(tmp, MANIFEST_PATH)
+	return manifest
+
+
+def get_manifest() -> dict:
+	"""Return the current manifest, rebuilding only when a source mtime or target height changed."""
+	global _manifest, _manifest_key
+	key = []
+	for name, (candidates, _fmt, height, _shrink) in asset_specs().items():
+		source = _resolve_source(candidates)
+		key.append((name, source, height, os.path.getmtime(os.path.join(BASE_DIR, source)) if source else None))
+	key = tuple(key)
+	with _lock:
+		if _manifest is None or key != _manifest_key:
+			_manifest = build_assets()
+			_manifest_key = key
+		return _manifest
+
+
+def asset_url(name: str) -> str | None:
+	"""Return the cacheable static URL of a built asset, or None if it has no source."""
+	entry = get_manifest().get(name)
+	if not entry:
+		return None
+	return f"{STATIC_URL_PREFIX}/{entry['file']}?v={entry['hash']}"
+
+
+def _serve_build_dir() -> str:
+	"""Register static/build as a component path and return the component's name."""
+	import streamlit.components.v1 as components
+	return components.declare_component("build", path=BUILD_DIR).name
+
+
+def stylesheet_url(name: str) -> str | None:
+	"""Return the content-hashed URL of a built stylesheet, served as text/css."""
+	entry = get_manifest().get(name)
+	if not entry:
+		return None
+	return f"component/{_serve_build_dir()}/{entry['file']}"
+
+
+if __name__ == "__main__":
+	import argparse
+	parser = argparse.ArgumentParser(description="Build static image derivatives and stylesheets for the app")
+	parser.add_argument("--force", action="store_true", help="Rebuild even if sources are unchanged")
+	args = parser.parse_args()
+	for name, entry in sorted(build_assets(force=args.force).items()):
+		print(f"{name}: {entry['file']} ({entry['bytes']} bytes, from {entry['source']})")
@@ -0,0 +1,143 @@
+"""
+Headless end-to-end benchmark of app.py: full reruns driven by Streamlit's AppTest
+against fixture data served by a local stub of the Google endpoints.
+
+Usage (from the repo root):
+  python benchmarks/bench_app.py
+  python benchmarks/bench_app.py --scale 20 --players 5000 --latency 0.08 --reruns 20
+
+The schedule (published CSV), leaderboard (gviz export), jackpot and player counts
+come from `StubGoogleServer` with `--latency` per request, using the scaled
+fixtures in fixtures.py. The store is a throwaway SQLite file. Reported per run:
+  wall          AppTest.run() end to end
+  <section>     the rerun cost spans recorded by perf.py (header images, theme
+                CSS, schedule data and each tab fragment)
+  payload       bytes of ForwardMsgs the run would send to the browser
+  upstream      requests that reached the stub
+and, from one extra traced rerun, the peak Python allocation (tracemalloc) and
+the process max RSS. Results are printed and written to bench_output.txt.
+"""
+import argparse
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+
+from streamlit.testing.v1 import AppTest, local_script_runner  # noqa: E402
+
+from fixtures import LEADERBOARD_SHEET_ID, SCHEDULE_DOC, scaled_player_counts, scaled_schedule, synthetic_leaderboard  # noqa: E402
+from stubs import StubGoogleServer, redirect_google_docs  # noqa: E402
+
+SECTIONS = ["header", "theme", "schedule data", "home", "live", "poker schedule", "series", "about", "contact"]
+
+_payload = {"bytes": 0}
+_parse_tree = local_script_runner.parse_tree_from_messages
+
+
+def _counting_parse(messages):
+    # every ForwardMsg of the run passes through here once
+    _payload["bytes"] += sum(m.ByteSize() for m in messages)
+    return _parse_tree(messages)
+
+
+local_script_runner.parse_tree_from_messages = _counting_parse
+
+
+def measure(at: AppTest, server: StubGoogleServer) -> dict:
+    """Run the script once and return its costs."""
+    _payload["bytes"] = 0
+    server.hits.clear()
+    start = time.perf_counter()
+    at.run()
+    wall = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].value}")
+    costs = at.session_state["_rerun_costs"] if "_rerun_costs" in at.session_state else {}
+    row = {"wall": wall, "payload": _payload["bytes"], "upstream": sum(server.hits.values())}
+    for name in SECTIONS:
+        row[name] = costs[name]["ms"] if name in costs else None
+    return row
+
+
+def fmt(value, unit: str = "ms") -> str:
+    if value is None:
+        return "-"
+    return f"{value:,.0f}" if unit != "ms" else f"{value:,.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=10, help="copies of each schedule.csv row")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub latency per request (s)")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench_output.txt"))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-app-")
+    # before upstream.py is imported: no snapshots from an earlier run
+    os.environ["SNAPSHOT_DIR"] = os.path.join(workdir, "snapshots")
+    with StubGoogleServer(latency=args.latency) as server, redirect_google_docs(server):
+        schedule = scaled_schedule(args.scale)
+        server.add_published(SCHEDULE_DOC, schedule)
+        server.add_gviz(LEADERBOARD_SHEET_ID, "Leaderboard", synthetic_leaderboard(args.players))
+        os.environ.update({
+            "STORE_PATH": os.path.join(workdir, "bench.db"),
+            "JACKPOT_CSV_URL": server.add_csv("jackpot", "12,345"),
+            "PLAYER_COUNTS_CSV_URL": server.add_csv("player_counts", scaled_player_counts(args.scale)),
+        })
+
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+        first = measure(at, server)
+        reruns = [measure(at, server) for _ in range(args.reruns)]
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120).run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def column(key):
+        values = [r[key] for r in reruns if r[key] is not None]
+        if not values:
+            return None, None
+        return statistics.median(values), max(values)
+
+    lines = [
+        f"bench_app  {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"schedule rows: {schedule.count(chr(10)) - 1} (x{args.scale}), leaderboard players: {args.players}, "
+        f"stub latency: {args.latency * 1000:.0f} ms, reruns: {args.reruns}",
+        "",
+        f"{'':<22} {'first run':>10} {'rerun p50':>10} {'rerun max':>10}",
+    ]
+    for key in ["wall", *SECTIONS]:
+        p50, worst = column(key)
+        label = f"{key} (ms)"
+        lines.append(f"{label:<22} {fmt(first[key]):>10} {fmt(p50):>10} {fmt(worst):>10}")
+    for key, unit in (("payload", "bytes"), ("upstream", "requests")):
+        p50, worst = column(key)
+        label = f"{key} ({unit})"
+        lines.append(f"{label:<22} {fmt(first[key], unit):>10} {fmt(p50, unit):>10} {fmt(worst, unit):>10}")
+    lines += [
+        "",
+        f"peak traced allocation, one full run: {peak / 2**20:.1f} MiB",
+        f"process max RSS: {max_rss / 1024:.1f} MiB",
+    ]
+    report = "\n".join(lines)
+    print(report)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(report + "\n")
+    print(f"\nwritten to {os.path.relpath(args.output, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the header/logo/jackpot image handling per rerun: the old inline
+base64 path versus the pre-built static asset manifest (`assets.py`).
+
+Usage (from the repo root):
+  python benchmarks/bench_assets.py --runs 20
+
+Reports CPU time per rerun and the image bytes sent to the browser per rerun.
+"""
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from PIL import Image  # noqa: E402
+
+import assets  # noqa: E402
+
+
+def legacy_rerun(max_h: int) -> int:
+    """Replicates the pre-pipeline main(): resize, re-encode and base64-inline every image.
+
+    Returns the number of data-URI bytes that ended up in the page markdown.
+    """
+    payload = 0
+    img = Image.open("images/header.jpg")
+    w, h = img.size
+    if h > max_h:
+        img = img.resize((int(w * (max_h / h)), max_h), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+    payload += len(f"data:image/jpeg;base64,{base64.b64encode(buf.getvalue()).decode('ascii')}")
+
+    logo_img = Image.open("images/logo.png")
+    lw, lh_orig = logo_img.size
+    logo_img = logo_img.resize((int(lw * (84 / lh_orig)), 84), Image.LANCZOS)
+    buf = io.BytesIO()
+    logo_img.save(buf, format="PNG")
+    payload += len(f"data:image/png;base64,{base64.b64encode(buf.getvalue()).decode('ascii')}")
+
+    # the jackpot background was encoded on every rerun but never emitted
+    buf = io.BytesIO()
+    Image.open("images/royal-flush.jpg").save(buf, format="JPEG")
+
+    buf = io.BytesIO()
+    Image.open("images/Royal flush of spade.png").save(buf, format="PNG")
+    payload += len(f"data:image/png;base64,{base64.b64encode(buf.getvalue()).decode('ascii')}")
+    return payload
+
+
+def pipeline_rerun() -> int:
+    """What main() does now: look up three URLs in the in-process manifest."""
+    return sum(len(assets.asset_url(name) or "") for name in ("header", "logo", "spade"))
+
+
+def measure(fn, runs: int) -> tuple[float, int]:
+    payload = fn()  # warm up (and build assets on the pipeline side)
+    start = time.process_time()
+    for _ in range(runs):
+        fn()
+    return (time.process_time() - start) / runs * 1000, payload
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    max_h = assets.header_max_height()
+
+    cold_start = time.process_time()
+    manifest = assets.build_assets(force=True)
+    cold_ms = (time.process_time() - cold_start) * 1000
+
+    legacy_ms, legacy_bytes = measure(lambda: legacy_rerun(max_h), args.runs)
+    new_ms, new_bytes = measure(pipeline_rerun, args.runs)
+    static_bytes = sum(e["bytes"] for e in manifest.values())
+
+    print(f"runs per variant:            {args.runs}")
+    print(f"one-time asset build:        {cold_ms:9.2f} ms CPU")
+    print(f"inline base64 (before):      {legacy_ms:9.2f} ms CPU/rerun, {legacy_bytes:>9} bytes/rerun")
+    print(f"static manifest (after):     {new_ms:9.3f} ms CPU/rerun, {new_bytes:>9} bytes/rerun")
+    print(f"static files (first visit):  {static_bytes:>26} bytes, then browser-cached")
+
+
+if __name__ == "__main__":
+    main()
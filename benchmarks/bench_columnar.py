@@ -0,0 +1,141 @@
+"""
+Typed columnar snapshots (columnar.py) against re-parsing the CSV body snapshot,
+for a process that starts up while its sources are unchanged (or down).
+
+Usage (from the repo root):
+  python benchmarks/bench_columnar.py
+  python benchmarks/bench_columnar.py --scale 1000 --players 200000 --workers 4
+
+Fetches the scaled schedule and a synthetic leaderboard once from a local stub,
+which leaves both snapshots on disk (a throwaway SNAPSHOT_DIR), then reports:
+  load ms      getting the parsed frame back from disk: read_csv (+ normalize
+               for the schedule) of the body versus opening the columnar snapshot
+               (median of --repeat)
+  workers      --workers processes holding the leaderboard at once, each
+               loaded one way; private / shared MiB per worker from
+               /proc/<pid>/smaps_rollup once every worker has touched every column
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOTS = tempfile.mkdtemp(prefix="bench-columnar-")
+os.environ["SNAPSHOT_DIR"] = SNAPSHOTS
+
+import pandas as pd  # noqa: E402
+
+import columnar  # noqa: E402
+from fixtures import scaled_schedule, synthetic_leaderboard  # noqa: E402
+from stubs import StubGoogleServer  # noqa: E402
+from sync import ConditionalFetcher, ScheduleSync, fetch_csv, read_csv_bytes  # noqa: E402
+from upstream import upstream  # noqa: E402
+
+# one worker: load the leaderboard one way, touch it, wait, then report its memory
+WORKER = """
+import sys
+sys.path.insert(0, {root!r})
+import numpy as np
+import columnar
+from sync import read_csv_bytes
+mode, body_path, table_path = sys.argv[1:4]
+if mode == "csv":
+    with open(body_path, "rb") as f:
+        df = read_csv_bytes(f.read())
+else:
+    df, _meta = columnar.load(table_path)
+# touch every value, as sorting and rendering the board would
+total = sum(int(np.asarray(df[c]).sum()) for c in df.columns if df[c].dtype != object)
+names = sum(len(n) for n in df.iloc[:, 0])
+print("ready", flush=True)
+sys.stdin.readline()
+rollup = {{}}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            rollup[parts[0].rstrip(":")] = int(parts[1])
+print(rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0), rollup.get("Shared_Clean", 0) + rollup.get("Shared_Dirty", 0), flush=True)
+"""
+
+
+def median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def workers(mode: str, count: int, body_path: str, table_path: str) -> tuple[float, float]:
+    """Median (private MiB, shared MiB) per worker, with `count` workers alive at once."""
+    script = WORKER.format(root=ROOT)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, mode, body_path, table_path], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(count)
+    ]
+    for p in procs:
+        assert p.stdout.readline().strip() == "ready"
+    private, shared = [], []
+    for p in procs:
+        p.stdin.write("\n")
+        p.stdin.flush()
+        priv, shr = map(int, p.stdout.readline().split())
+        private.append(priv / 1024)
+        shared.append(shr / 1024)
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+    return statistics.median(private), statistics.median(shared)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=500, help="copies of each schedule.csv row")
+    parser.add_argument("--players", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with StubGoogleServer() as server:
+        schedule_url = server.add_csv("schedule", scaled_schedule(args.scale))
+        board_url = server.add_csv("board", synthetic_leaderboard(args.players))
+        schedule = ScheduleSync(ConditionalFetcher()).load(schedule_url)
+        board = fetch_csv(board_url, ConditionalFetcher())
+
+    rows = []
+    for label, url, expected, from_csv, from_table in (
+        ("schedule", schedule_url, schedule,
+         lambda body: ScheduleSync(ConditionalFetcher())._normalize_incremental(schedule_url, read_csv_bytes(body)),
+         lambda loaded: ScheduleSync(ConditionalFetcher()).restore(schedule_url, *loaded)),
+        ("leaderboard", board_url, board, read_csv_bytes, lambda loaded: loaded[0]),
+    ):
+        body = upstream.snapshot(url).body
+        path = upstream.table_path(url)
+        pd.testing.assert_frame_equal(from_table(columnar.load(path)), expected)
+        csv_ms = median_ms(lambda: from_csv(body), args.repeat)
+        table_ms = median_ms(lambda: from_table(columnar.load(path)), args.repeat)
+        rows.append((label, len(expected), len(body) / 2**20, csv_ms, table_ms))
+
+    body_path = upstream._snapshot_path(board_url) + ".body"
+    memory = {mode: workers(mode, args.workers, body_path, upstream.table_path(board_url)) for mode in ("csv", "columnar")}
+
+    print(f"{'':<12} {'rows':>8} {'CSV MiB':>8} {'csv ms':>8} {'columnar ms':>12}")
+    for label, n, mib, csv_ms, table_ms in rows:
+        print(f"{label:<12} {n:>8,} {mib:>8.1f} {csv_ms:>8.1f} {table_ms:>12.1f}")
+    print(f"\n{args.workers} workers holding the leaderboard, per worker (median):")
+    for mode, (private, shared) in memory.items():
+        print(f"  {mode:<9} private {private:6.1f} MiB   shared {shared:6.1f} MiB")
+    print("\nframes restored from the columnar snapshots: identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Streaming ingestion of registrations.csv (ingest.py) against re-reading the whole
+file with pandas on every refresh.
+
+Usage (from the repo root):
+  python benchmarks/bench_ingest.py
+  python benchmarks/bench_ingest.py --rows 2000000 --append 1000 --chunk-kb 1024
+
+Writes a synthetic registrations history of --rows rows to a temp dir and a
+throwaway store, then reports for each approach the time and peak Python heap
+(tracemalloc, in a second pass) of:
+  full        aggregating the whole history (first ingest / one read_csv + groupby)
+  append      a refresh after --append new rows
+  unchanged   a refresh with nothing appended
+and checks that both give the same registrations per day and time.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from ingest import CsvTail  # noqa: E402
+from store import Store  # noqa: E402
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+TIMES = ["18:00", "19:00", "19:30", "20:00", "21:00"]
+
+
+def write_rows(path: str, count: int, start: datetime, seed: int) -> datetime:
+    rng = random.Random(seed)
+    at = start
+    with open(path, "a", encoding="utf-8") as f:
+        for i in range(count):
+            at += timedelta(seconds=rng.randint(1, 90))
+            f.write(f"{at.isoformat()},{rng.choice(DAYS)},{rng.choice(TIMES)},Player {i},{rng.randint(10**7, 10**8 - 1)}\n")
+    return at
+
+
+def pandas_counts(path: str) -> dict:
+    # the whole-file approach: read everything, aggregate, throw it away
+    df = pd.read_csv(path, dtype=str)
+    return {k: int(v) for k, v in df.groupby(["day", "time"]).size().items()}
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def traced(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--append", type=int, default=1000)
+    parser.add_argument("--chunk-kb", type=int, default=1024)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-ingest-")
+    path = os.path.join(workdir, "registrations.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("timestamp,day,time,name,phone\n")
+    last = write_rows(path, args.rows, datetime(2024, 1, 1), seed=1)
+    size_mb = os.path.getsize(path) / 2**20
+
+    # two stores doing the same work: one timed, one under tracemalloc (which slows it)
+    tails = []
+    for name in ("timed.db", "traced.db"):
+        store = Store(os.path.join(workdir, name), import_legacy=False)
+        tails.append(CsvTail(store, path, "registrations", chunk_bytes=args.chunk_kb * 1024))
+    tail, traced_tail = tails
+
+    rows = []
+    for label in ("full", "append", "unchanged"):
+        if label == "append":
+            write_rows(path, args.append, last, seed=2)
+        # a settled file, so the last row counts at once
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        rows.append((f"stream {label}", timed(tail.refresh), traced(traced_tail.refresh)))
+        rows.append((f"pandas {label}", timed(lambda: pandas_counts(path)), traced(lambda: pandas_counts(path))))
+
+    assert tail.store.registration_counts() == pandas_counts(path), "streamed totals differ from the pandas aggregate"
+
+    print(f"{args.rows:,} rows ({size_mb:.1f} MiB), {args.chunk_kb} KiB chunks, +{args.append} rows per append")
+    print(f"{'':<20} {'ms':>10} {'peak MiB':>9}")
+    for label, ms, peak in rows:
+        print(f"{label:<20} {ms:>10.1f} {peak:>9.1f}")
+    print("\nregistrations per day/time: identical")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
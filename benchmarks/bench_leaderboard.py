@@ -0,0 +1,100 @@
+"""
+Benchmark the Series tab's leaderboard rendering: the old per-row `iterrows()` loop
+versus the columnar `Leaderboard` (leaderboard.py) on a season-sized sheet.
+
+Usage (from the repo root):
+  python benchmarks/bench_leaderboard.py
+  python benchmarks/bench_leaderboard.py --players 5000 --page-size 50
+
+The legacy figure is the HTML building only (one markdown call per player on top
+of that); the new figures are the one-off build per leaderboard version and the
+per-rerun cost of rendering a page, sorted and unsorted.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from leaderboard import STANDINGS, Leaderboard, get_board  # noqa: E402
+
+
+def season_sheet(players: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Rank": np.arange(1, players + 1),
+        "Player": [f"Player {i}" for i in range(players)],
+        "Points": rng.integers(0, 5000, players),
+        "Events": rng.integers(1, 40, players),
+        "Wins": rng.integers(0, 10, players),
+        "Cashes": np.where(rng.random(players) < 0.2, np.nan, rng.integers(0, 20, players)),
+        "Last Updated": "2026-10-01",
+    })
+
+
+def legacy_render(leaderboard_df: pd.DataFrame) -> list[str]:
+    """The loop the Series tab used to run, collecting what it passed to st.markdown."""
+    out = []
+    for i, (_, row) in enumerate(leaderboard_df.iterrows()):
+        rank = i + 1
+        if rank == 1:
+            rank_color = "#FFD700"
+        elif rank == 2:
+            rank_color = "#C0C0C0"
+        elif rank == 3:
+            rank_color = "#CD7F32"
+        else:
+            rank_color = "#87CEEB"
+        player_name = row.iloc[0] if len(row) > 0 else "Unknown Player"
+        if len(leaderboard_df.columns) > 1 and str(player_name).isdigit():
+            player_name = row.iloc[1] if len(row) > 1 else "Unknown Player"
+            stats_start_index = 2
+        else:
+            stats_start_index = 1
+        stats_text = ""
+        if len(row) > stats_start_index:
+            for j, value in enumerate(row.iloc[stats_start_index:], stats_start_index):
+                if pd.notna(value) and str(value).strip():
+                    column_name = leaderboard_df.columns[j] if j < len(leaderboard_df.columns) else f"Stat {j}"
+                    if "last updated" not in column_name.lower():
+                        stats_text += f"{column_name}: {value} | "
+        stats_text = stats_text.rstrip(" | ")
+        out.append(f"<span style='color: {rank_color}'>#{rank}</span> {player_name} {stats_text}")
+    return out
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    df = season_sheet(args.players)
+
+    legacy = timed(lambda: legacy_render(df))
+    build = timed(lambda: Leaderboard(df))
+    get_board(df)
+    rerun = timed(lambda: get_board(df).page_html(STANDINGS, 0, args.page_size))
+    first_sort = timed(lambda: get_board(df).page_html("Points", 0, args.page_size))
+    sorted_page = timed(lambda: get_board(df).page_html("Points", 7, args.page_size))
+
+    print(f"players: {args.players}, page size: {args.page_size}")
+    print(f"legacy iterrows loop, every rerun:   {legacy:9.1f} ms ({args.players} markdown calls)")
+    print(f"columnar build, once per version:    {build:9.1f} ms")
+    print(f"page render, standings:              {rerun:9.2f} ms (1 markdown call)")
+    print(f"page render, first sort by Points:   {first_sort:9.2f} ms")
+    print(f"page render, sorted (cached order):  {sorted_page:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
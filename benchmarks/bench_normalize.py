@@ -0,0 +1,135 @@
+"""
+Microbenchmark `normalize_schedule_df` (schedule_schema.py) against the previous
+per-call heuristic implementation on schedules of 10, 1k and 100k rows.
+
+Usage (from the repo root):
+  python benchmarks/bench_normalize.py
+  python benchmarks/bench_normalize.py --sizes 10 1000 100000 --repeat 5
+
+The large sizes stand in for a multi-venue feed: the published sheet's headers
+("Day", "Start Time", "Tournament Name", "Notes", ...) repeated across venues.
+Each size also checks that both implementations produce identical display
+columns; the compiled one also parses the typed columns (start minutes, buy-in
+amount, chip count) the legacy one never had.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from schedule_schema import EXPECTED_COLUMNS, normalize_schedule_df, resolve_columns  # noqa: E402
+
+
+def legacy_normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """The implementation that used to live in app.py, kept verbatim for comparison."""
+    if df is None or df.empty:
+        return df
+    lower_map = {c.lower().strip(): c for c in df.columns}
+
+    def find(col_names):
+        for name in col_names:
+            k = name.lower()
+            if k in lower_map:
+                return lower_map[k]
+        return None
+
+    day_col = find(["day", "dayofweek", "weekday"]) or find(["Day"])
+    time_col = find(["time", "start time", "start_time", "starttime", "start"]) or find(["Start Time"])
+    buy_col = find(["buy_in", "buy-in", "buyin", "buy-in (usd)", "buy-in (usd)", "buy-in (amount)", "buy-in amount"]) or find(["Buy-in", "Buyin"])
+    rebuy_col = find(["rebuy", "re-buy", "re buy"]) or find(["Rebuy"])
+    chips_col = find(["starting_chips", "starting chips", "startingchips", "starting stack", "starting chips"]) or find(["Starting Chips"])
+    cutoff_col = find(["cutoff", "cut-off", "cut off"]) or find(["Cut-off"])
+    notes_col = find(["notes", "note"]) or find(["Notes"])
+    tname_col = find(["tournament name", "name", "event"]) or find(["Tournament Name"])
+
+    out = pd.DataFrame()
+    out['day'] = df[day_col] if day_col in df.columns else df.get('Day', df.get('day', ''))
+    if time_col and time_col in df.columns:
+        out['time'] = df[time_col]
+    else:
+        out['time'] = df.get('Start Time', df.get('time', ''))
+    if buy_col and buy_col in df.columns:
+        out['buy_in'] = df[buy_col]
+    else:
+        out['buy_in'] = df.get('Buy-in', df.get('Buyin', df.get('buy_in', '')))
+    out['rebuy'] = df[rebuy_col] if rebuy_col in df.columns else df.get('Rebuy', df.get('rebuy', ''))
+    out['starting_chips'] = df[chips_col] if chips_col in df.columns else df.get('Starting Chips', df.get('starting_chips', ''))
+    out['cutoff'] = df[cutoff_col] if cutoff_col in df.columns else df.get('Cut-off', df.get('cutoff', ''))
+    notes_parts = []
+    if tname_col and tname_col in df.columns:
+        notes_parts.append(df[tname_col].astype(str))
+    if notes_col and notes_col in df.columns:
+        notes_series = df[notes_col].astype(str)
+        notes_series = notes_series.replace('nan', '')
+        notes_parts.append(notes_series)
+    if notes_parts:
+        out['notes'] = notes_parts[0].fillna('')
+        for part in notes_parts[1:]:
+            mask = (part.fillna('').str.strip() != '') & (part.fillna('').str.strip() != 'nan')
+            out['notes'] = out['notes'].where(~mask, out['notes'].str.strip() + ' — ' + part.fillna('').str.strip())
+    else:
+        out['notes'] = df.get('Notes', df.get('notes', ''))
+    addon_col = find(["add-on", "add on", "addon"]) or find(["Add-on", "Add-on", "Addon"])
+    if addon_col and addon_col in df.columns:
+        out['add_on'] = df[addon_col].fillna('')
+    else:
+        out['add_on'] = ''
+    expected = ["day", "time", "buy_in", "rebuy", "starting_chips", "cutoff", "notes", "add_on"]
+    for c in expected:
+        if c not in out.columns:
+            out[c] = ''
+    return out[expected]
+
+
+def published_feed(rows: int, seed: int = 7) -> pd.DataFrame:
+    """A schedule shaped like the published sheet CSV, with blanks and NaNs mixed in."""
+    rng = np.random.default_rng(seed)
+    days = np.array(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"])
+    names = np.array(["Weekly $30", "$2,000 GTD Freeroll", "Deepstack", "CASH GAME", "Bounty Hunter"])
+    notes = np.array(["", "Add on @ second break", "$25 D/A for 50K", "Match the stack", None], dtype=object)
+    return pd.DataFrame({
+        "Day": days[rng.integers(0, 7, rows)],
+        "Start Time": rng.choice(["18:00", "19:00", "19:30"], rows),
+        "Buy-in": rng.choice(["$30", "$60", "$0 (freeroll)"], rows),
+        "Rebuy": rng.choice(["No", "$15 unlimited", "$20 unlimited"], rows),
+        "Starting Chips": rng.choice(["10K", "30K", "100K"], rows),
+        "Cut-off": rng.choice(["20:50", "21:00", "21:50"], rows),
+        "Tournament Name": names[rng.integers(0, 5, rows)],
+        "Notes": notes[rng.integers(0, 5, rows)],
+        "Add-on": rng.choice(["", "$20 for 50K", None], rows),
+    })
+
+
+def best_of(fn, df, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'legacy ms':>10}  {'compiled ms':>11}  {'speedup':>7}")
+    for size in args.sizes:
+        df = published_feed(size)
+        pd.testing.assert_frame_equal(legacy_normalize(df), normalize_schedule_df(df)[EXPECTED_COLUMNS])
+        legacy = best_of(legacy_normalize, df, args.repeat)
+        compiled = best_of(normalize_schedule_df, df, args.repeat)
+        print(f"{size:>8}  {legacy:>10.2f}  {compiled:>11.2f}  {legacy / compiled:>6.1f}x")
+    print(f"mapping cache: {resolve_columns.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
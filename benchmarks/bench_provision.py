@@ -0,0 +1,116 @@
+"""
+Provisioning a season's sheets with provision.py against the old create_*_gsheet.py
+call pattern, against a local stub of the Sheets and Drive APIs.
+
+Usage (from the repo root):
+  python benchmarks/bench_provision.py
+  python benchmarks/bench_provision.py --venues 10 --latency 0.2 --concurrency 8
+
+Expands provision.example.json for --venues venues (4 spreadsheets each) and
+creates them three ways against a fresh stub with --latency seconds per request:
+  old scripts   one spreadsheet after another, as create_gsheet.py & co. did:
+                create, open the first worksheet, write it (set_with_dataframe /
+                update), add and write each further tab, share
+  provision     provision.py with --concurrency workers
+  re-run        provision.py again over the same manifest (everything exists)
+Reports wall time, API calls by kind and worker time spent waiting for the
+quota, and checks that both ways leave the same tabs and values.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gspread  # noqa: E402
+import pandas as pd  # noqa: E402
+from gspread_dataframe import set_with_dataframe  # noqa: E402
+
+from provision import Provisioner, load_manifest  # noqa: E402
+from stubs import StubGoogleServer, stub_credentials, stub_session  # noqa: E402
+
+
+def client(server):
+    credentials = stub_credentials(server)
+    return gspread.Client(auth=credentials, session=stub_session(server, credentials))
+
+
+def legacy(gc, spec) -> None:
+    """The per-sheet sequence of the old scripts, extended to every tab of the spec."""
+    sh = gc.create(spec.title)
+    for i, (tab, rows) in enumerate(spec.tabs.items()):
+        ws = sh.get_worksheet(0) if i == 0 else sh.add_worksheet(title=tab, rows=1000, cols=26)
+        if i == 0 and ws.title != tab:
+            ws.update_title(tab)
+        if len(rows) > 1:
+            set_with_dataframe(ws, pd.DataFrame(rows[1:], columns=rows[0]))
+        elif rows:
+            ws.update("A1", rows)
+    sh.share(None, perm_type="anyone", role="reader")
+
+
+def contents(server) -> dict:
+    return {sheet["title"]: {tab: [r for r in rows if r] for tab, rows in sheet["tabs"].items()} for sheet in server.sheets.values()}
+
+
+def measure(server, fn) -> tuple[float, dict]:
+    server.hits.clear()
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, dict(server.hits)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--venues", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.15, help="stub latency per request (s)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--per-minute", type=int, default=60)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "provision.example.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["venues"] = [{"id": f"venue{i}", "name": f"Venue {i}"} for i in range(args.venues)]
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-provision-"), "provision.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    # template paths in the example are relative to the repo root
+    os.chdir(ROOT)
+    specs = load_manifest(path)
+
+    rows = []
+    with StubGoogleServer(latency=args.latency) as server:
+        gc = client(server)
+        seconds, hits = measure(server, lambda: [legacy(gc, spec) for spec in specs])
+        rows.append(("old scripts", seconds, hits, 0.0))
+        old = contents(server)
+
+    with StubGoogleServer(latency=args.latency) as server:
+        gc = client(server)
+        for label in ("provision", "re-run"):
+            provisioner = Provisioner(gc, args.concurrency, args.per_minute)
+            results = []
+            seconds, hits = measure(server, lambda: results.extend(provisioner.run(specs)))
+            failed = [r for r in results if r.action == "failed"]
+            assert not failed, failed[0].detail
+            rows.append((label, seconds, hits, provisioner.stats()["quota_wait_seconds"]))
+        new = contents(server)
+
+    assert old == new, "provision.py left different tabs or values than the old scripts"
+
+    print(f"{len(specs)} spreadsheets ({args.venues} venues x {len(manifest['sheets'])} kinds), "
+          f"{args.latency * 1000:.0f} ms per request, concurrency {args.concurrency}, {args.per_minute}/min")
+    print(f"{'':<12} {'s':>7} {'calls':>6} {'quota s':>8}  calls by kind")
+    for label, seconds, hits, waited in rows:
+        detail = ", ".join(f"{k}={v}" for k, v in sorted(hits.items()))
+        print(f"{label:<12} {seconds:>7.2f} {sum(hits.values()):>6} {waited:>8.1f}  {detail}")
+    print("\ntabs and values: identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Calendar-driven refresh (refresh.py) against fetching on demand and against the
+old fixed-interval store sync, over a simulated week of traffic.
+
+Usage (from the repo root):
+  python benchmarks/bench_refresh.py
+  python benchmarks/bench_refresh.py --sessions 400 --live-share 0.8 --session-minutes 8
+
+Runs a virtual clock through one week of schedule.csv, in 5 s steps. Sessions
+arrive at random, --live-share of them inside live windows; each loads the page
+once (a leaderboard read) and keeps the live panel open for --session-minutes
+(a jackpot and a player-count read every LIVE_REFRESH_SECONDS). Reported per
+source, for:
+  on demand   every read fetches
+  fixed       jackpot / counts every STORE_SYNC_INTERVAL, leaderboard per page load
+              (the sync before refresh.py)
+  scheduled   RefreshPlan: the background thread polls when due, pages fetch
+              only when what it holds is older than the current interval
+upstream fetches, and the oldest data a read was served, inside and outside
+live windows.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from refresh import SOURCES, RefreshPlan, live_windows, policy  # noqa: E402
+from schedule_schema import normalize_schedule_df  # noqa: E402
+from week import TIMEZONE  # noqa: E402
+
+STEP = 5  # seconds
+LIVE_REFRESH = float(os.environ.get("LIVE_REFRESH_SECONDS", 10))
+FIXED = float(os.environ.get("STORE_SYNC_INTERVAL", 15))
+
+
+def arrivals(windows, monday: datetime, sessions: int, live_share: float, rng: random.Random) -> list:
+    """Session start times (s from Monday 00:00), live_share of them inside a live window."""
+    week = 7 * 86400
+    spans = [((a - monday).total_seconds(), (b - monday).total_seconds()) for a, b in windows]
+    spans = [(max(a, 0), min(b, week)) for a, b in spans if b > 0 and a < week]
+    live_total = sum(b - a for a, b in spans)
+    out = []
+    for _ in range(sessions):
+        if rng.random() < live_share:
+            # uniform over the union of live windows
+            at = rng.uniform(0, live_total)
+            for a, b in spans:
+                if at < b - a:
+                    out.append(a + at)
+                    break
+                at -= b - a
+        else:
+            while True:
+                at = rng.uniform(0, week)
+                if not any(a <= at < b for a, b in spans):
+                    out.append(at)
+                    break
+    return sorted(out)
+
+
+def simulate(df, starts: list, session_seconds: float, monday: datetime) -> dict:
+    clock = [monday]
+    plan = RefreshPlan(lambda: df, {source: policy(source) for source in SOURCES}, clock=lambda: clock[0])
+    fetched = {}  # source -> virtual time of the copy pages see
+    fetches = {mode: dict.fromkeys(SOURCES, 0) for mode in ("on demand", "fixed", "scheduled")}
+    oldest = {(source, live): 0.0 for source in SOURCES for live in (True, False)}
+    fixed_next = 0.0
+
+    def fetch(source):
+        fetched[source] = clock[0]
+        return source
+
+    def cached(source):
+        return source if source in fetched else None
+
+    def seen(source, live):
+        age = (clock[0] - fetched[source]).total_seconds()
+        oldest[source, live] = max(oldest[source, live], age)
+
+    open_sessions, next_session = [], 0
+    for step in range(0, 7 * 86400, STEP):
+        clock[0] = monday + timedelta(seconds=step)
+        live = plan.live()
+        # the background thread
+        for source in SOURCES:
+            if plan.due(source):
+                plan.run(source, lambda: fetch(source))
+                fetches["scheduled"][source] += 1
+        if step >= fixed_next:
+            fixed_next += FIXED
+            fetches["fixed"]["jackpot"] += 1
+            fetches["fixed"]["player_counts"] += 1
+        # pages
+        while next_session < len(starts) and starts[next_session] <= step:
+            open_sessions.append([starts[next_session], starts[next_session] + session_seconds, starts[next_session]])
+            before = plan.stats()["leaderboard"]["page_fetches"]
+            plan.read("leaderboard", lambda: fetch("leaderboard"), lambda: cached("leaderboard"))
+            fetches["scheduled"]["leaderboard"] += plan.stats()["leaderboard"]["page_fetches"] - before
+            fetches["on demand"]["leaderboard"] += 1
+            fetches["fixed"]["leaderboard"] += 1
+            seen("leaderboard", live)
+            next_session += 1
+        for session in open_sessions:
+            if step >= session[2]:
+                session[2] += LIVE_REFRESH
+                for source in ("jackpot", "player_counts"):
+                    plan.note_read(source)
+                    fetches["on demand"][source] += 1
+                    seen(source, live)
+        open_sessions = [s for s in open_sessions if s[1] > step]
+    return {"fetches": fetches, "oldest": oldest, "stats": plan.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=2000, help="sessions over the week")
+    parser.add_argument("--live-share", type=float, default=0.7, help="share of sessions inside live windows")
+    parser.add_argument("--session-minutes", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    df = normalize_schedule_df(pd.read_csv(os.path.join(ROOT, "schedule.csv")))
+    monday = datetime(2026, 10, 12, tzinfo=TIMEZONE)
+    windows = live_windows(df, monday - timedelta(days=1), days=9)
+    live_hours = sum(min(b, monday + timedelta(days=7)).timestamp() - max(a, monday).timestamp() for a, b in windows if b > monday and a < monday + timedelta(days=7)) / 3600
+    starts = arrivals(windows, monday, args.sessions, args.live_share, random.Random(args.seed))
+    result = simulate(df, starts, args.session_minutes * 60, monday)
+
+    print(f"one week of schedule.csv: {live_hours:.1f} live hours, {args.sessions} sessions ({args.live_share:.0%} live), {args.session_minutes:g} min each")
+    print(f"{'source':<14} {'on demand':>10} {'fixed':>10} {'scheduled':>10} {'saved':>8} {'oldest live s':>14} {'oldest idle s':>14}")
+    for source in SOURCES:
+        counts = [result["fetches"][mode][source] for mode in ("on demand", "fixed", "scheduled")]
+        live_age, idle_age = result["oldest"][source, True], result["oldest"][source, False]
+        print(f"{source:<14} {counts[0]:>10,} {counts[1]:>10,} {counts[2]:>10,} {counts[0] - counts[2]:>8,} {live_age:>14.0f} {idle_age:>14.0f}")
+    totals = [sum(result["fetches"][mode].values()) for mode in ("on demand", "fixed", "scheduled")]
+    print(f"{'total':<14} {totals[0]:>10,} {totals[1]:>10,} {totals[2]:>10,} {totals[0] - totals[2]:>8,}")
+    print(f"\nRefreshPlan.stats() saved: {result['stats']['saved']:,}")
+
+
+if __name__ == "__main__":
+    main()
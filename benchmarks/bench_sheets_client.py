@@ -0,0 +1,89 @@
+"""
+Benchmark Google Sheets reads through the shared client manager (`sheets_client.py`)
+versus the old authenticate-and-open-per-call pattern, against a local stub server.
+
+Usage (from the repo root):
+  python benchmarks/bench_sheets_client.py --calls 10 --latency 0.05
+
+Reports wall time per call and upstream round trips by kind (token exchange,
+spreadsheet metadata, values reads/appends).
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gspread  # noqa: E402
+from gspread_dataframe import get_as_dataframe  # noqa: E402
+
+from sheets_client import SheetsClientManager  # noqa: E402
+from stubs import StubGoogleServer, stub_credentials, stub_session  # noqa: E402
+
+SHEET_ID = "bench-sheet"
+TAB = "Leaderboard"
+
+
+def legacy_read(server):
+    """What load_leaderboard_from_gsheet used to do on every call."""
+    credentials = stub_credentials(server)
+    gc = gspread.Client(auth=credentials, session=stub_session(server, credentials))
+    ws = gc.open_by_key(SHEET_ID).worksheet(TAB)
+    return get_as_dataframe(ws, evaluate_formulas=True, skip_blank_rows=True)
+
+
+def legacy_append(server, row):
+    credentials = stub_credentials(server)
+    gc = gspread.Client(auth=credentials, session=stub_session(server, credentials))
+    sh = gc.open_by_key(SHEET_ID)
+    try:
+        ws = sh.worksheet("registrations")
+    except Exception:
+        ws = sh.add_worksheet(title="registrations", rows=1000, cols=20)
+    ws.append_row(row)
+
+
+def run(label, server, calls, read, append):
+    server.hits.clear()
+    start = time.perf_counter()
+    for i in range(calls):
+        read()
+        append(["2025-10-01T19:00:00", "Monday", "19:00", f"player {i}", "555"])
+    elapsed = time.perf_counter() - start
+    trips = sum(server.hits.values())
+    detail = ", ".join(f"{k}={v}" for k, v in sorted(server.hits.items()))
+    print(f"{label:<16} {elapsed / (calls * 2) * 1000:8.1f} ms/call  {trips:4d} round trips ({detail})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=10, help="reads and appends per variant")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub server latency per request (s)")
+    args = parser.parse_args()
+
+    with StubGoogleServer(latency=args.latency) as server:
+        rows = [["Player", "Points"]] + [[f"Player {i}", 100 - i] for i in range(50)]
+        server.add_sheet(SHEET_ID, {TAB: rows, "registrations": []})
+        manager = SheetsClientManager(
+            credentials_factory=lambda path: stub_credentials(server),
+            session_factory=lambda creds: stub_session(server, creds),
+        )
+
+        def pooled_read():
+            ws = manager.worksheet(SHEET_ID, TAB)
+            return get_as_dataframe(ws, evaluate_formulas=True, skip_blank_rows=True)
+
+        def pooled_append(row):
+            manager.worksheet(SHEET_ID, "registrations", create={"rows": 1000, "cols": 20}).append_row(row)
+
+        print(f"{args.calls} reads + {args.calls} appends, {args.latency * 1000:.0f} ms stub latency")
+        run("per-call auth", server, args.calls, lambda: legacy_read(server), lambda r: legacy_append(server, r))
+        run("client manager", server, args.calls, pooled_read, pooled_append)
+        print(f"manager counters: {manager.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Load test: N sessions starting at the same moment against a local stub of the
+published schedule, jackpot and leaderboard CSVs, with and without single-flight
+coalescing (`singleflight.py`).
+
+Usage (from the repo root):
+  python benchmarks/bench_singleflight.py
+  python benchmarks/bench_singleflight.py --sessions 200 --latency 0.05
+
+Each simulated session does what a rerun of app.py does for its data: start the
+three fetches on the shared loader pool (`loaders.py`), then build the schedule
+cards from the week model (`week.py`) and, if the leaderboard loaded, a
+leaderboard page. Two bursts are measured per variant:
+  cold  - empty caches, e.g. right after a deploy
+  warm  - schedule cached, so only the per-rerun leaderboard revalidation goes out
+Reported: upstream requests hitting the stub, render latency percentiles, the
+p99 time sessions spent waiting for data (the part single-flight affects; the
+rest of a render is CPU shared by every session under the GIL) and the sessions
+that failed or rendered without a source that errored or timed out. Failed
+sessions are left out of the percentiles, so check that column first.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# throwaway last-known-good snapshots (upstream.py), cleared with the caches
+os.environ["SNAPSHOT_DIR"] = tempfile.mkdtemp(prefix="bench-snapshots-")
+
+import numpy as np  # noqa: E402
+
+import cards  # noqa: E402
+import leaderboard  # noqa: E402
+import sync  # noqa: E402
+import week  # noqa: E402
+from cache import schedule_cache  # noqa: E402
+from fixtures import synthetic_leaderboard  # noqa: E402
+from loaders import OK, PageLoads, Source  # noqa: E402
+from singleflight import flights  # noqa: E402
+from stubs import StubGoogleServer  # noqa: E402
+
+
+def render_session(urls: dict) -> tuple[float, bool]:
+    """One session's rerun; returns (ms spent waiting for data, whether every source loaded)."""
+    schedule_url, jackpot_url, leaderboard_url = urls["schedule"], urls["jackpot"], urls["leaderboard"]
+    loads = PageLoads([
+        Source("schedule", lambda: schedule_cache.get(schedule_url, lambda: sync.schedule_sync.load(schedule_url)).copy(), 10,
+               key=("load schedule", schedule_url)),
+        Source("jackpot", lambda: flights.do(("jackpot", jackpot_url), lambda: urllib.request.urlopen(jackpot_url, timeout=10).read().decode().strip()), 3,
+               key=("load jackpot", jackpot_url)),
+        Source("leaderboard", lambda: sync.fetch_csv(leaderboard_url), 8, key=("load leaderboard", leaderboard_url)),
+    ])
+    start = time.perf_counter()
+    df, leaders = loads.get("schedule"), loads.get("leaderboard")
+    loads.get("jackpot")
+    waited = (time.perf_counter() - start) * 1000
+    if df is not None:
+        for day in week.get_week(df).days:
+            cards.day_cards_html(day.name, day.rows, "Monday", None, rows_key=day.rows_key)
+    # as in app.py: no board when the leaderboard errored or timed out
+    if leaders is not None:
+        leaderboard.get_board(leaders).page_html(leaderboard.STANDINGS, 0, 50)
+    return waited, all(loads.status(name) == OK for name in ("schedule", "jackpot", "leaderboard"))
+
+
+def reset_caches(urls: dict) -> None:
+    schedule_cache.invalidate()
+    for url in urls.values():
+        sync.fetcher.forget(url)
+    sync.schedule_sync._normalized.clear()
+    week._weeks.clear()
+    cards._cache.clear()
+    leaderboard._boards.clear()
+    shutil.rmtree(os.environ["SNAPSHOT_DIR"], ignore_errors=True)
+
+
+def burst(server: StubGoogleServer, urls: dict, sessions: int) -> tuple[int, list, list, int, int]:
+    """Start `sessions` renders at once.
+
+    Returns (upstream requests, render ms, data-wait ms, sessions that raised,
+    sessions missing a source); render and wait times cover the sessions that
+    did not raise.
+    """
+    server.hits.clear()
+    flights.reset_stats()
+    barrier = threading.Barrier(sessions + 1)
+    latencies = []
+    waits = []
+    outcome = {"failed": 0, "degraded": 0}
+    lock = threading.Lock()
+
+    def session():
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            waited, complete = render_session(urls)
+        except Exception:
+            with lock:
+                outcome["failed"] += 1
+            return
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+            waits.append(waited)
+            outcome["degraded"] += not complete
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    for t in threads:
+        t.join()
+    return sum(server.hits.values()), latencies, waits, outcome["failed"], outcome["degraded"]
+
+
+def pct(values: list, q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub latency per request (s)")
+    args = parser.parse_args()
+
+    with StubGoogleServer(latency=args.latency) as server:
+        with open(os.path.join(ROOT, "schedule.csv"), encoding="utf-8") as f:
+            schedule_text = f.read()
+        urls = {
+            "schedule": server.add_csv("schedule", schedule_text),
+            "jackpot": server.add_csv("jackpot", "12,345"),
+            "leaderboard": server.add_csv("leaderboard", synthetic_leaderboard()),
+        }
+        print(f"{args.sessions} simultaneous sessions, {args.latency * 1000:.0f} ms stub latency, "
+              f"{os.environ.get('LOADER_THREADS', 8)} loader threads")
+        print(f"{'variant':<18} {'burst':<5} {'upstream':>8} {'render p50':>10} {'render p99':>10} {'data wait p99':>13} {'failed':>6} {'degraded':>8}")
+        for label, enabled in (("no single-flight", False), ("single-flight", True)):
+            flights.enabled = enabled
+            reset_caches(urls)
+            for kind in ("cold", "warm"):
+                upstream, lat, waits, failed, degraded = burst(server, urls, args.sessions)
+                coalesced = f"  coalesced {flights.stats()['coalesced_by_kind']}" if enabled else ""
+                print(f"{label:<18} {kind:<5} {upstream:>8} {pct(lat, 50):>10.0f} {pct(lat, 99):>10.0f} {pct(waits, 99):>13.0f} {failed:>6} {degraded:>8}{coalesced}")
+        print("(times in ms; failed sessions raised and are not in the percentiles, degraded ones rendered without a source)")
+
+
+if __name__ == "__main__":
+    main()
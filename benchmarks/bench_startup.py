@@ -0,0 +1,156 @@
+"""
+Measure time to first render of a cold process: `streamlit run app.py` versus the
+warmup launcher `serve.py`.
+
+Usage (from the repo root):
+  python benchmarks/bench_startup.py
+  python benchmarks/bench_startup.py --latency 0.3 --runs 3
+
+Each run starts a fresh server process with an empty static/build (as on a new
+dyno; the directory is rebuilt by the run) and a throwaway store, against a local
+stub of the Google endpoints with `--latency` per request. The first visitor is
+simulated with a websocket client that asks for a script run the way the browser
+does. Reported per launcher (median of `--runs`):
+  port bound    process start to a healthy /_stcore/health
+  first render  process start to the end of the first visitor's script run
+  visitor wait  what that first visitor waits: first render - connect time
+"""
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from tornado.ioloop import IOLoop  # noqa: E402
+from tornado.websocket import websocket_connect  # noqa: E402
+
+from fixtures import LEADERBOARD_SHEET_ID, SCHEDULE_DOC, scaled_player_counts, scaled_schedule, synthetic_leaderboard  # noqa: E402
+from stubs import StubGoogleServer  # noqa: E402
+
+# child process: send docs.google.com to the stub, then hand over to the launcher
+CHILD = """
+import os, runpy, sys
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {bench_dir!r})
+from stubs import install_docs_redirect
+install_docs_redirect(os.environ["STUB_BASE_URL"])
+launcher, port = sys.argv[1], sys.argv[2]
+os.chdir({root!r})
+if launcher == "serve.py":
+    sys.argv = ["serve.py", "--port", port, "--address", "127.0.0.1"]
+    runpy.run_path("serve.py", run_name="__main__")
+else:
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", "app.py", "--server.port", port, "--server.address", "127.0.0.1",
+                "--server.headless", "true", "--server.runOnSave", "false"]
+    cli.main()
+"""
+
+LAUNCHERS = {
+    "streamlit run": "streamlit run",
+    "serve.py": "serve.py",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(port: int, deadline: float) -> None:
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return
+        except Exception:
+            time.sleep(0.02)
+    raise TimeoutError("server did not come up")
+
+
+async def first_visit(port: int) -> None:
+    """Open a session like the browser does and wait until its script run finishes."""
+    ws = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"])
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.page_script_hash = ""
+    await ws.write_message(msg.SerializeToString(), binary=True)
+    while True:
+        data = await ws.read_message()
+        if data is None:
+            raise ConnectionError("websocket closed before the script finished")
+        forward = ForwardMsg()
+        forward.ParseFromString(data)
+        if forward.WhichOneof("type") == "script_finished":
+            ws.close()
+            return
+
+
+def run_once(launcher: str, env: dict) -> dict:
+    shutil.rmtree(os.path.join(ROOT, "static", "build"), ignore_errors=True)
+    port = free_port()
+    code = CHILD.format(bench_dir=BENCH_DIR, root=ROOT)
+    started = time.time()
+    child_env = dict(env, PROCESS_STARTED_AT=str(started))
+    proc = subprocess.Popen([sys.executable, "-c", code, LAUNCHERS[launcher], str(port)],
+                            env=child_env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        wait_healthy(port, started + 120)
+        bound = time.time()
+        IOLoop.current().run_sync(lambda: first_visit(port), timeout=120)
+        rendered = time.time()
+    finally:
+        proc.terminate()
+        proc.communicate(timeout=30)
+    return {
+        "port bound": (bound - started) * 1000,
+        "first render": (rendered - started) * 1000,
+        "visitor wait": (rendered - bound) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2, help="stub latency per request (s)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scale", type=int, default=10, help="copies of each schedule.csv row")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    with StubGoogleServer(latency=args.latency) as server:
+        server.add_published(SCHEDULE_DOC, scaled_schedule(args.scale))
+        server.add_gviz(LEADERBOARD_SHEET_ID, "Leaderboard", synthetic_leaderboard(2000))
+        env = dict(
+            os.environ,
+            STUB_BASE_URL=server.base_url,
+            JACKPOT_CSV_URL=server.add_csv("jackpot", "12,345"),
+            PLAYER_COUNTS_CSV_URL=server.add_csv("player_counts", scaled_player_counts(args.scale)),
+        )
+        print(f"stub latency {args.latency * 1000:.0f} ms, schedule x{args.scale}, median of {args.runs} cold starts")
+        print(f"{'launcher':<14} {'port bound':>10} {'first render':>12} {'visitor wait':>12}  (ms)")
+        for launcher in LAUNCHERS:
+            results = []
+            for i in range(args.runs):
+                env["STORE_PATH"] = os.path.join(workdir, f"{launcher.replace(' ', '-')}-{i}.db")
+                env["SNAPSHOT_DIR"] = os.path.join(workdir, f"{launcher.replace(' ', '-')}-{i}-snapshots")
+                results.append(run_once(launcher, env))
+            row = {k: statistics.median(r[k] for r in results) for k in ("port bound", "first render", "visitor wait")}
+            print(f"{launcher:<14} {row['port bound']:>10.0f} {row['first render']:>12.0f} {row['visitor wait']:>12.0f}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
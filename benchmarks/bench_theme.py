@@ -0,0 +1,51 @@
+"""
+Measure the theme bytes sent to the browser per rerun: the old inline `<style>`
+block versus one `<link>` to the minified, content-hashed stylesheet (`assets.py`).
+
+Usage (from the repo root):
+  python benchmarks/bench_theme.py
+
+Sizes are of the serialized ForwardMsg carrying the markdown element, i.e. what
+goes over the websocket on every rerun. The stylesheet itself is fetched once per
+browser and then revalidated by ETag (304, empty body) or served from cache.
+"""
+import gzip
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+
+import assets  # noqa: E402
+
+
+def markdown_msg_bytes(body: str) -> int:
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = body
+    msg.delta.new_element.markdown.allow_html = True
+    return msg.ByteSize()
+
+
+def main():
+    with open(os.path.join(ROOT, "styles", "theme.css"), encoding="utf-8") as f:
+        source = f.read()
+    manifest = assets.build_assets()
+    entry = manifest["theme"]
+    with open(os.path.join(assets.BUILD_DIR, entry["file"]), "rb") as f:
+        built = f.read()
+
+    # what main() used to send: the whole theme inside a <style> element, every rerun
+    inline = markdown_msg_bytes(f"<style>\n{source}</style>")
+    href = f"component/assets.build/{entry['file']}"
+    linked = markdown_msg_bytes(f'<link rel="stylesheet" href="{href}">')
+
+    print(f"inline <style> (before):      {inline:>7} bytes/rerun")
+    print(f"<link> to stylesheet (after): {linked:>7} bytes/rerun")
+    print(f"stylesheet, first visit:       {len(built):>7} bytes minified ({len(source.encode())} source, {len(gzip.compress(built))} gzipped)")
+
+
+if __name__ == "__main__":
+    main()
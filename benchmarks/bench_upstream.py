@@ -0,0 +1,123 @@
+"""
+What a degraded upstream costs a fetch: the old bare `urlopen` versus the shared
+fetch layer (`upstream.py`) behind `sync.ConditionalFetcher`.
+
+Usage (from the repo root):
+  python benchmarks/bench_upstream.py
+  python benchmarks/bench_upstream.py --hang 5 --fetches 8
+
+A local stub serves the scaled schedule CSV. Three scenarios, each a series of
+sequential fetches of the same URL (as reruns after the cache TTL would make):
+  slow     the stub answers after --hang seconds
+  outage   the stub answers 503 to everything
+  restart  outage, seen by a fresh fetcher with no in-memory copy (a new dyno),
+           with and without the on-disk snapshot
+Reported per scenario: ms per fetch (first, then median of the rest), the
+total time the caller's thread was tied up, what it got back, and upstream
+requests. The bench uses short timeouts
+(UPSTREAM_READ_TIMEOUT=1, UPSTREAM_BREAKER_RESET=60) so it finishes quickly.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOTS = tempfile.mkdtemp(prefix="bench-snapshots-")
+os.environ.update({
+    "SNAPSHOT_DIR": SNAPSHOTS,
+    "UPSTREAM_READ_TIMEOUT": "1",
+    "UPSTREAM_BREAKER_RESET": "60",
+})
+
+from fixtures import scaled_schedule  # noqa: E402
+from stubs import StubGoogleServer  # noqa: E402
+from sync import ConditionalFetcher, read_csv_bytes  # noqa: E402
+from upstream import upstream  # noqa: E402
+
+
+def bare(url: str, hang: float):
+    # what app.fetch_jackpot used to do: no timeout at all (capped here at hang + 1s)
+    with urllib.request.urlopen(url, timeout=hang + 1) as response:
+        return read_csv_bytes(response.read())
+
+
+def series(fetch, count: int) -> tuple[list, str]:
+    times, outcome = [], ""
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            df = fetch()
+            outcome = f"{len(df)} rows"
+        except Exception as e:
+            outcome = f"error ({type(e).__name__})"
+        times.append((time.perf_counter() - start) * 1000)
+    return times, outcome
+
+
+def report(label: str, times: list, outcome: str, hits: int) -> None:
+    rest = statistics.median(times[1:]) if len(times) > 1 else float("nan")
+    print(f"{label:<34} {times[0]:>9.1f} {rest:>9.1f} {sum(times) / 1000:>8.2f} {hits:>9}  {outcome}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hang", type=float, default=3.0, help="seconds the slow stub takes to answer")
+    parser.add_argument("--fetches", type=int, default=6)
+    parser.add_argument("--scale", type=int, default=10)
+    args = parser.parse_args()
+
+    with StubGoogleServer() as server:
+        url = server.add_csv("schedule", scaled_schedule(args.scale))
+        print(f"{'scenario':<34} {'first ms':>9} {'then ms':>9} {'total s':>8} {'requests':>9}  caller got")
+
+        # healthy warm-up: leaves a parsed copy in memory and a snapshot on disk
+        fetcher = ConditionalFetcher()
+        fetcher.get(url, read_csv_bytes)
+
+        server.latency = args.hang
+        for label, fetch in (
+            ("slow, bare urlopen", lambda: bare(url, args.hang)),
+            ("slow, fetch layer", lambda: fetcher.get(url, read_csv_bytes)[0]),
+        ):
+            server.hits.clear()
+            times, outcome = series(fetch, min(args.fetches, 3) if "bare" in label else args.fetches)
+            time.sleep(args.hang)  # the stub counts a request once its delay is over
+            report(label, times, outcome, sum(server.hits.values()))
+        server.latency = 0.0
+        upstream.breaker(url).success()
+
+        server.fail_status = 503
+        for label, fetch in (
+            ("outage, bare urlopen", lambda: bare(url, args.hang)),
+            ("outage, fetch layer", lambda: fetcher.get(url, read_csv_bytes)[0]),
+        ):
+            server.hits.clear()
+            times, outcome = series(fetch, args.fetches)
+            report(label, times, outcome, sum(server.hits.values()))
+        upstream.breaker(url).success()
+
+        for label, keep in (("restart in outage, no snapshot", False), ("restart in outage, snapshot", True)):
+            if not keep:
+                saved = SNAPSHOTS + ".saved"
+                shutil.copytree(SNAPSHOTS, saved)
+                shutil.rmtree(SNAPSHOTS)
+            fresh = ConditionalFetcher()
+            server.hits.clear()
+            times, outcome = series(lambda: fresh.get(url, read_csv_bytes)[0], args.fetches)
+            report(label, times, outcome, sum(server.hits.values()))
+            if not keep:
+                shutil.move(saved, SNAPSHOTS)
+            upstream.breaker(url).success()
+        print(f"\nupstream: {upstream.stats()['retries']} retries, {upstream.stats()['short_circuits']} short circuits")
+    shutil.rmtree(SNAPSHOTS, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
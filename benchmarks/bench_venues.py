@@ -0,0 +1,139 @@
+"""
+Many venues in one process: page isolation, the cache budget and eviction.
+
+Usage (from the repo root):
+  python benchmarks/bench_venues.py
+  python benchmarks/bench_venues.py --venues 40 --max-active 8 --budget-mb 4 --latency 0.05
+
+Generates a venues.json with `--venues` rooms, each with its own published
+schedule, gviz leaderboard, jackpot and player-count CSVs on a local stub of the
+Google endpoints, and points VENUES_PATH / STORE_PATH at throwaway files. Every
+venue is then visited in turn (a fresh AppTest session with ?venue=<id>), twice
+round, followed by repeat visits to a small hot set. Reported:
+  cold / warm visit   wall time of a visit that opened the venue / found it active
+  foreign fetches     page-load requests (schedule, leaderboard) for any venue
+                      other than the one being visited; must be 0
+  active, bytes       the registry after the run, against --max-active / --budget-mb
+  evicted             venues closed to stay within the limits
+  sync threads        store-sync threads still running (one per active venue)
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+
+import pandas as pd  # noqa: E402
+
+from fixtures import scaled_player_counts, scaled_schedule, synthetic_leaderboard  # noqa: E402
+from stubs import StubGoogleServer, redirect_google_docs  # noqa: E402
+
+
+def write_config(server: StubGoogleServer, path: str, count: int, scale: int, players: int) -> list:
+    venues = []
+    for i in range(count):
+        venue_id = f"room{i:02d}"
+        # distinct content per venue, so nothing is shared by content hash either
+        schedule = pd.read_csv(io.StringIO(scaled_schedule(scale)), dtype=str)
+        schedule["notes"] = schedule["notes"] + f" @ {venue_id}"
+        server.add_published(f"doc-{venue_id}", schedule.to_csv(index=False))
+        server.add_gviz(f"sheet-{venue_id}", "Leaderboard", synthetic_leaderboard(players, seed=i))
+        venues.append({
+            "id": venue_id,
+            "name": f"Room {i}",
+            "schedule_csv_url": f"https://docs.google.com/spreadsheets/d/e/doc-{venue_id}/pub?output=csv",
+            "leaderboard_sheet_id": f"sheet-{venue_id}",
+            "jackpot_csv_url": server.add_csv(f"jackpot-{venue_id}", f"{1000 + i}"),
+            "player_counts_csv_url": server.add_csv(f"counts-{venue_id}", scaled_player_counts(scale, seed=i)),
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"default": venues[0]["id"], "venues": venues}, f)
+    return [v["id"] for v in venues]
+
+
+def page_hits(server: StubGoogleServer) -> dict:
+    """Schedule / leaderboard requests so far, per venue id."""
+    out = {}
+    for kind, n in server.hits.items():
+        for tag in ("pub doc-", "gviz sheet-"):
+            if kind.startswith(tag):
+                venue_id = kind[len(tag):].split("/")[0]
+                out[venue_id] = out.get(venue_id, 0) + n
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--venues", type=int, default=30)
+    parser.add_argument("--max-active", type=int, default=8, help="VENUE_CACHE_MAX")
+    parser.add_argument("--budget-mb", type=float, default=64, help="VENUE_CACHE_MB")
+    parser.add_argument("--scale", type=int, default=5, help="copies of each schedule.csv row")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub latency per request (s)")
+    parser.add_argument("--hot", type=int, default=4, help="venues revisited at the end")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-venues-")
+    # before upstream.py is imported: no snapshots from an earlier run
+    os.environ["SNAPSHOT_DIR"] = os.path.join(workdir, "snapshots")
+    with StubGoogleServer(latency=args.latency) as server, redirect_google_docs(server):
+        ids = write_config(server, os.path.join(workdir, "venues.json"), args.venues, args.scale, args.players)
+        os.environ.update({
+            "VENUES_PATH": os.path.join(workdir, "venues.json"),
+            "STORE_PATH": os.path.join(workdir, "store.db"),
+            "VENUE_CACHE_MAX": str(args.max_active),
+            "VENUE_CACHE_MB": str(args.budget_mb),
+            # only the first pull of each venue; keeps the request counts readable
+            "STORE_SYNC_INTERVAL": "3600",
+        })
+        from streamlit.testing.v1 import AppTest
+        from venues import get_registry
+
+        cold, warm, foreign = [], [], 0
+        peak_bytes = 0
+        visits = ids + ids + ids[-args.hot:] * 3
+        for venue_id in visits:
+            was_active = venue_id in get_registry().stats()["venue_bytes"]
+            before = page_hits(server)
+            at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+            at.query_params["venue"] = venue_id
+            start = time.perf_counter()
+            at.run()
+            wall = (time.perf_counter() - start) * 1000
+            if at.exception:
+                raise RuntimeError(f"{venue_id}: app raised: {at.exception[0].value}")
+            after = page_hits(server)
+            foreign += sum(n - before.get(v, 0) for v, n in after.items() if v != venue_id)
+            (warm if was_active else cold).append(wall)
+            peak_bytes = max(peak_bytes, get_registry().stats()["bytes"])
+
+        stats = get_registry().stats()
+        time.sleep(0.2)  # let stopped sync threads wind down
+        sync_threads = sum(1 for t in threading.enumerate() if t.name.startswith("store-sync"))
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"{args.venues} venues, {len(visits)} visits, VENUE_CACHE_MAX={args.max_active}, "
+          f"VENUE_CACHE_MB={args.budget_mb:g}, stub latency {args.latency * 1000:.0f} ms")
+    print(f"cold visit p50 {statistics.median(cold):.0f} ms  ({len(cold)} visits)")
+    if warm:
+        print(f"warm visit p50 {statistics.median(warm):.0f} ms  ({len(warm)} visits)")
+    print(f"foreign fetches {foreign}")
+    print(f"active {stats['active']} of {stats['configured']}, opened {stats['opened']}, evicted {stats['evicted']}")
+    print(f"cached bytes {stats['bytes'] / 2**20:.1f} MiB now, {peak_bytes / 2**20:.1f} MiB peak "
+          f"(budget {args.budget_mb:g} MiB), {stats['bytes'] / max(stats['active'], 1) / 2**10:.0f} KiB per venue")
+    print(f"sync threads {sync_threads}")
+    print(f"process max RSS {max_rss / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
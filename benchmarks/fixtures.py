@@ -0,0 +1,59 @@
+"""
+Scaled-up fixture CSVs for benchmarks, built from the repo's own sample files.
+
+  scaled_schedule(scale)        schedule.csv with every row repeated `scale` times
+                                (distinct start times and names, same columns)
+  scaled_player_counts(scale)   player_counts.csv spread over this week and the
+                                scaled tournament names
+  synthetic_leaderboard(players) a season-sized Series leaderboard
+
+All return CSV text, ready for `StubGoogleServer.add_csv` / `add_gviz` / `add_published`.
+"""
+import io
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the default venue's ids in venues.json, served by the stub (add_published / add_gviz)
+SCHEDULE_DOC = "2PACX-1vSeHdpSUFfU2_Lh0dGgWUc9O8lAD_wn0K_jLCoHoQh4JXWsKDGh4A6tI47YnpHMD-vDdNEWYNgmFLxy"
+LEADERBOARD_SHEET_ID = "12x_dVrPBrbaETwI2G1EedcsLdRw3rNv0JD0G75MKzrg"
+
+
+def scaled_schedule(scale: int = 1) -> str:
+    base = pd.read_csv(os.path.join(ROOT, "schedule.csv"), dtype=str)
+    if scale <= 1:
+        return base.to_csv(index=False)
+    copies = []
+    for i in range(scale):
+        copy = base.copy()
+        start = pd.to_datetime(copy["time"], format="%H:%M") + pd.Timedelta(minutes=5 * i)
+        copy["time"] = start.dt.strftime("%H:%M")
+        copy["notes"] = copy["notes"] + f" (flight {i + 1})"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True).to_csv(index=False)
+
+
+def scaled_player_counts(scale: int = 1, seed: int = 7) -> str:
+    schedule = pd.read_csv(io.StringIO(scaled_schedule(scale)), dtype=str)
+    rng = np.random.default_rng(seed)
+    today = datetime.now(timezone.utc).date()
+    monday = today - timedelta(days=today.weekday())
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    return pd.DataFrame({
+        "date": [(monday + timedelta(days=days.index(d) if d in days else 0)).isoformat() for d in schedule["day"]],
+        "tournament": schedule["notes"].str.slice(0, 40),
+        "players": rng.integers(0, 60, len(schedule)),
+    }).to_csv(index=False)
+
+
+def synthetic_leaderboard(players: int = 500, seed: int = 5) -> str:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Player": [f"Player {i}" for i in range(players)],
+        "Points": rng.integers(0, 5000, players),
+        "Events": rng.integers(1, 40, players),
+        "Wins": rng.integers(0, 10, players),
+    }).to_csv(index=False)
@@ -0,0 +1,346 @@
+"""
+Local stand-ins for the Google endpoints the app talks to, for benchmarks.
+
+`StubGoogleServer` serves, on 127.0.0.1 with a configurable per-request latency:
+  - POST /token                                  fake OAuth token exchange
+  - GET  /v4/spreadsheets/<id>                    Sheets API spreadsheet metadata
+  - GET  /v4/spreadsheets/<id>/values/<range>     Sheets API values
+  - POST /v4/spreadsheets/<id>/values/<range>:append
+  - POST /v4/spreadsheets/<id>:batchUpdate        (add sheet; other requests are acknowledged)
+  - POST /v4/spreadsheets                         create a spreadsheet with its tabs
+  - PUT  /v4/spreadsheets/<id>/values/<range>     values update
+  - POST /v4/spreadsheets/<id>/values:batchUpdate
+  - GET  /v4/spreadsheets/<id>/values:batchGet
+  - GET  /drive/v3/files                          list spreadsheets (name = '...' filter)
+  - POST /drive/v3/files                          create a spreadsheet (gspread's Client.create)
+  - GET / POST /drive/v3/files/<id>/permissions
+  - GET  /csv/<name>                              published CSV (ETag / 304 aware)
+  - GET  /spreadsheets/d/<id>/gviz/tq?sheet=<tab>  gviz CSV export of a tab
+  - GET  /spreadsheets/d/e/<id>/pub?output=csv     "publish to web" CSV
+
+Every request is counted in `server.hits` by path kind, so benchmarks can report
+how many upstream round trips a code path costs. `redirect_google_docs(server)`
+points urllib requests (and upstream.py's fetches) for docs.google.com at the
+stub, so the default venue's schedule and leaderboard URLs can be served without
+editing venues.json.
+"""
+import json
+import threading
+import time
+import urllib.request
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+SHEETS_HOST = "https://sheets.googleapis.com"
+DRIVE_HOST = "https://www.googleapis.com"
+DOCS_HOST = "https://docs.google.com"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # buffer headers + body into one segment so keep-alive timings aren't skewed by Nagle
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, obj, status: int = 200):
+        self._send(status, json.dumps(obj).encode())
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _sheet(self, sheet_id: str) -> dict:
+        return self.server.sheets.setdefault(sheet_id, {"title": sheet_id, "tabs": {"Sheet1": [[]]}})
+
+    def _metadata(self, sheet_id: str) -> dict:
+        sheet = self._sheet(sheet_id)
+        tabs = [
+            {"properties": {"title": t, "sheetId": i, "index": i, "gridProperties": {"rowCount": max(len(v), 1000), "columnCount": 26}}}
+            for i, (t, v) in enumerate(sheet["tabs"].items())
+        ]
+        return {"spreadsheetId": sheet_id, "properties": {"title": sheet["title"]}, "sheets": tabs}
+
+    def _route(self, method: str):
+        time.sleep(self.server.latency)
+        parsed = urlparse(self.path)
+        path = unquote(parsed.path)
+        if path == "/token":
+            self.server.count("token")
+            self._read_body()
+            return self._json({"access_token": "stub-token", "expires_in": 3600})
+        if path.startswith("/csv/") or path.startswith("/spreadsheets/d/"):
+            name = self.server.csv_name(path, parse_qs(parsed.query))
+            self.server.count(f"csv {name}")
+            if self.server.fail_status:
+                return self._send(self.server.fail_status, b"unavailable", "text/plain")
+            body = self.server.csvs.get(name)
+            if body is None:
+                return self._send(404, b"not found", "text/plain")
+            etag = f'"{hash(body) & 0xffffffff:x}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, b"", "text/csv", {"ETag": etag})
+            return self._send(200, body, "text/csv", {"ETag": etag})
+        if path.startswith("/drive/v3/files"):
+            return self._drive(method, path[len("/drive/v3/files"):].strip("/"), parse_qs(parsed.query))
+        if path == "/v4/spreadsheets" and method == "POST":
+            self.server.count("create")
+            body = self._read_body()
+            sheet_id = self.server.new_sheet(body["properties"]["title"], [s["properties"]["title"] for s in body.get("sheets", [])] or ["Sheet1"])
+            return self._json(self._metadata(sheet_id))
+        if path.startswith("/v4/spreadsheets/"):
+            rest = path[len("/v4/spreadsheets/"):]
+            if method == "POST" and rest.endswith("/values:batchUpdate"):
+                self.server.count("values_batch_update")
+                sheet_id = rest[: -len("/values:batchUpdate")]
+                data = self._read_body().get("data", [])
+                for item in data:
+                    self._write(sheet_id, item["range"], item["values"])
+                return self._json({"spreadsheetId": sheet_id, "totalUpdatedSheets": len(data)})
+            if rest.endswith("/values:batchGet"):
+                self.server.count("values_batch_get")
+                sheet_id = rest[: -len("/values:batchGet")]
+                ranges = parse_qs(parsed.query).get("ranges", [])
+                tabs = self._sheet(sheet_id)["tabs"]
+                out = [{"range": r, "values": [row for row in tabs.get(r.split("!")[0].strip("'").replace("''", "'"), [])[:2] if row]} for r in ranges]
+                return self._json({"spreadsheetId": sheet_id, "valueRanges": [{k: v for k, v in r.items() if v != []} for r in out]})
+            if method == "POST" and rest.endswith(":batchUpdate"):
+                self.server.count("batch_update")
+                sheet_id = rest[: -len(":batchUpdate")]
+                body = self._read_body()
+                replies = []
+                for req in body.get("requests", []):
+                    if "addSheet" in req:
+                        title = req["addSheet"]["properties"]["title"]
+                        self._sheet(sheet_id)["tabs"].setdefault(title, [])
+                        replies.append({"addSheet": {"properties": self._metadata(sheet_id)["sheets"][-1]["properties"]}})
+                    elif "title" in req.get("updateSheetProperties", {}).get("properties", {}):
+                        # rename a tab (Worksheet.update_title); sheetId is the tab's index here
+                        properties = req["updateSheetProperties"]["properties"]
+                        tabs = self._sheet(sheet_id)["tabs"]
+                        items = list(tabs.items())
+                        _old, rows = items[properties.get("sheetId", 0)]
+                        items[properties.get("sheetId", 0)] = (properties["title"], rows)
+                        tabs.clear()
+                        tabs.update(items)
+                        replies.append({})
+                    else:
+                        replies.append({})
+                return self._json({"spreadsheetId": sheet_id, "replies": replies})
+            if "/values/" in rest:
+                sheet_id, rng = rest.split("/values/", 1)
+                append = rng.endswith(":append")
+                rng = rng[: -len(":append")] if append else rng
+                tab = rng.split("!")[0].strip("'")
+                rows = self._sheet(sheet_id)["tabs"].setdefault(tab, [])
+                if method == "POST" and append:
+                    self.server.count("values_append")
+                    rows.extend(self._read_body().get("values", []))
+                    return self._json({"spreadsheetId": sheet_id, "updates": {"updatedRows": len(rows)}})
+                if method == "PUT":
+                    self.server.count("values_update")
+                    self._write(sheet_id, rng, self._read_body().get("values", []))
+                    return self._json({"spreadsheetId": sheet_id, "updatedRange": rng})
+                self.server.count("values_get")
+                values = rows
+                cells = rng.split("!")[1] if "!" in rng else ""
+                col = cells.split(":")[0].rstrip("0123456789")
+                if col:
+                    # single-column reads like 'tab'!F1:F (Worksheet.col_values)
+                    idx = ord(col[-1]) - ord("A")
+                    values = [[r[idx] if idx < len(r) else "" for r in rows]]
+                elif "COLUMNS" in parsed.query:
+                    values = [list(c) for c in zip(*rows)]
+                return self._json({"range": rng, "majorDimension": "ROWS", "values": values})
+            self.server.count("metadata")
+            return self._json(self._metadata(rest))
+        self.server.count("other")
+        return self._send(404, b"not found", "text/plain")
+
+    def _write(self, sheet_id: str, rng: str, values: list) -> None:
+        # writes start at A1 (or at the range's first row), which is all the callers use
+        tab, _, cells = rng.partition("!")
+        rows = self._sheet(sheet_id)["tabs"].setdefault(tab.strip("'").replace("''", "'"), [])
+        start = int("".join(c for c in cells.split(":")[0] if c.isdigit()) or 1) - 1
+        while len(rows) < start + len(values):
+            rows.append([])
+        for i, row in enumerate(values):
+            rows[start + i] = [str(v) for v in row]
+
+    def _drive(self, method: str, rest: str, query: dict):
+        if not rest:
+            if method == "POST":
+                self.server.count("drive_create")
+                sheet_id = self.server.new_sheet(self._read_body()["name"], ["Sheet1"])
+                return self._json({"id": sheet_id, "name": self.server.sheets[sheet_id]["title"]})
+            self.server.count("drive_list")
+            q = query.get("q", [""])[0]
+            name = q.split("name = '", 1)[1][:-1].replace("\\'", "'") if "name = '" in q else None
+            files = [
+                {"id": sid, "name": sheet["title"], "createdTime": sheet.get("created", "")}
+                for sid, sheet in self.server.sheets.items() if name is None or sheet["title"] == name
+            ]
+            return self._json({"files": files})
+        sheet_id, _, what = rest.partition("/")
+        permissions = self._sheet(sheet_id).setdefault("permissions", [])
+        if what == "permissions" and method == "POST":
+            self.server.count("share")
+            permission = {k: v for k, v in self._read_body().items() if k in ("type", "role", "emailAddress")}
+            permissions.append(permission)
+            return self._json(permission)
+        if what == "permissions":
+            self.server.count("permissions_list")
+            return self._json({"permissions": permissions})
+        self.server.count("other")
+        return self._send(404, b"not found", "text/plain")
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+
+class StubGoogleServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # load tests open hundreds of connections at once
+    request_queue_size = 512
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        # set to e.g. 503 to make every CSV request fail (outage simulations)
+        self.fail_status = None
+        self.sheets = {}
+        self.csvs = {}
+        self.hits = Counter()
+        self._hits_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, kind: str) -> None:
+        with self._hits_lock:
+            self.hits[kind] += 1
+
+    def add_sheet(self, sheet_id: str, tabs: dict, title: str = "Stub Sheet") -> None:
+        """Register a spreadsheet: tabs is {tab name: list of rows (first row = headers)}."""
+        self.sheets[sheet_id] = {"title": title, "tabs": {k: [list(map(str, r)) for r in v] for k, v in tabs.items()}}
+
+    def new_sheet(self, title: str, tabs: list) -> str:
+        """Create an empty spreadsheet (as the create endpoints do) and return its id."""
+        with self._hits_lock:
+            sheet_id = f"stub-{len(self.sheets) + 1}"
+            self.sheets[sheet_id] = {"title": title, "tabs": {t: [] for t in tabs}, "created": f"{time.time():.6f}"}
+        return sheet_id
+
+    def add_csv(self, name: str, text: str) -> str:
+        """Publish `text` at /csv/<name> and return its URL."""
+        self.csvs[name] = text.encode("utf-8")
+        return f"{self.base_url}/csv/{name}"
+
+    def add_gviz(self, sheet_id: str, tab: str, text: str) -> None:
+        """Serve `text` as the gviz CSV export of `tab` in `sheet_id`."""
+        self.csvs[f"gviz {sheet_id}/{tab}"] = text.encode("utf-8")
+
+    def add_published(self, doc_id: str, text: str) -> None:
+        """Serve `text` as the published ("pub?output=csv") CSV of `doc_id`."""
+        self.csvs[f"pub {doc_id}"] = text.encode("utf-8")
+
+    @staticmethod
+    def csv_name(path: str, query: dict) -> str:
+        if path.startswith("/csv/"):
+            return path[len("/csv/"):]
+        doc_id = path[len("/spreadsheets/d/"):].split("/")
+        if "gviz" in doc_id:
+            return f"gviz {doc_id[0]}/{query.get('sheet', [''])[0]}"
+        # /spreadsheets/d/e/<id>/pub
+        return f"pub {doc_id[1] if doc_id[0] == 'e' else doc_id[0]}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def install_docs_redirect(base_url: str) -> None:
+    """Route this process's urllib requests for docs.google.com to a stub at `base_url`."""
+
+    class Rewrite(urllib.request.BaseHandler):
+        # runs before the protocol handler is picked, so the https URL becomes plain http
+        handler_order = 100
+
+        def https_request(self, request):
+            if request.full_url.startswith(DOCS_HOST):
+                request.full_url = base_url + request.full_url[len(DOCS_HOST):]
+            return request
+
+    urllib.request.install_opener(urllib.request.build_opener(Rewrite()))
+    # the app's fetches go through upstream.py's own opener
+    from upstream import upstream
+    upstream.set_handlers(Rewrite())
+
+
+@contextmanager
+def redirect_google_docs(server: StubGoogleServer):
+    """Route urllib requests for docs.google.com to the stub for the duration of the block."""
+    install_docs_redirect(server.base_url)
+    try:
+        yield server
+    finally:
+        urllib.request.install_opener(None)
+        from upstream import upstream
+        upstream.set_handlers()
+
+
+def stub_credentials(server: StubGoogleServer, lifetime: int = 3600):
+    """google-auth credentials whose token exchange is a round trip to the stub server."""
+    from google.auth.credentials import Credentials
+
+    class StubCredentials(Credentials):
+        def refresh(self, request):
+            request(url=f"{server.base_url}/token", method="POST", body=b"{}")
+            self.token = "stub-token"
+            self.expiry = datetime.utcnow() + timedelta(seconds=lifetime)
+
+    return StubCredentials()
+
+
+def stub_session(server: StubGoogleServer, credentials):
+    """An AuthorizedSession whose Sheets and Drive API calls are routed to the stub server."""
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    class RewriteAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            for host in (SHEETS_HOST, DRIVE_HOST):
+                request.url = request.url.replace(host, server.base_url, 1)
+            return super().send(request, **kwargs)
+
+    session = AuthorizedSession(credentials)
+    session.mount(SHEETS_HOST, RewriteAdapter())
+    session.mount(DRIVE_HOST, RewriteAdapter())
+    return session
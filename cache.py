@@ -0,0 +1,156 @@
+"""Process-wide caches shared by every Streamlit session.
+
+Streamlit re-executes `app.py` on every interaction, but imported modules stay in
+`sys.modules`, so objects kept here live for the whole server process.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class SWRCache:
+	"""TTL cache that serves stale entries while refreshing them in the background.
+
+	A fresh entry is returned as-is (hit). A stale entry is returned immediately and
+	a single background thread re-runs its loader (stale hit + refresh). A missing
+	entry is loaded synchronously (miss). Failed refreshes keep the last good value.
+	"""
+
+	def __init__(self, ttl: float = 300.0, name: str = "cache", error_ttl: float = 30.0):
+		self.ttl = ttl
+		self.name = name
+		# after a failed refresh, wait this long before trying the upstream again
+		self.error_ttl = error_ttl
+		self._entries = {}  # key -> [value, fetched_at]
+		self._refreshing = set()
+		self._lock = threading.Lock()
+		self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+		self.last_error = None
+
+	def get(self, key, loader, ttl: float | None = None):
+		"""Return the cached value for `key`, using `loader()` to fetch it.
+
+		Exceptions from `loader` propagate only on a miss, when there is no previous
+		value to fall back to.
+		"""
+		ttl = self.ttl if ttl is None else ttl
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				value, fetched_at = entry
+				if time.monotonic() - fetched_at < ttl:
+					self._counters["hits"] += 1
+					return value
+				self._counters["stale_hits"] += 1
+				if key not in self._refreshing:
+					self._refreshing.add(key)
+					threading.Thread(
+						target=self._refresh, args=(key, loader, ttl),
+						name=f"{self.name}-refresh", daemon=True,
+					).start()
+				return value
+			self._counters["misses"] += 1
+		value = loader()
+		self.set(key, value)
+		return value
+
+	def set(self, key, value) -> None:
+		"""Store `value` as the fresh copy for `key`."""
+		with self._lock:
+			self._entries[key] = [value, time.monotonic()]
+
+	def peek(self, key):
+		"""Return the last good value for `key` (fresh or stale), or None."""
+		with self._lock:
+			entry = self._entries.get(key)
+			return entry[0] if entry is not None else None
+
+	def invalidate(self, key=None) -> None:
+		"""Drop one entry, or every entry when `key` is None."""
+		with self._lock:
+			if key is None:
+				self._entries.clear()
+			else:
+				self._entries.pop(key, None)
+
+	def values(self) -> list:
+		"""Every cached value, fresh or stale."""
+		with self._lock:
+			return [entry[0] for entry in self._entries.values()]
+
+	def stats(self) -> dict:
+		"""Return a copy of the hit/miss/refresh counters plus the entry count."""
+		with self._lock:
+			out = dict(self._counters)
+			out["entries"] = len(self._entries)
+		return out
+
+	def _refresh(self, key, loader, ttl: float) -> None:
+		try:
+			value = loader()
+		except Exception as e:
+			self.last_error = e
+			print(f"{self.name}: background refresh of {key!r} failed, serving last good copy: {e}")
+			with self._lock:
+				self._counters["refresh_errors"] += 1
+				entry = self._entries.get(key)
+				if entry is not None:
+					# keep serving the old value; retry after error_ttl instead of on every rerun
+					entry[1] = time.monotonic() - ttl + min(self.error_ttl, ttl)
+		else:
+			self.set(key, value)
+			with self._lock:
+				self._counters["refreshes"] += 1
+		finally:
+			with self._lock:
+				self._refreshing.discard(key)
+
+
+class LRU:
+	"""Bounded, thread-safe LRU of values built from fetched data (card HTML, boards, weeks)."""
+
+	def __init__(self, maxsize: int):
+		self.maxsize = maxsize
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+		self._counters = {"hits": 0, "misses": 0, "stores": 0}
+
+	def get(self, key):
+		"""The value for `key`, marked most recently used; None on a miss."""
+		with self._lock:
+			value = self._entries.get(key)
+			if value is None:
+				self._counters["misses"] += 1
+				return None
+			self._entries.move_to_end(key)
+			self._counters["hits"] += 1
+			return value
+
+	def put(self, key, value) -> None:
+		with self._lock:
+			self._entries[key] = value
+			self._entries.move_to_end(key)
+			self._counters["stores"] += 1
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+
+	def values(self) -> list:
+		with self._lock:
+			return list(self._entries.values())
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+	def __len__(self) -> int:
+		with self._lock:
+			return len(self._entries)
+
+	def stats(self) -> dict:
+		with self._lock:
+			return dict(self._counters, entries=len(self._entries))
+
+
+# shared schedule cache; SCHEDULE_CACHE_TTL is in seconds
+schedule_cache = SWRCache(ttl=float(os.environ.get("SCHEDULE_CACHE_TTL", 300)), name="schedule")
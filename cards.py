@@ -0,0 +1,89 @@
+"""Render-once HTML for the tournament cards on the Home and Poker Schedule tabs.
+
+A day's cards are built as a single HTML block and memoized by a hash of that
+day's rows plus everything else that shows up in the markup (today's name, the
+card's date label and the pre-register link). Unchanged days are served from the
+cache on every rerun; when the schedule changes only the affected days hash
+differently and get rebuilt. Old entries age out of the bounded LRU, and
+sessions that miss on the same key together build it once (singleflight.py).
+"""
+import hashlib
+
+import pandas as pd
+
+from cache import LRU
+from profiler import timed
+from singleflight import flights
+
+PRE_REGISTER_BUTTON = '<a href="{url}" target="_blank"><button style="background: linear-gradient(90deg,#003366,#004080); color: #ffffff; border: 2px solid #FFD700; padding: 10px 20px; border-radius: 20px; font-weight:700; box-shadow: 0 4px 12px rgba(0,0,0,0.3); transition: all 0.2s ease; position: relative; overflow: hidden; margin-top: 10px;">Pre-register</button></a>'
+
+_MAX_ENTRIES = 512
+_cache = LRU(_MAX_ENTRIES)
+
+
+def rows_hash(group: pd.DataFrame) -> str:
+	"""Content hash of a frame's rows and column names (index ignored)."""
+	digest = hashlib.blake2b(digest_size=16)
+	digest.update("\x1f".join(map(str, group.columns)).encode())
+	digest.update(pd.util.hash_pandas_object(group, index=False).to_numpy().tobytes())
+	return digest.hexdigest()
+
+
+def _clean(value) -> str:
+	if value is None or (not isinstance(value, str) and pd.isna(value)) or value == 'nan':
+		return ''
+	return str(value)
+
+
+@timed("card_html")
+def card_html(row: dict, heading: str, pre_register_html: str) -> str:
+	"""One tournament card; `heading` is what precedes the tournament name."""
+	# notes holds the tournament name (see schedule_schema.normalize_schedule_df)
+	tournament_name = _clean(row.get('notes', '')).strip()
+	add_on_info = _clean(row.get('add_on', ''))
+	return f"""
+<div class="tournament-card">
+<div style='font-size:18px; font-weight:700'>🎴 {heading} — {tournament_name}</div>
+<div style='margin-top:6px; line-height:1.6;'>
+Buy-in: <strong>{row.get('buy_in','')}</strong><br>
+Starting chips: <strong>{row.get('starting_chips','N/A')}</strong><br>
+Re-buy: <strong>{row.get('rebuy','No')}</strong><br>
+{'Add-on: <strong>' + add_on_info + '</strong><br>' if add_on_info else ''}Cutoff: <strong>{row.get('cutoff','N/A')}</strong>
+</div>
+{pre_register_html}
+</div>
+"""
+
+
+@timed("day_cards_html")
+def day_cards_html(day: str, group: pd.DataFrame, today_name: str, form_url: str | None, date_label: str | None = None, rows_key: str | None = None, cache: LRU | None = None) -> str:
+	"""All of one day's cards as one HTML block.
+
+	Without `date_label` cards are headed by start time (Home tab); with it they
+	are headed "<day>, <date_label> - <time>" (Poker Schedule tab). `rows_key` is
+	`rows_hash(group)` when the caller already has it (see week.py). `cache` is
+	the LRU to memoize in (a venue's own, see venues.py); default the module's.
+	"""
+	cache = _cache if cache is None else cache
+	key = (rows_key or rows_hash(group), day, today_name, date_label, form_url)
+	html = cache.get(key)
+	if html is not None:
+		return html
+	# sessions that miss together build it once
+	html = flights.do(("cards", *key), lambda: _build(day, group, today_name, form_url, date_label))
+	cache.put(key, html)
+	return html
+
+
+def _build(day: str, group: pd.DataFrame, today_name: str, form_url: str | None, date_label: str | None) -> str:
+	# Show Pre-register link only on the actual tournament day
+	pre_register_html = PRE_REGISTER_BUTTON.format(url=form_url) if day == today_name and form_url else ""
+	parts = []
+	for row in group.to_dict("records"):
+		heading = row.get('time', '') if date_label is None else f"{day}, {date_label} - {row.get('time', '')}"
+		parts.append(card_html(row, heading, pre_register_html))
+	return "".join(parts)
+
+
+def stats() -> dict:
+	return _cache.stats()
@@ -0,0 +1,114 @@
+"""Typed columnar snapshots of parsed frames, as Arrow IPC files memory-mapped on read.
+
+The sync layer (sync.py) keeps one next to each raw body snapshot (upstream.py)
+after every fetch that changed a source, so a process that starts up, or a
+source that is down, gets the parsed frame back without parsing CSV again.
+
+A snapshot is one uncompressed Arrow IPC file (the Feather v2 format), written
+with pyarrow from the frame's own dtypes: the schedule's typed start minutes,
+buy-in amounts and chip counts (see schedule_schema.py) stay typed. The frame's
+attrs and the caller's metadata (body digest, URL) go in the schema metadata.
+
+Files are opened with `memory_map=True`. Integer and float columns without
+missing values come back as NumPy views of the mapping (`to_numpy(zero_copy_only=True)`;
+`Table.to_pandas` would copy them), so worker processes on one dyno share their
+pages in the OS page cache; text columns are converted to Python strings, which
+is cheaper than parsing CSV but is a copy in each process.
+
+A snapshot is written under a temporary name and renamed into place, so a
+reader sees the old file or the new one, and a process that has the old one
+mapped keeps it until it lets go.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+_META_KEY = b"bigslick"
+
+
+class UnsupportedColumn(TypeError):
+	"""A column Arrow can't hold as is (e.g. objects of mixed types)."""
+
+
+def _read_meta(schema: pa.Schema) -> dict | None:
+	try:
+		return json.loads(schema.metadata[_META_KEY])
+	except (TypeError, KeyError, ValueError):
+		return None
+
+
+def save(path: str, df: pd.DataFrame, **meta) -> None:
+	"""Write `df` as the snapshot at `path`, with `meta` (e.g. `digest=`) beside it.
+
+	Does nothing if a snapshot with the same metadata is there (another worker wrote it).
+	Raises UnsupportedColumn for frames Arrow can't hold, OSError on write failures.
+	"""
+	current = _load_meta(path)
+	if current is not None and current["meta"] == meta:
+		return
+	try:
+		table = pa.Table.from_pandas(df)
+	except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+		raise UnsupportedColumn(str(e)) from e
+	attrs = {k: v for k, v in df.attrs.items() if isinstance(v, (str, int, float, bool))}
+	extra = json.dumps({"attrs": attrs, "meta": meta}).encode("utf-8")
+	table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: extra})
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+	# uncompressed and one record batch: only a single uncompressed chunk maps as one array
+	feather.write_feather(table.combine_chunks(), tmp, compression="uncompressed", chunksize=max(1, table.num_rows))
+	os.replace(tmp, path)
+
+
+def _load_meta(path: str) -> dict | None:
+	try:
+		with pa.memory_map(path) as source:
+			return _read_meta(pa.ipc.open_file(source).schema)
+	except (OSError, pa.ArrowInvalid):
+		return None
+
+
+def load(path: str, **expect) -> tuple[pd.DataFrame, dict] | None:
+	"""The snapshot at `path` as (frame, caller metadata), or None.
+
+	None when there is no snapshot, it is not one of ours, or its metadata
+	differs from `expect` (e.g. `digest=`).
+	"""
+	try:
+		table = feather.read_table(path, memory_map=True)
+	except (OSError, pa.ArrowInvalid):
+		return None
+	extra = _read_meta(table.schema)
+	if extra is None or any(extra["meta"].get(k) != v for k, v in expect.items()):
+		return None
+	pandas_meta = table.schema.pandas_metadata or {}
+	index_columns = pandas_meta.get("index_columns", [])
+	names = {c["field_name"]: c["name"] for c in pandas_meta.get("columns", [])}
+	data = {name: _values(table.column(name)) for name in table.column_names if name not in index_columns}
+	index = pd.RangeIndex(table.num_rows)
+	if index_columns and isinstance(index_columns[0], str):
+		index = pd.Index(_values(table.column(index_columns[0])), name=names.get(index_columns[0]))
+	elif index_columns:
+		spec = index_columns[0]
+		index = pd.RangeIndex(spec["start"], spec["stop"], spec["step"], name=spec.get("name"))
+	# copy=False: numeric columns stay views of the mapped file
+	df = pd.DataFrame(data, index=index, columns=list(data), copy=False)
+	df.attrs.update(extra["attrs"])
+	return df, extra["meta"]
+
+
+def _values(column: pa.ChunkedArray):
+	"""A column as a NumPy array: a view of the mapping where Arrow's layout allows it."""
+	kind = column.type
+	if column.num_chunks == 1 and not column.null_count and (pa.types.is_integer(kind) or pa.types.is_floating(kind)):
+		return column.chunk(0).to_numpy(zero_copy_only=True)
+	values = column.to_numpy()
+	if values.dtype == object and column.null_count:
+		# missing text reads as NaN, as read_csv gives it
+		values[pd.isna(values)] = np.nan
+	return values
@@ -5,7 +5,8 @@ Usage:
   1. Create a Google Cloud service account and download the JSON key file.
   2. Run: python create_jackpot_gsheet.py --credentials /path/to/service-account.json --initial_amount 1000
 
-This script uses `gspread`.
+This script uses `gspread`. It provisions the sheet through `provision.py`: a
+"Royal Flush Jackpot" sheet that already exists is left as it is.
 """
 import argparse
 import os
@@ -16,20 +17,16 @@ except Exception:
     print("Please install gspread: pip install gspread")
     raise
 
+from provision import provision_one
+
 
 def create_jackpot_sheet(credentials: str, initial_amount: str = "1000") -> str:
     """Create a Google Sheet for jackpot and set initial amount in A1. Returns the Sheet ID."""
     gc = gspread.service_account(filename=credentials)
-    # create a new spreadsheet
-    sh = gc.create("Royal Flush Jackpot")
-    # open the first worksheet
-    ws = sh.get_worksheet(0)
-    # set initial amount in A1
-    ws.update_cell(1, 1, initial_amount)
-    # make the sheet readable by anyone with link (optional)
-    sh.share(None, perm_type='anyone', role='reader')
-    print(f"Created jackpot sheet: {sh.url}")
-    return sh.id
+    # initial amount in A1, written with the create in one batched values call
+    result = provision_one(gc, "Royal Flush Jackpot", {"Sheet1": [[initial_amount]]})
+    print(f"{'Created' if result.action == 'created' else 'Found existing'} jackpot sheet: {result.url}")
+    return result.id
 
 
 if __name__ == '__main__':
@@ -6,34 +6,29 @@ Usage:
   2. Share the created Google Sheet with the service account email (or let the script create a new sheet under the service account's Drive).
   3. Run: python create_player_counts_gsheet.py --credentials /path/to/service-account.json --title "Bigslick Player Counts"
 
-This script uses `gspread` and `gspread-dataframe`.
+This script uses `gspread`. It provisions one sheet through `provision.py` (which
+sets up every venue and season from a manifest): a sheet with this title that
+already exists is left as it is.
 """
 import argparse
 import os
-import pandas as pd
 
 try:
     import gspread
-    from gspread_dataframe import set_with_dataframe
 except Exception:
-    print("Please install gspread and gspread-dataframe: pip install gspread gspread-dataframe")
+    print("Please install gspread: pip install gspread")
     raise
 
+from provision import provision_one
+
 
 def create_sheet(credentials: str, title: str = "Bigslick Player Counts") -> str:
     """Create a Google Sheet and populate it with player_counts_template.csv. Returns the Sheet ID."""
     gc = gspread.service_account(filename=credentials)
-    # create a new spreadsheet
-    sh = gc.create(title)
-    # open the first worksheet
-    ws = sh.get_worksheet(0)
-    # load template CSV
-    df = pd.read_csv('player_counts_template.csv')
-    set_with_dataframe(ws, df)
-    # make the sheet readable by anyone with link (optional)
-    sh.share(None, perm_type='anyone', role='reader')
-    print(f"Created sheet: {sh.url}")
-    return sh.id
+    # one create with the tab, one batched values write, one share (readable by anyone with the link)
+    result = provision_one(gc, title, {"Sheet1": 'player_counts_template.csv'})
+    print(f"{'Created' if result.action == 'created' else 'Found existing'} sheet: {result.url}")
+    return result.id
 
 
 if __name__ == '__main__':
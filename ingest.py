@@ -0,0 +1,236 @@
+"""Streaming ingestion of the append-only flat files into the store's aggregates.
+
+`registrations.csv` (one row per pre-register) and `player_counts.csv` (one row
+per count update) only grow. `CsvTail` reads a file from the byte offset it
+reached last time, in `INGEST_CHUNK_BYTES` chunks (default 1 MiB), through a
+generator pipeline:
+
+	read_chunks -> parse_rows -> fold -> Store.apply_ingest
+
+Each chunk ends on a complete row, is folded into a small delta (registrations
+per date/day/time, latest players per tournament date) and committed to the
+store in one transaction together with the new offset, so a crash never counts
+a row twice and memory holds one chunk whatever the history. A refresh with
+nothing appended costs a stat and a hash of the first 4 KiB; otherwise its time
+is proportional to the new rows.
+
+A file that shrank or whose first bytes changed was replaced, not appended to:
+its contribution (registration totals, or the player counts it set) is dropped
+and its offset restarted right away, before any of its rows are read, so a
+replacement that holds only a header, or a first row still being written,
+shows nothing of the old file and is not seen as replaced again next time.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INGEST_CHUNK_BYTES = int(os.environ.get("INGEST_CHUNK_BYTES", 1 << 20))
+
+# bytes hashed to recognise the same file on the next refresh
+_HEAD_BYTES = 4096
+# a last row without a newline counts as finished once the file is this old (s)
+_SETTLE_SECONDS = 2.0
+
+
+def read_chunks(f, offset: int, chunk_bytes: int = INGEST_CHUNK_BYTES, final: bool = False):
+	"""Yield (data, end offset) from `offset`, each chunk ending after a complete row.
+
+	A newline inside a quoted field never ends a chunk. A last row without its
+	newline is left for the next refresh (it may still be being written) unless
+	`final` says the file is finished.
+	"""
+	pos, carry = offset, b""
+	while True:
+		# seek every time: the caller may read the file between chunks
+		f.seek(pos)
+		block = f.read(chunk_bytes)
+		pos += len(block)
+		if not block:
+			if final and carry.strip():
+				yield carry, offset + len(carry)
+			return
+		data = carry + block
+		cut = _row_boundary(data)
+		if cut == 0:
+			# one row longer than a chunk: keep reading until it ends
+			carry = data
+			continue
+		offset += cut
+		carry = data[cut:]
+		yield data[:cut], offset
+
+
+def _row_boundary(data: bytes) -> int:
+	"""Length of the longest prefix of `data` that ends a CSV row, or 0."""
+	end = data.rfind(b"\n")
+	while end >= 0:
+		# an odd number of quotes before it means the newline is inside a field
+		if data.count(b'"', 0, end) % 2 == 0:
+			return end + 1
+		end = data.rfind(b"\n", 0, end)
+	return 0
+
+
+def parse_rows(chunks):
+	"""Yield (rows as lists of fields, end offset) for each chunk of `read_chunks`."""
+	for data, end in chunks:
+		reader = csv.reader(io.StringIO(data.decode("utf-8", errors="replace"), newline=""))
+		yield [row for row in reader if row], end
+
+
+def _pad(rows: list, width: int) -> list:
+	# rows shorter than the header read as "" for the missing fields
+	return [r + [""] * (width - len(r)) if len(r) < width else r for r in rows]
+
+
+def fold_registrations(batches, fields: list):
+	"""Yield ({(date, day, time): registrations}, rows, end offset) per batch."""
+	width = len(fields) + 1
+	fields = [*fields, ""]  # a missing column reads from the padding
+	ts, day, at = (fields.index(name) if name in fields else width - 1 for name in ("timestamp", "day", "time"))
+	for rows, end in batches:
+		try:
+			counts = Counter((r[ts][:10], r[day], r[at]) for r in rows)
+		except IndexError:
+			counts = Counter((r[ts][:10], r[day], r[at]) for r in _pad(rows, width))
+		yield counts, len(rows), end
+
+
+def fold_player_counts(batches, fields: list):
+	"""Yield ({(date, tournament): players}, rows, end offset) per batch; later rows win."""
+	width = len(fields) + 1
+	fields = [*fields, ""]
+	date, tournament, players = (fields.index(name) if name in fields else width - 1 for name in ("date", "tournament", "players"))
+	for rows, end in batches:
+		latest = {}
+		for r in _pad(rows, width):
+			if r[date] and r[tournament]:
+				latest[(r[date], r[tournament])] = _int(r[players])
+		yield latest, len(rows), end
+
+
+def _int(value) -> int:
+	try:
+		return int(float(value or 0))
+	except ValueError:
+		return 0
+
+
+FOLDS = {"registrations": fold_registrations, "player_counts": fold_player_counts}
+
+
+class CsvTail:
+	"""Incremental reader of one append-only CSV, resuming from the offset kept in the store."""
+
+	def __init__(self, store, path: str, kind: str, chunk_bytes: int = INGEST_CHUNK_BYTES):
+		self.store = store
+		self.path = path
+		self.kind = kind
+		self.fold = FOLDS[kind]
+		self.chunk_bytes = chunk_bytes
+		self.key = f"ingest:{os.path.basename(path)}"
+		self._lock = threading.Lock()
+		self._counters = {"refreshes": 0, "rows": 0, "bytes": 0, "chunks": 0, "resets": 0}
+		self.last_ms = 0.0
+
+	def state(self) -> dict | None:
+		raw = self.store.get_value(self.key)
+		return json.loads(raw) if raw else None
+
+	def skip_to_end(self) -> None:
+		"""Mark the file as read up to its current end (its rows are already counted)."""
+		try:
+			with open(self.path, "rb") as f:
+				header, start = self._header(f)
+				size = f.seek(0, os.SEEK_END)
+				self.store.set_value(self.key, json.dumps(self._state(f, header, max(size, start))))
+		except FileNotFoundError:
+			pass
+
+	def refresh(self) -> int:
+		"""Ingest rows appended since the last refresh; returns how many."""
+		with self._lock:
+			start = time.perf_counter()
+			try:
+				rows = self._refresh()
+			finally:
+				self.last_ms = (time.perf_counter() - start) * 1000
+			self._counters["refreshes"] += 1
+			self._counters["rows"] += rows
+			return rows
+
+	def _refresh(self) -> int:
+		try:
+			f = open(self.path, "rb")
+		except FileNotFoundError:
+			return 0
+		with f:
+			info = os.fstat(f.fileno())
+			size = info.st_size
+			state = self.state()
+			source = os.path.basename(self.path)
+			if state is None or not self._same_file(f, state, size):
+				if state is not None:
+					self._counters["resets"] += 1
+					print(f"Ingest: {self.path} was replaced, reading it again")
+				header, offset = self._header(f)
+				if not header:
+					# no complete header yet: no state, so the next refresh starts over
+					if state is not None:
+						self.store.reset_ingest(self.kind, source, self.key, "")
+					return 0
+				self.store.reset_ingest(self.kind, source, self.key, json.dumps(self._state(f, header, offset)))
+			else:
+				header, offset = state["header"], state["offset"]
+			if offset >= size:
+				return 0
+			rows = 0
+			final = time.time() - info.st_mtime > _SETTLE_SECONDS
+			pipeline = self.fold(parse_rows(read_chunks(f, offset, self.chunk_bytes, final)), header)
+			for delta, n, end in pipeline:
+				self.store.apply_ingest(self.kind, source, delta, self.key, json.dumps(self._state(f, header, end)))
+				rows += n
+				self._counters["chunks"] += 1
+				self._counters["bytes"] += end - offset
+				offset = end
+			return rows
+
+	def _header(self, f) -> tuple[list, int]:
+		f.seek(0)
+		line = f.readline()
+		if not line.endswith(b"\n"):
+			return [], 0
+		return next(csv.reader([line.decode("utf-8-sig").strip()])), len(line)
+
+	def _state(self, f, header: list, offset: int) -> dict:
+		head_len = min(offset, _HEAD_BYTES)
+		return {"offset": offset, "header": header, "head_len": head_len, "head": self._hash(f, head_len)}
+
+	def _same_file(self, f, state: dict, size: int) -> bool:
+		return size >= state["offset"] and self._hash(f, state["head_len"]) == state["head"]
+
+	@staticmethod
+	def _hash(f, length: int) -> str:
+		f.seek(0)
+		return hashlib.sha1(f.read(length)).hexdigest()
+
+	def stats(self) -> dict:
+		with self._lock:
+			out = dict(self._counters)
+		state = self.state() or {}
+		out.update(offset=state.get("offset", 0), last_ms=round(self.last_ms, 2))
+		return out
+
+
+def flat_files(store) -> list:
+	"""Tails of the original venue's flat files, in the project root."""
+	return [
+		CsvTail(store, os.path.join(BASE_DIR, "registrations.csv"), "registrations"),
+		CsvTail(store, os.path.join(BASE_DIR, "player_counts.csv"), "player_counts"),
+	]
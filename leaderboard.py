@@ -0,0 +1,133 @@
+"""Columnar leaderboard for the Series tab.
+
+A fetched leaderboard frame is turned into a `Leaderboard` once per content
+version: the player-name and stat columns are detected once per header
+signature, numeric stats are parsed into float arrays, and each player's stats
+line is pre-joined with vectorized string operations. Sorting by a stat is one
+argsort (cached per sort key), ranks and medal colors come from numpy, and a
+page of players renders as a single HTML block.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from cache import LRU
+from cards import rows_hash
+from singleflight import flights
+
+STANDINGS = "Standings"  # sheet order, as published
+# gold, silver, bronze, everyone else
+MEDAL_COLORS = np.array(["#FFD700", "#C0C0C0", "#CD7F32", "#87CEEB"], dtype=object)
+
+ROW_HTML = """<div style="border-bottom: 1px solid rgba(255,215,0,0.3); padding: 8px 0; margin-bottom: 4px; font-family: 'Courier New', monospace;">
+<span style="color: {color}; font-weight: 700; margin-right: 8px;">#{rank}</span>
+<span style="color: #ffffff; font-weight: 600; display: inline-block; width: 80px;">{name}</span>
+<span style="color: #cccccc; font-size: 14px;">{stats}</span>
+</div>"""
+
+_MAX_BOARDS = 8
+_boards = LRU(_MAX_BOARDS)
+
+
+@lru_cache(maxsize=64)
+def detect_schema(columns: tuple, index_first: bool) -> tuple:
+	"""Return (name column, stat columns) for a header signature.
+
+	If the first column is just a row number the second one holds the names.
+	"Last Updated" columns are never shown as stats.
+	"""
+	start = 1 if index_first and len(columns) > 1 else 0
+	stats = tuple(c for c in columns[start + 1:] if "last updated" not in str(c).lower())
+	return columns[start], stats
+
+
+def _numeric(values: pd.Series) -> np.ndarray | None:
+	"""Float array if every non-empty value parses as a number (commas, $ and % allowed)."""
+	text = values.astype(str).str.strip().str.replace(r"[,$%]", "", regex=True)
+	blank = values.isna() | (text == "")
+	parsed = pd.to_numeric(text.where(~blank), errors="coerce")
+	if parsed[~blank].isna().any():
+		return None
+	return parsed.to_numpy(dtype=float)
+
+
+class Leaderboard:
+	"""One leaderboard version in columnar form."""
+
+	def __init__(self, df: pd.DataFrame):
+		df = df.reset_index(drop=True)
+		first = df.iloc[:, 0] if len(df.columns) else pd.Series(dtype=object)
+		index_first = bool(len(first)) and bool(first.astype(str).str.isdigit().all())
+		self.name_column, self.stat_columns = detect_schema(tuple(df.columns), index_first)
+		self.names = df[self.name_column].astype(str).to_numpy(dtype=object)
+		self.keys = {}  # stat -> float array (numeric stats) or casefolded strings, NaN when empty
+		stats_text = np.full(len(df), "", dtype=object)
+		for col in self.stat_columns:
+			values = df[col]
+			text = values.astype(str)
+			shown = (values.notna() & (text.str.strip() != "")).to_numpy()
+			numeric = _numeric(values)
+			self.keys[col] = numeric if numeric is not None else text.str.casefold().where(shown).to_numpy(dtype=object)
+			stats_text = stats_text + np.where(shown, f"{col}: " + text.to_numpy(dtype=object) + " | ", "")
+		self.stats_text = np.array([s[:-3] if s else s for s in stats_text], dtype=object)
+		self._orders = {}
+
+	def __len__(self) -> int:
+		return len(self.names)
+
+	def is_numeric(self, stat: str) -> bool:
+		return self.keys[stat].dtype == float
+
+	def order(self, sort_by: str = STANDINGS, reverse: bool = False) -> tuple:
+		"""Return (row order, ranks in that order) for a sort key.
+
+		Numeric stats rank highest first, text stats A-Z; `reverse` flips either.
+		Tied values share a rank; players without a value sort last, unranked (0).
+		"""
+		cache_key = (sort_by, reverse)
+		cached = self._orders.get(cache_key)
+		if cached is not None:
+			return cached
+		n = len(self)
+		if sort_by == STANDINGS or sort_by not in self.keys:
+			order = np.arange(n)[::-1] if reverse else np.arange(n)
+			ranks = order + 1
+		else:
+			keys = pd.Series(self.keys[sort_by])
+			ascending = reverse if self.is_numeric(sort_by) else not reverse
+			ranked = keys.rank(method="min", ascending=ascending, na_option="keep")
+			order = np.lexsort((np.arange(n), ranked.fillna(np.inf).to_numpy()))
+			ranks = ranked.fillna(0).to_numpy(dtype=int)[order]
+		self._orders[cache_key] = (order, ranks)
+		return order, ranks
+
+	def page_count(self, page_size: int) -> int:
+		return max(1, -(-len(self) // page_size))
+
+	def page_html(self, sort_by: str = STANDINGS, page: int = 0, page_size: int = 50, reverse: bool = False) -> str:
+		"""One page of player lines as a single HTML block (`page` is 0-based)."""
+		order, ranks = self.order(sort_by, reverse)
+		rows = order[page * page_size:(page + 1) * page_size]
+		page_ranks = ranks[page * page_size:(page + 1) * page_size]
+		colors = MEDAL_COLORS[np.clip(np.where(page_ranks > 0, page_ranks, 4), 1, 4) - 1]
+		return "".join(
+			ROW_HTML.format(color=color, rank=rank if rank else "–", name=name, stats=stats)
+			for color, rank, name, stats in zip(colors, page_ranks, self.names[rows], self.stats_text[rows])
+		)
+
+
+def get_board(df: pd.DataFrame, boards: LRU | None = None) -> Leaderboard:
+	"""The `Leaderboard` for a fetched frame, built once per content version.
+
+	`boards` is the LRU to keep it in (a venue's own, see venues.py); default the module's.
+	"""
+	boards = _boards if boards is None else boards
+	key = rows_hash(df)
+	board = boards.get(key)
+	if board is not None:
+		return board
+	# sessions that miss together build it once
+	board = flights.do(("board", key), lambda: Leaderboard(df))
+	boards.put(key, board)
+	return board
@@ -0,0 +1,52 @@
+"""In-process versioned latest-value store for the jackpot and player counts.
+
+The store's background sync (`store.StoreSync`) is the only thing that polls the
+sheets. It publishes each value here under a topic ("jackpot", "player_counts";
+"<venue>:jackpot" etc. for venues other than the default, see venues.py); the
+topic's version is bumped only when the value actually changed. Sessions render
+the jackpot and player-count widgets from a fragment that re-runs every
+`LIVE_REFRESH_SECONDS` and reads `latest()` from memory, so every open phone
+gets in-place updates without adding a single upstream request.
+"""
+import threading
+from collections import defaultdict
+
+
+class Hub:
+	"""Latest value and version per topic."""
+
+	def __init__(self):
+		self._values = {}
+		self._versions = defaultdict(int)
+		self._lock = threading.Lock()
+		self._counters = {"published": 0, "unchanged": 0}
+
+	def publish(self, topic: str, value) -> bool:
+		"""Store `value` under `topic`; returns True only if it changed."""
+		with self._lock:
+			if topic in self._values and self._values[topic] == value:
+				self._counters["unchanged"] += 1
+				return False
+			self._values[topic] = value
+			self._versions[topic] += 1
+			self._counters["published"] += 1
+		return True
+
+	def latest(self, topic: str, default=None):
+		with self._lock:
+			return self._values.get(topic, default)
+
+	def drop(self, prefix: str) -> None:
+		"""Forget every topic starting with `prefix` (an evicted venue's, see venues.py)."""
+		with self._lock:
+			for topic in [t for t in self._values if t.startswith(prefix)]:
+				del self._values[topic]
+			for topic in [t for t in self._versions if t.startswith(prefix)]:
+				del self._versions[topic]
+
+	def stats(self) -> dict:
+		with self._lock:
+			return dict(self._counters, topics=dict(self._versions))
+
+
+hub = Hub()
@@ -0,0 +1,134 @@
+"""Concurrent fan-out of a page render's upstream fetches.
+
+`main()` needs the schedule CSV, the jackpot cell and the leaderboard, each behind
+its own network round trip. `PageLoads` starts them together on a shared thread
+pool so a rerun costs the slowest fetch instead of the sum, gives each source its
+own timeout, and lets sources marked lazy start only when their tab asks for them.
+
+Fetch functions run off the script thread, so they must not call `st.*`; they
+raise on failure and the caller reports the error when it reads the result.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import metrics
+from profiler import carry
+from singleflight import flights
+
+# shared across reruns and sessions; sized for a few concurrent page loads
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("LOADER_THREADS", 8)), thread_name_prefix="page-load")
+
+PENDING = "pending"
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+
+
+class Source:
+	"""One upstream fetch: `fn()` returns the data or raises.
+
+	Sources with a `key` (e.g. ("csv", url)) are single-flighted across sessions:
+	page loads started while the same key is being fetched share that fetch, and
+	each gets its own copy of a result that has `.copy()` (DataFrames).
+	"""
+
+	def __init__(self, name: str, fn, timeout: float, lazy: bool = False, key: tuple | None = None):
+		self.name = name
+		self.fn = fn
+		self.timeout = timeout
+		self.lazy = lazy
+		self.key = key
+
+
+class PageLoads:
+	"""Fetches for one rerun, started concurrently on construction (except lazy ones)."""
+
+	def __init__(self, sources: list):
+		self._sources = {s.name: s for s in sources}
+		self._futures = {}
+		self._started = {}
+		self._timings = {}
+		self._errors = {}
+		self._lock = threading.Lock()
+		for source in sources:
+			if not source.lazy:
+				self.start(source.name)
+
+	def start(self, name: str) -> None:
+		"""Submit a source's fetch if it hasn't been started yet."""
+		with self._lock:
+			if name in self._futures:
+				return
+			source = self._sources[name]
+			self._started[name] = time.perf_counter()
+			self._timings[name] = {"status": PENDING, "ms": None}
+			# in a profiled rerun, the task is sampled and timed into that rerun's profile
+			task = carry(lambda: self._timed(name, source.fn))
+			if source.key is not None:
+				self._futures[name] = flights.submit(source.key, task, _executor)
+			else:
+				self._futures[name] = _executor.submit(task)
+
+	def _timed(self, name: str, fn):
+		# for a shared (single-flighted) fetch only the page load that started it records fetch_ms
+		started = time.perf_counter()
+		try:
+			return fn()
+		except Exception:
+			metrics.inc("upstream_errors_total", source=name)
+			raise
+		finally:
+			elapsed = time.perf_counter() - started
+			metrics.observe("fetch_seconds", elapsed, source=name)
+			with self._lock:
+				self._timings[name]["fetch_ms"] = round(elapsed * 1000, 1)
+
+	def get(self, name: str, default=None):
+		"""Return a source's data, waiting at most what is left of its timeout.
+
+		On error or timeout returns `default`; `error(name)` tells which. A timed-out
+		fetch keeps running in the background, it just isn't waited for.
+		"""
+		self.start(name)
+		future = self._futures[name]
+		remaining = self._started[name] + self._sources[name].timeout - time.perf_counter()
+		status, value = OK, default
+		try:
+			value = future.result(timeout=max(remaining, 0))
+			if self._sources[name].key is not None and hasattr(value, "copy"):
+				# shared with other sessions; callers add columns in place
+				value = value.copy()
+		except FutureTimeout:
+			status = TIMEOUT
+			metrics.inc("load_timeouts_total", source=name)
+			self._errors[name] = TimeoutError(f"{name} did not load within {self._sources[name].timeout:g}s")
+		except Exception as e:
+			status = ERROR
+			self._errors[name] = e
+		with self._lock:
+			timing = self._timings[name]
+			if timing["status"] == PENDING:
+				timing["status"] = status
+				timing["ms"] = round((time.perf_counter() - self._started[name]) * 1000, 1)
+		return value
+
+	def status(self, name: str) -> str:
+		"""One of PENDING, OK, ERROR or TIMEOUT."""
+		with self._lock:
+			return self._timings.get(name, {}).get("status", PENDING)
+
+	def error(self, name: str):
+		"""The exception from a source's last `get`, or None."""
+		return self._errors.get(name)
+
+	def timings(self) -> dict:
+		"""Per-source status and wall time (`ms` as waited for, `fetch_ms` as fetched)."""
+		with self._lock:
+			return {name: dict(t) for name, t in self._timings.items()}
+
+	def log_timings(self) -> None:
+		if os.environ.get("LOG_LOAD_TIMINGS"):
+			parts = [f"{n}={t['status']}:{t['ms']}ms" for n, t in self.timings().items()]
+			print("page loads: " + " ".join(parts))
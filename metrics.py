@@ -0,0 +1,210 @@
+"""Process-wide instrumentation: timing histograms, counters and a /metrics endpoint.
+
+`perf.span` (header, theme, schedule data, every tab fragment), the page loaders,
+the conditional CSV fetcher and the asset builder report here; cache and queue
+counters that already live on their objects are read at scrape time through
+`register(name, stats_fn)`.
+
+Failures that used to be printed (a leaderboard fetch, an asset build) are
+`event`s: counted in `events_total` by name and logged as one JSON line with
+the error message.
+
+`/metrics` (Prometheus text format) is served on the app's own port when it runs
+through serve.py, the Procfile launcher, since Heroku routes only `$PORT`.
+
+- `METRICS_PORT` — for local runs with `streamlit run`: serve `/metrics` on this
+  port from a daemon thread (off when unset).
+- `METRICS_LOG` — append every observation as a JSON line to this path (`-` for
+  stdout), for dynos where nothing scrapes the endpoint. Events with an error
+  go to stderr when it is unset.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "bigslick"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# seconds; covers a cached fragment (~1ms) up to a slow Sheets round trip
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+	"span_seconds": "Render time of a page section (perf.span / fragment).",
+	"fetch_seconds": "Time of one page-load source fetch (loaders.py).",
+	"upstream_request_seconds": "Time of one conditional CSV request, by outcome (sync.py).",
+	"asset_encode_seconds": "Time to encode one static asset derivative (assets.py).",
+	"time_to_first_render_seconds": "Process start to the end of the first full render.",
+	"upstream_errors_total": "Failed upstream fetches, by source.",
+	"upstream_loads_total": "Successful upstream loads, by source.",
+	"events_total": "Failures and fallbacks reported with metrics.event, by event.",
+	"load_timeouts_total": "Page-load sources that were not ready within their timeout.",
+	"upstream_retries_total": "Upstream requests retried after a transient failure (upstream.py).",
+	"upstream_short_circuits_total": "Upstream fetches refused at once by an open circuit breaker.",
+	"upstream_failovers_total": "Failed fetches served from the last good copy or on-disk snapshot.",
+}
+
+
+def _label_key(labels: dict) -> tuple:
+	return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(pairs) -> str:
+	if not pairs:
+		return ""
+	escaped = (f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+	return "{" + ",".join(escaped) + "}"
+
+
+class Registry:
+	"""Histograms and counters keyed by (metric, labels), plus scrape-time collectors."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._histograms = defaultdict(lambda: {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0})
+		self._counters = defaultdict(float)
+		self._collectors = {}
+		self._log_lock = threading.Lock()
+
+	def observe(self, metric: str, seconds: float, **labels) -> None:
+		"""Record one duration sample of `metric` (a `*_seconds` histogram)."""
+		with self._lock:
+			h = self._histograms[(metric, _label_key(labels))]
+			h["count"] += 1
+			h["sum"] += seconds
+			for i, bound in enumerate(BUCKETS):
+				if seconds <= bound:
+					h["buckets"][i] += 1
+		self._log(metric, seconds, labels)
+
+	def inc(self, metric: str, value: float = 1, **labels) -> None:
+		"""Add `value` to the counter `metric` (a `*_total`)."""
+		with self._lock:
+			self._counters[(metric, _label_key(labels))] += value
+		self._log(metric, value, labels)
+
+	def event(self, name: str, error: Exception | str | None = None, **labels) -> None:
+		"""Count `name` in `events_total` and log it, with `error`'s message if given."""
+		with self._lock:
+			self._counters[("events_total", _label_key(dict(labels, event=name)))] += 1
+		fields = dict(labels, event=name)
+		if error is not None:
+			fields["error"] = str(error)
+		self._log("events_total", 1, fields, fallback=sys.stderr if error is not None else None)
+
+	def register(self, name: str, stats_fn) -> None:
+		"""Export `stats_fn()` (a dict of numbers, or of dicts of numbers) at every scrape."""
+		with self._lock:
+			self._collectors[name] = stats_fn
+
+	def render(self) -> str:
+		"""The Prometheus text exposition of everything recorded so far."""
+		with self._lock:
+			histograms = {k: {"buckets": list(v["buckets"]), "count": v["count"], "sum": v["sum"]} for k, v in self._histograms.items()}
+			counters = dict(self._counters)
+			collectors = dict(self._collectors)
+		lines = []
+		typed = set()
+
+		def header(metric: str, kind: str) -> None:
+			if metric not in typed:
+				typed.add(metric)
+				if metric in HELP:
+					lines.append(f"# HELP {PREFIX}_{metric} {HELP[metric]}")
+				lines.append(f"# TYPE {PREFIX}_{metric} {kind}")
+
+		for (metric, labels), h in sorted(histograms.items()):
+			header(metric, "histogram")
+			for bound, n in zip(BUCKETS, h["buckets"]):
+				lines.append(f"{PREFIX}_{metric}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {n}")
+			lines.append(f"{PREFIX}_{metric}_bucket{_format_labels(labels + (('le', '+Inf'),))} {h['count']}")
+			lines.append(f"{PREFIX}_{metric}_sum{_format_labels(labels)} {h['sum']:.6f}")
+			lines.append(f"{PREFIX}_{metric}_count{_format_labels(labels)} {h['count']}")
+		for (metric, labels), value in sorted(counters.items()):
+			header(metric, "counter")
+			lines.append(f"{PREFIX}_{metric}{_format_labels(labels)} {value:g}")
+		for name, stats_fn in sorted(collectors.items()):
+			try:
+				stats = stats_fn()
+			except Exception as e:
+				print(f"Metrics collector {name} failed: {e}")
+				continue
+			for key, value in sorted(stats.items()):
+				metric = f"{name}_{key}"
+				if isinstance(value, dict):
+					header(metric, "gauge")
+					for sub, v in sorted(value.items()):
+						if isinstance(v, (int, float)):
+							lines.append(f"{PREFIX}_{metric}{_format_labels((('key', str(sub)),))} {v:g}")
+				elif isinstance(value, (int, float)) and not isinstance(value, bool):
+					header(metric, "gauge")
+					lines.append(f"{PREFIX}_{metric} {value:g}")
+		return "\n".join(lines) + "\n"
+
+	def _log(self, metric: str, value: float, labels: dict, fallback=None) -> None:
+		"""Append one JSON line to `METRICS_LOG`; without it to `fallback` (a stream), if given."""
+		target = os.environ.get("METRICS_LOG")
+		if not target and fallback is None:
+			return
+		line = json.dumps({"ts": round(time.time(), 3), "metric": metric, "value": round(value, 6), **labels})
+		try:
+			with self._log_lock:
+				if not target or target == "-":
+					print(line, file=sys.stdout if target else fallback, flush=True)
+				else:
+					with open(target, "a", encoding="utf-8") as f:
+						f.write(line + "\n")
+		except Exception as e:
+			print(f"Metrics log write failed: {e}")
+
+
+registry = Registry()
+observe = registry.observe
+inc = registry.inc
+event = registry.event
+register = registry.register
+
+
+class _Handler(BaseHTTPRequestHandler):
+	def log_message(self, *args):
+		pass
+
+	def do_GET(self):
+		if self.path.split("?")[0] != "/metrics":
+			self.send_error(404)
+			return
+		body = registry.render().encode("utf-8")
+		self.send_response(200)
+		self.send_header("Content-Type", CONTENT_TYPE)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_server(port: int | None = None) -> ThreadingHTTPServer | None:
+	"""Serve /metrics on `port` (default `METRICS_PORT`) once per process; None when disabled.
+
+	For local runs; through serve.py /metrics is also on the app's own port.
+	"""
+	global _server
+	if port is None:
+		port = int(os.environ.get("METRICS_PORT") or 0)
+		if not port:
+			return None
+	with _server_lock:
+		if _server is None:
+			try:
+				_server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+			except OSError as e:
+				print(f"Metrics endpoint not started on port {port}: {e}")
+				return None
+			_server.daemon_threads = True
+			threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+			print(f"Serving metrics on :{_server.server_address[1]}/metrics")
+		return _server
@@ -0,0 +1,99 @@
+"""Per-fragment rerun cost tracking.
+
+Each tab of the page is an `st.fragment`, so a widget inside one tab reruns only
+that tab. `fragment(name)` wraps a render function as a fragment and times every
+execution; `span(name)` times other sections (header, theme, data). The latest
+cost of each section is kept per session, so the report shows both what the
+last interaction re-ran and what it cost.
+
+Set `RERUN_COST_LOG=1` to log every timing, or open the app with `?perf=1` to
+render the report at the bottom of the page. Every span is also recorded
+process-wide in `metrics.py`, and `first_render_done()` logs the process's
+time to first render once.
+"""
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+import metrics
+
+COSTS_KEY = "_rerun_costs"
+# set by serve.py before anything is imported; otherwise when this module loaded
+STARTED_AT = float(os.environ.get("PROCESS_STARTED_AT") or time.time())
+_first_render = None
+
+
+def _costs() -> dict:
+	try:
+		return st.session_state.setdefault(COSTS_KEY, {})
+	except Exception:
+		# outside a script run (bare `python app.py`, warmup): nothing to attach to
+		return {}
+
+
+@contextmanager
+def span(name: str):
+	"""Time a block and record it as the latest cost of `name` for this session."""
+	start = time.perf_counter()
+	try:
+		yield
+	finally:
+		ms = (time.perf_counter() - start) * 1000
+		_costs()[name] = {"ms": round(ms, 2), "at": time.time()}
+		metrics.observe("span_seconds", ms / 1000, section=name)
+		if os.environ.get("RERUN_COST_LOG"):
+			print(f"rerun cost: {name} {ms:.1f}ms")
+
+
+def fragment(name: str, run_every: float | None = None):
+	"""Decorator: make a render function an independently rerunnable, timed fragment.
+
+	With `run_every` (seconds) the browser re-runs just this fragment on a timer.
+	"""
+	def decorate(fn):
+		@functools.wraps(fn)
+		def timed(*args, **kwargs):
+			with span(name):
+				return fn(*args, **kwargs)
+		return st.fragment(timed, run_every=run_every)
+	return decorate
+
+
+def first_render_done() -> float | None:
+	"""Record the end of this process's first full render; returns seconds since start."""
+	global _first_render
+	if _first_render is not None:
+		return None
+	_first_render = time.time() - STARTED_AT
+	metrics.observe("time_to_first_render_seconds", _first_render)
+	print(f"Time to first render: {_first_render:.2f}s after process start")
+	return _first_render
+
+
+def report_requested() -> bool:
+	try:
+		return st.query_params.get("perf") == "1"
+	except Exception:
+		return False
+
+
+def render_report() -> None:
+	"""Show the latest cost of every section and how long ago it last ran."""
+	costs = _costs()
+	if not costs:
+		return
+	now = time.time()
+	rows = [
+		f"<tr><td>{name}</td><td style='text-align:right'>{c['ms']:.1f} ms</td><td style='text-align:right'>{now - c['at']:.0f}s ago</td></tr>"
+		for name, c in sorted(costs.items(), key=lambda kv: -kv[1]["at"])
+	]
+	with st.expander("Rerun cost per fragment"):
+		st.markdown(
+			"<table style='width:100%; font-family:monospace; font-size:13px;'>"
+			"<tr><th>section</th><th>last cost</th><th>last ran</th></tr>"
+			+ "".join(rows) + "</table>",
+			unsafe_allow_html=True,
+		)
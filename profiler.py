@@ -0,0 +1,262 @@
+"""Opt-in sampling profiler for a single rerun.
+
+When a page feels slow, capture exactly that rerun instead of guessing:
+
+- `PROFILE_RERUNS=1` — profile every full rerun of `main()`, or
+- `?profile=<PROFILE_TOKEN>` — profile only the reruns of the session that opened
+  the app with that query parameter (off unless `PROFILE_TOKEN` is set).
+
+While a rerun is profiled a daemon thread samples the stacks of the script thread
+and of the page-load threads while they run that rerun's fetches, every
+`PROFILE_INTERVAL_MS` (default 2) with `sys._current_frames()`, so the profiled
+code runs unmodified. Functions marked with `@timed(name)` (schedule
+normalization, image resizes, card builders) also record exact call counts and
+wall time. The running profile is kept in a context variable that the loaders
+carry into their tasks (`carry`), so other sessions' reruns, profiled or not,
+never show up in this one. Each profile is written to `PROFILE_DIR` (default
+`profiles/`):
+
+- `<stamp>.speedscope.json` (`PROFILE_FORMAT=speedscope`, default) — open in
+  https://www.speedscope.app
+- `<stamp>.collapsed` (`PROFILE_FORMAT=collapsed`) — for flamegraph.pl / inferno
+- `<stamp>.txt` — wall time, sample count, hottest functions and `@timed` costs
+"""
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+# the profile of the rerun this code runs for, if it is being profiled
+_current = contextvars.ContextVar("profile", default=None)
+
+
+class Profile:
+	"""Stack samples and @timed costs collected during one rerun."""
+
+	def __init__(self, label: str, interval: float):
+		self.label = label
+		self.interval = interval
+		self.samples = Counter()  # (thread name, (frame, ...)) -> count
+		self.functions = defaultdict(lambda: [0, 0.0])  # name -> [calls, seconds]
+		self.started = time.perf_counter()
+		self.wall = 0.0
+		self._script_thread = threading.get_ident()
+		self._workers = Counter()  # ident of a thread running this rerun's work -> depth
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+	def start(self) -> "Profile":
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._stop.set()
+		self._thread.join()
+		self.wall = time.perf_counter() - self.started
+
+	def record(self, name: str, seconds: float) -> None:
+		with self._lock:
+			entry = self.functions[name]
+			entry[0] += 1
+			entry[1] += seconds
+
+	@contextmanager
+	def working(self):
+		"""Sample the calling thread while the block runs (a page-load task of this rerun)."""
+		ident = threading.get_ident()
+		with self._lock:
+			self._workers[ident] += 1
+		try:
+			yield
+		finally:
+			with self._lock:
+				self._workers[ident] -= 1
+				if not self._workers[ident]:
+					del self._workers[ident]
+
+	def _targets(self) -> dict:
+		with self._lock:
+			workers = set(self._workers)
+		targets = {t.ident: t.name for t in threading.enumerate() if t.ident in workers}
+		targets[self._script_thread] = "script"
+		return targets
+
+	def _run(self) -> None:
+		while not self._stop.wait(self.interval):
+			frames = sys._current_frames()
+			for ident, name in self._targets().items():
+				frame = frames.get(ident)
+				if frame is None:
+					continue
+				stack = []
+				while frame is not None:
+					code = frame.f_code
+					stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+					frame = frame.f_back
+				stack.reverse()
+				if name != "script" and _idle(stack):
+					continue
+				self.samples[(name, tuple(stack))] += 1
+
+	# output
+
+	@staticmethod
+	def _frame_name(frame: tuple) -> str:
+		func, filename, line = frame
+		module = os.path.splitext(os.path.basename(filename))[0]
+		return f"{module}:{func}:{line}"
+
+	def collapsed(self) -> str:
+		lines = [
+			";".join([thread, *(self._frame_name(f) for f in stack)]) + f" {count}"
+			for (thread, stack), count in sorted(self.samples.items(), key=lambda kv: -kv[1])
+		]
+		return "\n".join(lines) + "\n"
+
+	def speedscope(self) -> dict:
+		frames, index = [], {}
+		profiles = {}
+		interval_ms = self.interval * 1000
+		for (thread, stack), count in self.samples.items():
+			ids = []
+			for f in stack:
+				if f not in index:
+					index[f] = len(frames)
+					frames.append({"name": f[0], "file": f[1], "line": f[2]})
+				ids.append(index[f])
+			profile = profiles.setdefault(thread, {
+				"type": "sampled", "name": thread, "unit": "milliseconds",
+				"startValue": 0, "endValue": 0, "samples": [], "weights": [],
+			})
+			profile["samples"].append(ids)
+			profile["weights"].append(interval_ms * count)
+			profile["endValue"] += interval_ms * count
+		return {
+			"$schema": "https://www.speedscope.app/file-format-schema.json",
+			"name": self.label,
+			"exporter": "bigslick profiler",
+			"shared": {"frames": frames},
+			"profiles": sorted(profiles.values(), key=lambda p: p["name"] != "script"),
+		}
+
+	def summary(self, top: int = 25) -> str:
+		self_time = Counter()
+		for (thread, stack), count in self.samples.items():
+			self_time[(thread, stack[-1])] += count
+		total = sum(self.samples.values())
+		interval_ms = self.interval * 1000
+		lines = [
+			f"{self.label}: {self.wall * 1000:.1f} ms wall, {total} samples every {interval_ms:g} ms",
+			"",
+			"hottest frames (self time, sampled):",
+		]
+		for (thread, frame), count in self_time.most_common(top):
+			lines.append(f"  {count * interval_ms:8.1f} ms  {thread:<12} {self._frame_name(frame)}  ({frame[1]})")
+		if self.functions:
+			lines += ["", "timed functions (exact):"]
+			for name, (calls, seconds) in sorted(self.functions.items(), key=lambda kv: -kv[1][1]):
+				lines.append(f"  {seconds * 1000:8.1f} ms  {calls:6d} calls  {name}")
+		return "\n".join(lines) + "\n"
+
+	def write(self, directory: str | None = None, fmt: str | None = None) -> str:
+		"""Write the profile and its summary (default to PROFILE_DIR); returns the path of the profile file."""
+		directory = directory or PROFILE_DIR
+		fmt = (fmt or os.environ.get("PROFILE_FORMAT") or "speedscope").lower()
+		os.makedirs(directory, exist_ok=True)
+		base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}")
+		if fmt == "collapsed":
+			path = base + ".collapsed"
+			with open(path, "w", encoding="utf-8") as f:
+				f.write(self.collapsed())
+		else:
+			path = base + ".speedscope.json"
+			with open(path, "w", encoding="utf-8") as f:
+				json.dump(self.speedscope(), f)
+		with open(base + ".txt", "w", encoding="utf-8") as f:
+			f.write(self.summary())
+		return path
+
+
+def _idle(stack: list) -> bool:
+	"""A pool thread blocked on the executor's work queue (a C call, so `_worker` is the leaf)."""
+	return bool(stack) and stack[-1][0] == "_worker"
+
+
+def timed(name: str):
+	"""Decorator: record exact calls and wall time of `fn` in the profile of the rerun calling it.
+
+	Costs one context variable lookup per call when that rerun is not profiled.
+	"""
+	def decorate(fn):
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			profile = _current.get()
+			if profile is None:
+				return fn(*args, **kwargs)
+			start = time.perf_counter()
+			try:
+				return fn(*args, **kwargs)
+			finally:
+				profile.record(name, time.perf_counter() - start)
+		return wrapper
+	return decorate
+
+
+def carry(fn):
+	"""`fn` bound to the caller's context, for running on another thread (see loaders.py).
+
+	Inside a profiled rerun the thread running it is sampled and its `@timed`
+	calls are recorded into that rerun's profile; otherwise `fn` is returned as is.
+	"""
+	profile = _current.get()
+	if profile is None:
+		return fn
+	context = contextvars.copy_context()
+
+	def run(*args, **kwargs):
+		with profile.working():
+			return context.run(fn, *args, **kwargs)
+	return run
+
+
+def requested() -> bool:
+	"""Whether this rerun should be profiled (env switch or the admin query param)."""
+	if os.environ.get("PROFILE_RERUNS") == "1":
+		return True
+	token = os.environ.get("PROFILE_TOKEN")
+	if not token:
+		return False
+	try:
+		import streamlit as st
+		return st.query_params.get("profile") == token
+	except Exception:
+		return False
+
+
+@contextmanager
+def profile_rerun(label: str = "rerun"):
+	"""Profile the block if `requested()`; writes the files when it ends (even on st.stop)."""
+	if not requested():
+		yield None
+		return
+	profile = Profile(label, float(os.environ.get("PROFILE_INTERVAL_MS", 2)) / 1000).start()
+	token = _current.set(profile)
+	try:
+		yield profile
+	finally:
+		_current.reset(token)
+		profile.stop()
+		try:
+			path = profile.write()
+			print(f"Profiled {label}: {profile.wall * 1000:.1f} ms, {sum(profile.samples.values())} samples -> {path}")
+		except Exception as e:
+			print(f"Writing profile failed: {e}")
@@ -0,0 +1,357 @@
+"""
+Provision every Google Sheet a season needs, from one manifest, in batched API calls.
+
+Usage:
+  python provision.py --credentials /path/to/service-account.json --manifest provision.json
+  python provision.py -c sa.json -m provision.json --season "2027 Spring" --dry-run
+
+The manifest (JSON, see `provision.example.json`) lists venues, seasons and the
+sheets each venue gets per season, as {kind: {tab: rows}}; rows are a list of
+rows or a path to a CSV (relative to the manifest). Without "venues" the venues
+in venues.json are used. Each venue x season x kind is one spreadsheet titled
+by the manifest's "title" pattern ({venue}, {venue_name}, {season}, {kind}).
+
+Idempotent: spreadsheets are matched by title against one Drive listing. A new
+one costs three calls (`spreadsheets.create` with every tab, one
+`values.batchUpdate` with every tab's rows, one share per entry in "share"). An
+existing one is read (tabs, first cells, permissions) and only gets the tabs it
+lacks (one `batchUpdate`), rows for tabs that are still empty (one
+`values.batchUpdate`) and missing shares; a tab that has data is never written.
+
+Spreadsheets are provisioned `--concurrency` at a time (default 4). Sheets API
+reads and writes each stay within `--per-minute` calls in any minute (default
+60, the per-user quota); Drive calls (listing, sharing) are not throttled. 429s, and 5xx / connection errors of calls that are safe to repeat, are
+retried with jittered exponential backoff; a create that may have landed is not
+retried (the next run finds it by title). Prints one line per spreadsheet and
+the totals: calls, retries, worker time spent waiting for the quota and wall time.
+
+This script uses `gspread` (for auth and its HTTP session, see sheets_client.py).
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TITLE = "{venue_name} {season} {kind}"
+DEFAULT_SHARE = [{"type": "anyone", "role": "reader"}]
+RETRIES = 5
+BACKOFF = 1.0  # seconds, doubled per retry
+MAX_BACKOFF = 32.0
+
+
+@dataclass(frozen=True)
+class SheetSpec:
+    """One spreadsheet to provision: its title and {tab: rows}, in tab order."""
+
+    title: str
+    tabs: dict
+    share: tuple = ()
+
+
+@dataclass
+class Result:
+    title: str
+    id: str | None = None
+    action: str = ""  # created / updated / unchanged / failed; dry run: planned / exists
+    calls: int = 0
+    seconds: float = 0.0
+    detail: str = ""
+    added_tabs: list = field(default_factory=list)
+    filled_tabs: list = field(default_factory=list)
+    shared: list = field(default_factory=list)
+
+    @property
+    def url(self) -> str | None:
+        return f"https://docs.google.com/spreadsheets/d/{self.id}" if self.id else None
+
+
+def _read_rows(source, base: str) -> list:
+    if isinstance(source, list):
+        return [[str(v) for v in row] for row in source]
+    path = source if os.path.isabs(source) else os.path.join(base, source)
+    if not os.path.exists(path):
+        path = os.path.join(BASE_DIR, source)
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row for row in csv.reader(f) if row]
+
+
+def _venues(manifest: dict) -> list:
+    """[(id, name)] from the manifest, else from venues.json."""
+    entries = manifest.get("venues")
+    if entries is None:
+        from venues import load_venues
+        _default, venues = load_venues()
+        return [(v.id, v.name) for v in venues.values()]
+    return [(e, e) if isinstance(e, str) else (e["id"], e.get("name", e["id"])) for e in entries]
+
+
+def load_manifest(path: str, seasons: list | None = None, venues: list | None = None) -> list:
+    """Expand a manifest into SheetSpecs; `seasons` / `venues` (ids) narrow it down."""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    pattern = manifest.get("title", DEFAULT_TITLE)
+    share = tuple(tuple(sorted(s.items())) for s in manifest.get("share", DEFAULT_SHARE))
+    kinds = {kind: {tab: _read_rows(rows, base) for tab, rows in tabs.items()} for kind, tabs in manifest["sheets"].items()}
+    specs = []
+    for venue_id, venue_name in _venues(manifest):
+        if venues and venue_id not in venues:
+            continue
+        for season in manifest["seasons"]:
+            if seasons and season not in seasons:
+                continue
+            for kind, tabs in kinds.items():
+                title = pattern.format(venue=venue_id, venue_name=venue_name, season=season, kind=kind)
+                specs.append(SheetSpec(title, tabs, share))
+    titles = [s.title for s in specs]
+    duplicates = sorted({t for t in titles if titles.count(t) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: title pattern {pattern!r} gives duplicate titles: {duplicates}")
+    return specs
+
+
+def _a1(tab: str) -> str:
+    return "'" + tab.replace("'", "''") + "'"
+
+
+class RateLimit:
+    """At most `per_minute` calls in any 60 s, shared by every worker thread."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= 60:
+                    self._calls.popleft()
+                if len(self._calls) < self.per_minute:
+                    self._calls.append(now)
+                    return
+                delay = 60 - (now - self._calls[0])
+                self.waited += delay
+            time.sleep(delay)
+
+
+class Provisioner:
+    """Creates or completes spreadsheets with as few API calls as the Sheets API allows."""
+
+    def __init__(self, gc, concurrency: int = 4, per_minute: int = 60):
+        self.gc = gc
+        self.concurrency = max(1, concurrency)
+        # the Sheets API counts reads and writes separately
+        self.limits = {"read": RateLimit(per_minute), "write": RateLimit(per_minute)}
+        self._local = threading.local()  # calls made by this worker thread
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "retries": 0}
+
+    def existing(self, title: str | None = None) -> dict:
+        """{title: spreadsheet id} of the spreadsheets the account can see (oldest wins), or of `title`."""
+        from gspread.urls import DRIVE_FILES_API_V3_URL
+        files, token = [], ""
+        query = 'mimeType="application/vnd.google-apps.spreadsheet" and trashed=false'
+        if title is not None:
+            query += " and name = '" + title.replace("\\", "\\\\").replace("'", "\\'") + "'"
+        params = {
+            "q": query,
+            "pageSize": 1000,
+            "supportsAllDrives": True,
+            "includeItemsFromAllDrives": True,
+            "fields": "nextPageToken,files(id,name,createdTime)",
+        }
+        while token is not None:
+            if token:
+                params["pageToken"] = token
+            page = self._call("drive", lambda: self.gc.request("get", DRIVE_FILES_API_V3_URL, params=params).json())
+            files.extend(page.get("files", []))
+            token = page.get("nextPageToken")
+        out = {}
+        for f in sorted(files, key=lambda f: f.get("createdTime", "")):
+            out.setdefault(f["name"], f["id"])
+        return out
+
+    def run(self, specs: list, dry_run: bool = False) -> list:
+        """Provision `specs`, `concurrency` at a time; one Result per spec, in order."""
+        # one spreadsheet (the create_*_gsheet.py scripts): look up just its title
+        existing = self.existing(specs[0].title if len(specs) == 1 else None)
+        if dry_run:
+            return [Result(s.title, existing.get(s.title), "exists" if s.title in existing else "planned") for s in specs]
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="provision") as pool:
+            return list(pool.map(lambda spec: self.ensure(spec, existing.get(spec.title)), specs))
+
+    def ensure(self, spec: SheetSpec, sheet_id: str | None) -> Result:
+        result = Result(spec.title, sheet_id)
+        start = time.perf_counter()
+        calls = self._calls_in_thread()
+        try:
+            if sheet_id is None:
+                self._create(spec, result)
+            else:
+                self._complete(spec, result)
+        except Exception as e:
+            result.action, result.detail = "failed", f"{type(e).__name__}: {e}"
+        result.calls = self._calls_in_thread() - calls
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _create(self, spec: SheetSpec, result: Result) -> None:
+        from gspread.urls import SPREADSHEETS_API_V4_BASE_URL
+        body = {
+            "properties": {"title": spec.title},
+            "sheets": [{"properties": {"title": tab, **self._grid(rows)}} for tab, rows in spec.tabs.items()],
+        }
+        # not repeated after a timeout or 5xx: it may have landed, and the next run finds it by title
+        created = self._call("write", lambda: self.gc.request("post", SPREADSHEETS_API_V4_BASE_URL, json=body).json(), idempotent=False)
+        result.id = created["spreadsheetId"]
+        result.added_tabs = list(spec.tabs)
+        self._fill(result.id, {tab: rows for tab, rows in spec.tabs.items() if rows}, result)
+        for share in map(dict, spec.share):
+            self._share(result.id, share)
+            result.shared.append(share["type"])
+        result.action = "created"
+
+    def _complete(self, spec: SheetSpec, result: Result) -> None:
+        from gspread.urls import SPREADSHEET_BATCH_UPDATE_URL, SPREADSHEET_URL, SPREADSHEET_VALUES_BATCH_URL
+        sheet_id = result.id
+        meta = self._call("read", lambda: self.gc.request("get", SPREADSHEET_URL % sheet_id, params={"fields": "sheets.properties.title"}).json())
+        present = {s["properties"]["title"] for s in meta.get("sheets", [])}
+        missing = [tab for tab in spec.tabs if tab not in present]
+        if missing:
+            body = {"requests": [{"addSheet": {"properties": {"title": tab, **self._grid(spec.tabs[tab])}}} for tab in missing]}
+            self._call("write", lambda: self.gc.request("post", SPREADSHEET_BATCH_UPDATE_URL % sheet_id, json=body), idempotent=False)
+            result.added_tabs = missing
+        # tabs that exist but are still empty (e.g. a run that stopped after creating them)
+        check = [tab for tab in spec.tabs if tab in present and spec.tabs[tab]]
+        empty = []
+        if check:
+            params = {"ranges": [f"{_a1(tab)}!A1:B2" for tab in check]}
+            ranges = self._call("read", lambda: self.gc.request("get", SPREADSHEET_VALUES_BATCH_URL % sheet_id, params=params).json())
+            empty = [tab for tab, r in zip(check, ranges.get("valueRanges", [])) if not r.get("values")]
+        self._fill(sheet_id, {tab: spec.tabs[tab] for tab in [*missing, *empty] if spec.tabs[tab]}, result)
+        if spec.share:
+            permissions = self._call("drive", lambda: self.gc.list_permissions(sheet_id))
+            for share in map(dict, spec.share):
+                if not any(all(p.get("emailAddress" if k == "email" else k) == v for k, v in share.items()) for p in permissions):
+                    self._share(sheet_id, share)
+                    result.shared.append(share["type"])
+        result.action = "updated" if result.added_tabs or result.filled_tabs or result.shared else "unchanged"
+
+    def _fill(self, sheet_id: str, tabs: dict, result: Result) -> None:
+        """Write every tab's rows in one values.batchUpdate."""
+        from gspread.urls import SPREADSHEET_VALUES_BATCH_UPDATE_URL
+        if not tabs:
+            return
+        body = {
+            "valueInputOption": "USER_ENTERED",
+            "data": [{"range": f"{_a1(tab)}!A1", "majorDimension": "ROWS", "values": rows} for tab, rows in tabs.items()],
+        }
+        self._call("write", lambda: self.gc.request("post", SPREADSHEET_VALUES_BATCH_UPDATE_URL % sheet_id, json=body))
+        result.filled_tabs = list(tabs)
+
+    def _share(self, sheet_id: str, share: dict) -> None:
+        self._call("drive", lambda: self.gc.insert_permission(sheet_id, share.get("email"), perm_type=share["type"], role=share["role"], notify=False))
+
+    @staticmethod
+    def _grid(rows: list) -> dict:
+        # a tab big enough for its rows, so writing them needs no resize request
+        width = max((len(r) for r in rows), default=0)
+        return {"gridProperties": {"rowCount": max(len(rows) + 100, 1000), "columnCount": max(width, 26)}}
+
+    def _calls_in_thread(self) -> int:
+        return getattr(self._local, "calls", 0)
+
+    def _call(self, kind: str, fn, idempotent: bool = True):
+        """One API call of `kind` (read / write / drive), within its quota and retried when safe."""
+        attempt = 0
+        while True:
+            if kind in self.limits:
+                self.limits[kind].wait()
+            self._local.calls = self._calls_in_thread() + 1
+            with self._lock:
+                self._counters["calls"] += 1
+            try:
+                return fn()
+            except Exception as e:
+                if not _retryable(e, idempotent) or attempt >= RETRIES:
+                    raise
+                # full jitter, so workers hitting the quota together don't retry together
+                delay = random.uniform(0, min(MAX_BACKOFF, BACKOFF * 2 ** attempt))
+                attempt += 1
+                with self._lock:
+                    self._counters["retries"] += 1
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._counters)
+        out["quota_wait_seconds"] = round(sum(limit.waited for limit in self.limits.values()), 2)
+        return out
+
+
+def _retryable(error: Exception, idempotent: bool) -> bool:
+    import requests
+    from gspread.exceptions import APIError
+    if isinstance(error, APIError):
+        status = error.response.status_code
+        # a 429 was rejected, so even a create is safe to send again
+        return status == 429 or (idempotent and status >= 500)
+    return idempotent and isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def provision_one(gc, title: str, tabs: dict, share: list = DEFAULT_SHARE) -> Result:
+    """Provision one spreadsheet; raises if that failed. Used by the create_*_gsheet.py scripts."""
+    spec = SheetSpec(title, {tab: _read_rows(rows, os.getcwd()) for tab, rows in tabs.items()}, tuple(tuple(sorted(s.items())) for s in share))
+    result = Provisioner(gc, concurrency=1).run([spec])[0]
+    if result.action == "failed":
+        raise RuntimeError(f"provisioning {title!r} failed: {result.detail}")
+    return result
+
+
+def report(results: list, stats: dict, seconds: float) -> None:
+    width = max([len(r.title) for r in results] + [5])
+    print(f"{'sheet':<{width}}  {'action':<9} {'calls':>5} {'s':>6}  id / detail")
+    for r in results:
+        detail = r.detail
+        if r.action == "updated":
+            detail = f"tabs added {r.added_tabs or '-'}, filled {r.filled_tabs or '-'}, shared {r.shared or '-'}"
+        print(f"{r.title:<{width}}  {r.action:<9} {r.calls:>5} {r.seconds:>6.2f}  {' '.join(filter(None, [r.id, detail]))}")
+    counts = {action: sum(r.action == action for r in results) for action in ("created", "updated", "unchanged", "planned", "exists", "failed")}
+    summary = ", ".join(f"{n} {action}" for action, n in counts.items() if n)
+    print(f"\n{len(results)} sheets ({summary}): {stats['calls']} API calls, {stats['retries']} retries, "
+          f"{stats['quota_wait_seconds']:.1f}s of worker time waiting for quota, {seconds:.2f}s total")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--credentials', '-c', required=True, help='Path to service account JSON')
+    parser.add_argument('--manifest', '-m', default='provision.json', help='Manifest of venues, seasons and tabs')
+    parser.add_argument('--season', action='append', help='Only this season (repeatable)')
+    parser.add_argument('--venue', action='append', help='Only this venue id (repeatable)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Spreadsheets provisioned at once')
+    parser.add_argument('--per-minute', type=int, default=60, help='Sheets API reads (and writes) allowed per minute')
+    parser.add_argument('--dry-run', action='store_true', help='List what would be created, without writing')
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.credentials):
+        raise SystemExit('Credentials file not found')
+    specs = load_manifest(args.manifest, args.season, args.venue)
+    from sheets_client import get_manager
+    start = time.perf_counter()
+    provisioner = Provisioner(get_manager().client(args.credentials), args.concurrency, args.per_minute)
+    results = provisioner.run(specs, dry_run=args.dry_run)
+    report(results, provisioner.stats(), time.perf_counter() - start)
+    return 1 if any(r.action == "failed" for r in results) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
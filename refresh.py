@@ -0,0 +1,197 @@
+"""When to refresh each live source, from the tournament calendar.
+
+The jackpot, player counts and leaderboard move quickly from shortly before an
+event starts until shortly after its `cutoff`, and barely at all otherwise. A
+venue's `RefreshPlan` reads its normalized schedule (the typed `start_minutes`
+and `cutoff_minutes` of each day, see schedule_schema.py) and tells the venue's
+background thread (store.StoreSync) when each source is next due:
+
+- inside a live window, from `REFRESH_LEAD_MINUTES` (default 30) before a start
+  to `REFRESH_TAIL_MINUTES` (default 30) after its cutoff, every `live` seconds;
+- outside, every `idle` seconds, but always once as the next window opens.
+
+Intervals are per source, `REFRESH_<SOURCE>="<live>,<idle>"` in seconds
+(defaults: jackpot and player counts `STORE_SYNC_INTERVAL`,3600, leaderboard
+60,3600). An event without a cutoff counts as `REFRESH_EVENT_MINUTES` (default
+180) long. Until a venue's schedule has loaded, or if it has no schedule,
+every moment counts as live, as before.
+
+Pages read what the thread fetched: the leaderboard's cached copy is served
+while it is younger than the source's current interval (`RefreshPlan.read`),
+and the jackpot / counts come from the store and the live feed. `stats()`
+counts fetches against reads, each read standing for the fetch an on-demand
+page would have made.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from schedule_schema import parse_minutes
+from week import DAYS_ORDER, local_now
+
+SOURCES = ("jackpot", "player_counts", "leaderboard")
+LEAD_MINUTES = int(os.environ.get("REFRESH_LEAD_MINUTES", 30))
+TAIL_MINUTES = int(os.environ.get("REFRESH_TAIL_MINUTES", 30))
+EVENT_MINUTES = int(os.environ.get("REFRESH_EVENT_MINUTES", 180))
+# the background thread re-reads the plan at least this often (s), so a schedule
+# that loads or changes while it sleeps through an idle stretch is picked up
+REFRESH_TICK = float(os.environ.get("REFRESH_TICK", 60))
+
+_live = float(os.environ.get("STORE_SYNC_INTERVAL", 15))
+_DEFAULTS = {"jackpot": (_live, 3600.0), "player_counts": (_live, 3600.0), "leaderboard": (60.0, 3600.0)}
+
+
+@dataclass(frozen=True)
+class Policy:
+	"""Seconds between fetches of one source inside and outside live windows."""
+
+	live: float
+	idle: float
+
+
+def policy(source: str) -> Policy:
+	"""The source's policy from `REFRESH_<SOURCE>`, else its default."""
+	live, idle = _DEFAULTS.get(source, (_live, 3600.0))
+	value = os.environ.get(f"REFRESH_{source.upper()}")
+	if value:
+		parts = [float(p) for p in value.split(",")]
+		live, idle = parts[0], parts[-1]
+	return Policy(live, max(live, idle))
+
+
+def live_windows(df, first: datetime, days: int = 8) -> list:
+	"""Merged (start, end) live windows of the schedule's events on `days` dates from `first`'s date.
+
+	`first` is timezone-aware; windows are in its timezone.
+	"""
+	if df is None or df.empty:
+		return []
+	starts = df["start_minutes"].to_numpy() if "start_minutes" in df else parse_minutes(df["time"])
+	cutoffs = df["cutoff_minutes"].to_numpy() if "cutoff_minutes" in df else parse_minutes(df["cutoff"])
+	by_day = {}
+	for day, start, cutoff in zip(df["day"].astype(str).str.strip().str.capitalize(), starts.tolist(), cutoffs.tolist()):
+		if start < 0 or day not in DAYS_ORDER:
+			continue
+		end = cutoff if cutoff >= 0 else start + EVENT_MINUTES
+		if end <= start:
+			end += 24 * 60  # cutoff after midnight
+		by_day.setdefault(day, []).append((start, end))
+	midnight = first.replace(hour=0, minute=0, second=0, microsecond=0)
+	windows = []
+	for offset in range(days):
+		day = midnight + timedelta(days=offset)
+		for start, end in by_day.get(DAYS_ORDER[day.weekday()], ()):
+			windows.append((day + timedelta(minutes=start - LEAD_MINUTES), day + timedelta(minutes=end + TAIL_MINUTES)))
+	windows.sort()
+	merged = []
+	for start, end in windows:
+		if merged and start <= merged[-1][1]:
+			merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+		else:
+			merged.append((start, end))
+	return merged
+
+
+class RefreshPlan:
+	"""When each of one venue's sources is next due, and what polling that way saved."""
+
+	def __init__(self, schedule=None, policies: dict | None = None, clock=local_now):
+		self.schedule = schedule  # () -> the venue's normalized schedule, or None
+		self.policies = policies or {source: policy(source) for source in SOURCES}
+		self.clock = clock
+		self._last = {}  # source -> when it was last fetched
+		self._windows = (None, None, [])  # (schedule frame, date, windows from the day before)
+		self._lock = threading.Lock()
+		self._counters = {source: {"polls": 0, "page_fetches": 0, "reads": 0} for source in self.policies}
+
+	def windows(self, now: datetime | None = None) -> list | None:
+		"""Live windows from yesterday (events running past midnight) on; None without a schedule."""
+		now = now or self.clock()
+		df = self.schedule() if self.schedule else None
+		if df is None or df.empty:
+			return None
+		with self._lock:
+			# the schedule cache hands out the same frame until the schedule changes
+			if self._windows[0] is df and self._windows[1] == now.date():
+				return self._windows[2]
+		windows = live_windows(df, now - timedelta(days=1))
+		with self._lock:
+			self._windows = (df, now.date(), windows)
+		return windows
+
+	def live(self, now: datetime | None = None) -> bool:
+		now = now or self.clock()
+		windows = self.windows(now)
+		return windows is None or any(start <= now < end for start, end in windows)
+
+	def next_window(self, after: datetime, now: datetime | None = None) -> datetime | None:
+		"""Start of the first live window after `after` (among those `windows(now)` covers)."""
+		return next((start for start, _ in self.windows(now or after) or () if start > after), None)
+
+	def interval(self, source: str, now: datetime | None = None) -> float:
+		"""Seconds the source's data stays fresh right now."""
+		rule = self.policies[source]
+		return rule.live if self.live(now) else rule.idle
+
+	def next_due(self, source: str, now: datetime | None = None) -> datetime:
+		now = now or self.clock()
+		with self._lock:
+			last = self._last.get(source)
+		if last is None:
+			return now
+		rule = self.policies[source]
+		if self.live(now):
+			return last + timedelta(seconds=rule.live)
+		due = last + timedelta(seconds=rule.idle)
+		opens = self.next_window(last, now)
+		# the first fetch of a window happens as it opens, not up to `idle` later
+		return min(due, opens) if opens is not None else due
+
+	def due(self, source: str, now: datetime | None = None) -> bool:
+		now = now or self.clock()
+		return self.next_due(source, now) <= now
+
+	def sleep(self, sources, now: datetime | None = None) -> float:
+		"""Seconds until the first of `sources` is due, at most REFRESH_TICK."""
+		now = now or self.clock()
+		waits = [(self.next_due(source, now) - now).total_seconds() for source in sources]
+		return max(0.0, min([REFRESH_TICK, *waits]))
+
+	def run(self, source: str, fetch, page: bool = False):
+		"""Fetch `source` now and record it (also when the fetch fails, so it waits its interval)."""
+		try:
+			return fetch()
+		finally:
+			with self._lock:
+				self._last[source] = self.clock()
+				self._counters[source]["page_fetches" if page else "polls"] += 1
+
+	def read(self, source: str, fetch, cached):
+		"""A page's read of `source`: `cached()` while the last fetch is fresh, else `fetch()`."""
+		now = self.clock()
+		with self._lock:
+			self._counters[source]["reads"] += 1
+			last = self._last.get(source)
+		if last is not None and (now - last).total_seconds() < self.interval(source, now):
+			value = cached()
+			if value is not None:
+				return value
+		return self.run(source, fetch, page=True)
+
+	def note_read(self, source: str) -> None:
+		"""Count a page's read of a source it gets from the store or the live feed."""
+		with self._lock:
+			self._counters[source]["reads"] += 1
+
+	def stats(self) -> dict:
+		now = self.clock()
+		out = {"live": int(self.live(now))}
+		with self._lock:
+			counters = {source: dict(c) for source, c in self._counters.items()}
+		for source, c in counters.items():
+			fetches = c["polls"] + c["page_fetches"]
+			c.update(interval=self.interval(source, now), fetches=fetches, saved=c["reads"] - fetches)
+			out[source] = c
+		out["saved"] = sum(out[source]["saved"] for source in counters)
+		return out
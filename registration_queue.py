@@ -0,0 +1,210 @@
+"""Durable, batched write queue for registrations bound for Google Sheets.
+
+`enqueue()` commits the registration to the local SQLite store (store.py) and
+returns, so the UI never waits on the Sheets API. A background worker delivers
+unsynced rows in `append_rows` batches, retrying with exponential backoff and
+jitter, and marks them synced in the store once they land.
+
+Every registration carries an idempotency key (`registration_id`, written as the
+last column). If a batch fails after the request may have reached Google, the
+retry first reads that column back and skips rows that already landed, so each
+registration is delivered exactly once. Unsynced rows are picked up again after
+a restart.
+"""
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+from sheets_client import get_manager
+from store import REGISTRATION_FIELDS as REGISTRATION_HEADERS, Store, get_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# write-ahead log used before the SQLite store; pending rows are migrated on startup
+LEGACY_LOG_PATH = os.path.join(BASE_DIR, "registrations.queue.jsonl")
+
+
+class RegistrationQueue:
+	"""Unsynced rows of the store plus a single background flusher thread."""
+
+	def __init__(self, store: Store | None = None, batch_size: int = 100, flush_interval: float = 2.0, max_backoff: float = 300.0):
+		self.store = store or get_store()
+		self.batch_size = batch_size
+		# wait this long after the first pending row so a rush goes out as one batch
+		self.flush_interval = flush_interval
+		self.max_backoff = max_backoff
+		self._pending = {}  # id -> record, in enqueue order
+		self._maybe_sent = set()  # ids whose batch failed after being sent
+		self._lock = threading.Lock()
+		self._wake = threading.Event()
+		self._worker = None
+		self._counters = {"enqueued": 0, "delivered": 0, "duplicates_skipped": 0, "batches": 0, "retries": 0}
+		self.last_error = None
+		self._replay()
+
+	def enqueue(self, sheet_id: str, registration: dict, tab_name: str = "registrations", service_account_path: str | None = None) -> str:
+		"""Durably queue one registration and return its idempotency key."""
+		record = {
+			"id": registration.get("registration_id") or uuid.uuid4().hex,
+			"sheet_id": sheet_id,
+			"tab": tab_name,
+			"service_account_path": service_account_path,
+			"row": [str(registration.get(h, "")) for h in REGISTRATION_HEADERS],
+			"queued_at": time.time(),
+		}
+		with self._lock:
+			if not self.store.add_registration(record["id"], registration, sheet_id, tab_name, service_account_path):
+				# already stored (a resubmitted form): delivered or pending already
+				return record["id"]
+			self._pending[record["id"]] = record
+			self._counters["enqueued"] += 1
+		self._start_worker()
+		self._wake.set()
+		return record["id"]
+
+	def depth(self) -> int:
+		"""Number of registrations not yet confirmed in the sheet."""
+		with self._lock:
+			return len(self._pending)
+
+	def stats(self) -> dict:
+		with self._lock:
+			out = dict(self._counters)
+			out["depth"] = len(self._pending)
+			oldest = min((r["queued_at"] for r in self._pending.values()), default=None)
+		out["oldest_pending_seconds"] = round(time.time() - oldest, 1) if oldest else 0.0
+		out["last_error"] = str(self.last_error) if self.last_error else ""
+		return out
+
+	def flush(self, timeout: float = 30.0) -> bool:
+		"""Block until the queue is empty (or timeout); returns True if it drained."""
+		self._start_worker()
+		deadline = time.monotonic() + timeout
+		while self.depth() and time.monotonic() < deadline:
+			self._wake.set()
+			time.sleep(0.05)
+		return self.depth() == 0
+
+	def _replay(self) -> None:
+		self._migrate_legacy_log()
+		for r in self.store.unsynced_registrations():
+			self._pending[r["id"]] = {
+				"id": r["id"],
+				"sheet_id": r["sheet_id"],
+				"tab": r["tab"],
+				"service_account_path": r["service_account_path"],
+				"row": [r[h] for h in REGISTRATION_HEADERS],
+				"queued_at": r["queued_at"],
+			}
+		# after a restart we can't know whether in-flight batches landed
+		self._maybe_sent.update(self._pending)
+		if self._pending:
+			self._start_worker()
+			self._wake.set()
+
+	def _migrate_legacy_log(self) -> None:
+		"""Move rows still pending in the old JSONL write-ahead log into the store."""
+		if not os.path.exists(LEGACY_LOG_PATH):
+			return
+		pending = {}
+		with open(LEGACY_LOG_PATH, encoding="utf-8") as f:
+			for line in f:
+				try:
+					record = json.loads(line)
+				except ValueError:
+					# torn final line from a crash mid-write
+					continue
+				if record.get("op") == "enqueue":
+					pending[record["id"]] = record
+				elif record.get("op") == "ack":
+					for rid in record.get("ids", []):
+						pending.pop(rid, None)
+		for record in pending.values():
+			self.store.add_registration(
+				record["id"], dict(zip(REGISTRATION_HEADERS, record["row"])),
+				record["sheet_id"], record["tab"], record["service_account_path"],
+			)
+		os.replace(LEGACY_LOG_PATH, LEGACY_LOG_PATH + ".migrated")
+
+	def _start_worker(self) -> None:
+		with self._lock:
+			if self._worker is not None and self._worker.is_alive():
+				return
+			self._worker = threading.Thread(target=self._run, name="registration-queue", daemon=True)
+			self._worker.start()
+
+	def _next_batch(self) -> list:
+		"""Pending records for the oldest destination, up to batch_size."""
+		with self._lock:
+			records = list(self._pending.values())
+		if not records:
+			return []
+		dest = _destination(records[0])
+		return [r for r in records if _destination(r) == dest][: self.batch_size]
+
+	def _run(self) -> None:
+		failures = 0
+		while True:
+			self._wake.wait()
+			self._wake.clear()
+			if failures == 0:
+				time.sleep(self.flush_interval)
+			batch = self._next_batch()
+			while batch:
+				try:
+					self._deliver(batch)
+					failures = 0
+				except Exception as e:
+					failures += 1
+					self.last_error = e
+					with self._lock:
+						self._counters["retries"] += 1
+						# the append may have landed even though we saw an error
+						self._maybe_sent.update(r["id"] for r in batch)
+					get_manager().invalidate(batch[0]["sheet_id"], batch[0]["tab"])
+					delay = min(self.max_backoff, 2 ** failures) * random.uniform(0.5, 1.5)
+					print(f"Registration flush failed ({len(batch)} rows), retrying in {delay:.1f}s: {e}")
+					time.sleep(delay)
+				batch = self._next_batch()
+
+	def _deliver(self, batch: list) -> None:
+		first = batch[0]
+		ws = get_manager().worksheet(first["sheet_id"], first["tab"], first["service_account_path"], create={"rows": 1000, "cols": 20})
+		to_send = batch
+		with self._lock:
+			uncertain = any(r["id"] in self._maybe_sent for r in batch)
+		if uncertain:
+			# idempotency keys live in the column after the registration fields
+			landed = set(ws.col_values(len(REGISTRATION_HEADERS) + 1))
+			to_send = [r for r in batch if r["id"] not in landed]
+			with self._lock:
+				self._counters["duplicates_skipped"] += len(batch) - len(to_send)
+		if to_send:
+			ws.append_rows([r["row"] + [r["id"]] for r in to_send])
+		ids = [r["id"] for r in batch]
+		self.store.mark_synced(ids)
+		with self._lock:
+			for rid in ids:
+				self._pending.pop(rid, None)
+				self._maybe_sent.discard(rid)
+			self._counters["delivered"] += len(to_send)
+			self._counters["batches"] += 1
+
+
+def _destination(record: dict) -> tuple:
+	return (record["sheet_id"], record["tab"], record["service_account_path"])
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> RegistrationQueue:
+	"""Return the process-wide RegistrationQueue, picking up any unsynced rows."""
+	global _queue
+	with _queue_lock:
+		if _queue is None:
+			_queue = RegistrationQueue()
+		return _queue
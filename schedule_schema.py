@@ -0,0 +1,158 @@
+"""Map published schedule sheets onto the app's 8-column schedule schema.
+
+The alias table is compiled once into a dict keyed by lowercased header, and the
+resolved column mapping is memoized per distinct header signature, so a rerun
+against an unchanged sheet does no header matching at all. The output frame is
+built in one pass from the mapped source columns.
+
+Next to the text shown on the cards, the output carries typed columns parsed
+once per row: start and cutoff as minutes after midnight (int16, -1 when the
+cell isn't a time), the buy-in's first amount (float, NaN for "CASH GAME" and
+the like) and starting chips with K/M expanded (int64, -1 when not a count).
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from profiler import timed
+
+EXPECTED_COLUMNS = ["day", "time", "buy_in", "rebuy", "starting_chips", "cutoff", "notes", "add_on"]
+
+# field -> header aliases (case-insensitive), most preferred first
+ALIASES = {
+	"day": ["day", "dayofweek", "weekday"],
+	"time": ["time", "start time", "start_time", "starttime", "start"],
+	"buy_in": ["buy_in", "buy-in", "buyin", "buy-in (usd)", "buy-in (amount)", "buy-in amount"],
+	"rebuy": ["rebuy", "re-buy", "re buy"],
+	"starting_chips": ["starting_chips", "starting chips", "startingchips", "starting stack"],
+	"cutoff": ["cutoff", "cut-off", "cut off"],
+	"notes": ["notes", "note"],
+	# tournament name often exists; used as the primary part of notes
+	"tournament_name": ["tournament name", "name", "event"],
+	"add_on": ["add-on", "add on", "addon"],
+}
+
+# compiled once: lowercased alias -> (field, preference rank)
+_ALIAS_INDEX = {alias: (field, rank) for field, aliases in ALIASES.items() for rank, alias in enumerate(aliases)}
+
+
+@lru_cache(maxsize=128)
+def resolve_columns(columns: tuple) -> dict:
+	"""Return {field: source column} for a header signature.
+
+	For each field the most preferred alias wins; if two headers differ only in
+	case/whitespace, the later one is used.
+	"""
+	best = {}
+	for col in columns:
+		hit = _ALIAS_INDEX.get(str(col).lower().strip())
+		if hit is None:
+			continue
+		field, rank = hit
+		if field not in best or rank <= best[field][0]:
+			best[field] = (rank, col)
+	return {field: col for field, (_rank, col) in best.items()}
+
+
+def _combined_notes(df: pd.DataFrame, mapping: dict):
+	"""Tournament name and notes joined with ' — ' (notes only when non-empty)."""
+	name_col = mapping.get("tournament_name")
+	notes_col = mapping.get("notes")
+	if notes_col is None:
+		return df[name_col].astype(str) if name_col is not None else ""
+	notes = df[notes_col].astype(str).to_numpy()
+	if name_col is None:
+		return ["" if n == "nan" else n for n in notes]
+	names = df[name_col].astype(str).to_numpy()
+	# single pass over both columns instead of chained Series string ops
+	return [
+		name if (note := n.strip()) in ("", "nan") else f"{name.strip()} — {note}"
+		for name, n in zip(names, notes)
+	]
+
+
+_TIME = re.compile(r"(\d{1,2})(?:[:.](\d{2}))?\s*(?:([AaPp])\.?\s*[Mm]\.?)?")
+_NUMBER = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([KkMm])?")
+
+
+def _per_distinct(values, parse, missing, dtype) -> np.ndarray:
+	# sheet cells repeat a lot ("19:00", "$30", "30K"): parse each distinct value once
+	codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+	# empty cells (code -1) take the last entry
+	return np.array([parse(str(u)) for u in uniques] + [missing], dtype=dtype)[codes]
+
+
+def _minutes(text: str) -> int:
+	m = _TIME.fullmatch(text.strip())
+	if not m:
+		return -1
+	hour, minute, meridiem = int(m[1]), int(m[2] or 0), (m[3] or "").lower()
+	if minute >= 60 or (hour >= 24 if not meridiem else not 1 <= hour <= 12):
+		return -1
+	if meridiem:
+		hour = hour % 12 + (12 if meridiem == "p" else 0)
+	return hour * 60 + minute
+
+
+def _amount(text: str) -> float:
+	m = _NUMBER.search(text)
+	return float(m[1].replace(",", "")) if m else np.nan
+
+
+def _chips(text: str) -> int:
+	m = _NUMBER.search(text)
+	if not m:
+		return -1
+	scale = {"k": 1_000, "m": 1_000_000}.get((m[2] or "").lower(), 1)
+	return round(float(m[1].replace(",", "")) * scale)
+
+
+def parse_minutes(values) -> np.ndarray:
+	"""Minutes after midnight for "19:00", "7:00 PM", "7pm"...; -1 for anything else."""
+	return _per_distinct(values, _minutes, -1, np.int16)
+
+
+def parse_amount(values) -> np.ndarray:
+	"""The first number in each cell ("$30", "$1,000 GTD"); NaN when there is none."""
+	return _per_distinct(values, _amount, np.nan, np.float64)
+
+
+def parse_chips(values) -> np.ndarray:
+	"""Chip counts with K/M expanded ("30K" -> 30000); -1 when there is no number."""
+	return _per_distinct(values, _chips, -1, np.int64)
+
+
+# typed column -> (field it is parsed from, parser)
+TYPED_COLUMNS = {
+	"start_minutes": ("time", parse_minutes),
+	"cutoff_minutes": ("cutoff", parse_minutes),
+	"buy_in_amount": ("buy_in", parse_amount),
+	"chip_count": ("starting_chips", parse_chips),
+}
+SCHEDULE_COLUMNS = EXPECTED_COLUMNS + list(TYPED_COLUMNS)
+
+
+@timed("normalize_schedule_df")
+def normalize_schedule_df(df: pd.DataFrame) -> pd.DataFrame:
+	"""Normalize column names and produce the expected columns.
+
+	This handles common column names from published sheets (case-insensitive) and
+	maps them to: day,time,buy_in,rebuy,starting_chips,cutoff,notes,add_on, followed by
+	the typed columns (TYPED_COLUMNS)
+	"""
+	if df is None or df.empty:
+		return df
+	mapping = resolve_columns(tuple(df.columns))
+	data = {}
+	for field in ("day", "time", "buy_in", "rebuy", "starting_chips", "cutoff"):
+		col = mapping.get(field)
+		data[field] = df[col] if col is not None else ""
+	data["notes"] = _combined_notes(df, mapping)
+	addon_col = mapping.get("add_on")
+	data["add_on"] = df[addon_col].fillna("") if addon_col is not None else ""
+	for name, (field, parse) in TYPED_COLUMNS.items():
+		col = mapping.get(field)
+		data[name] = parse(df[col] if col is not None else [""] * len(df))
+	return pd.DataFrame(data, index=df.index, columns=SCHEDULE_COLUMNS)
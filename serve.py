@@ -0,0 +1,138 @@
+"""Warm up, then serve the app: the Procfile entry point.
+
+`streamlit run app.py` binds the port immediately, so after a dyno wakes from
+idling the first visitor pays for the imports, the first schedule, jackpot and
+leaderboard fetches and encoding the header images. `python serve.py` does that
+work first, in the same process the Streamlit server then runs in, so the
+caches it fills are the ones every session reads:
+
+1. import the app (pandas, streamlit; gspread and PIL stay lazy)
+2. build the image and CSS assets (assets.py)
+3. fetch the default venue's schedule, jackpot and leaderboard (venues.py)
+4. build this week's model, the day cards and the leaderboard's first page
+5. start Streamlit on --port (default $PORT, else 8501), with the Prometheus
+   `/metrics` endpoint (metrics.py) on the same port: Heroku routes only $PORT
+
+Each step is logged with its time; the first full render then logs the time
+since the process started (perf.first_render_done).
+
+Usage:
+  python serve.py --port 8501
+  python serve.py --no-warmup     # same launcher without the warmup, to compare
+"""
+import os
+import time
+
+# before anything heavy is imported: the reference for time to first render
+os.environ.setdefault("PROCESS_STARTED_AT", str(time.time()))
+
+import argparse
+import logging
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+
+
+@contextmanager
+def step(name: str, timings: dict):
+	start = time.perf_counter()
+	try:
+		yield
+	except Exception as e:
+		# a failed warmup step only means that part is fetched on first use
+		print(f"Warmup: {name} failed: {e}")
+	finally:
+		timings[name] = (time.perf_counter() - start) * 1000
+		print(f"Warmup: {name} {timings[name]:.0f} ms")
+
+
+def warmup() -> dict:
+	"""Fill the process-wide caches the first render reads; returns ms per step."""
+	timings = {}
+	# outside a Streamlit run st.* calls only log "missing ScriptRunContext"
+	logging.getLogger("streamlit").setLevel(logging.ERROR)
+	with step("import app", timings):
+		import app
+	with step("assets", timings):
+		import assets
+		assets.get_manifest()
+	with step("data", timings):
+		# the default venue: what a visit without ?venue= renders
+		venue = app.get_registry().get()
+		loads = app.start_page_loads(venue)
+		# same fallback to the local schedule.csv as the page, so the same cache keys
+		schedule = app.page_schedule(loads, venue)
+		loads.get("jackpot")
+		leaders = loads.get("leaderboard")
+	with step("render caches", timings):
+		from cards import day_cards_html
+		from leaderboard import STANDINGS, get_board
+		from week import get_week
+		form_url = venue.config.form_url
+		if schedule is not None and not schedule.empty:
+			week = get_week(schedule, weeks=venue.weeks)
+			today_name = week.today_name()
+			for day in week.days:
+				day_cards_html(day.name, day.rows, today_name, form_url, rows_key=day.rows_key, cache=venue.cards)
+				day_cards_html(day.name, day.rows, today_name, form_url, day.long_date, rows_key=day.rows_key, cache=venue.cards)
+		if leaders is not None and not leaders.empty:
+			get_board(leaders, venue.boards).page_html(STANDINGS, 0, int(os.environ.get("LEADERBOARD_PAGE_SIZE", 50)))
+		app.get_registry().account(venue)
+	logging.getLogger("streamlit").setLevel(logging.INFO)
+	total = time.time() - float(os.environ["PROCESS_STARTED_AT"])
+	print(f"Warmup done {total:.2f}s after process start")
+	return timings
+
+
+def mount_metrics() -> None:
+	"""Add `/metrics` to the Tornado app Streamlit builds, ahead of its catch-all static route."""
+	import tornado.web
+	from streamlit import config
+	from streamlit.web.server import server
+	from streamlit.web.server.server_util import make_url_path_regex
+
+	import metrics
+
+	class MetricsHandler(tornado.web.RequestHandler):
+		def get(self):
+			self.set_header("Content-Type", metrics.CONTENT_TYPE)
+			self.write(metrics.registry.render())
+
+	create_app = server.Server._create_app
+
+	def _create_app(self):
+		app = create_app(self)
+		# host rules added later are matched before the application's own routes
+		app.add_handlers(r".*", [(make_url_path_regex(config.get_option("server.baseUrlPath"), "metrics"), MetricsHandler)])
+		return app
+
+	server.Server._create_app = _create_app
+
+
+def serve(port: int, address: str) -> None:
+	from streamlit.web import bootstrap
+	mount_metrics()
+	flag_options = {
+		"server_port": port,
+		"server_address": address,
+		"server_headless": True,
+		"server_runOnSave": False,
+	}
+	bootstrap.load_config_options(flag_options=flag_options)
+	bootstrap.run(APP_PATH, False, [], flag_options)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Warm up the caches, then start the Streamlit server")
+	parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8501)))
+	parser.add_argument("--address", default="0.0.0.0")
+	parser.add_argument("--no-warmup", action="store_true", help="Bind the port immediately, like `streamlit run`")
+	args = parser.parse_args()
+	if not args.no_warmup:
+		warmup()
+	serve(args.port, args.address)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,189 @@
+"""Shared, authenticated gspread client for every Google Sheets helper.
+
+Authenticating (`gspread.service_account()` / `gspread.oauth()`), exchanging a token
+and fetching spreadsheet metadata (`open_by_key()`, `worksheet()`) each cost an HTTP
+round trip. `SheetsClientManager` does them once per process:
+
+- one `gspread.Client` per credential source, reusing one keep-alive HTTP session
+- tokens are refreshed in the background shortly before they expire
+- `Spreadsheet` and `Worksheet` handles are cached by sheet id and tab name until
+  `invalidate()` is called (e.g. after a tab is renamed or deleted)
+
+gspread is imported lazily so the app still runs without it installed.
+"""
+import threading
+from datetime import datetime, timedelta
+
+from upstream import CONNECT_TIMEOUT, READ_TIMEOUT
+
+OAUTH = "oauth"
+
+
+def _default_credentials(service_account_path: str | None):
+	"""Load credentials the same way gspread.service_account() / gspread.oauth() do."""
+	import gspread
+	if service_account_path:
+		from google.oauth2.service_account import Credentials
+		return Credentials.from_service_account_file(service_account_path, scopes=gspread.auth.DEFAULT_SCOPES)
+	return gspread.oauth().auth
+
+
+def _default_session(credentials):
+	"""Return an authorized requests session with a connection pool sized for concurrent reruns."""
+	from google.auth.transport.requests import AuthorizedSession
+	from requests.adapters import HTTPAdapter
+	session = AuthorizedSession(credentials)
+	adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+	session.mount("https://", adapter)
+	return session
+
+
+class SheetsClientManager:
+	"""Process-wide cache of gspread clients and spreadsheet/worksheet handles."""
+
+	def __init__(self, refresh_margin: float = 300.0, credentials_factory=None, session_factory=None):
+		# refresh tokens this many seconds before they expire
+		self.refresh_margin = timedelta(seconds=refresh_margin)
+		self._credentials_factory = credentials_factory or _default_credentials
+		self._session_factory = session_factory or _default_session
+		self._clients = {}  # credential source -> gspread.Client
+		self._spreadsheets = {}  # (source, sheet_id) -> Spreadsheet
+		self._worksheets = {}  # (source, sheet_id, tab) -> Worksheet
+		self._refreshing = set()
+		self._auth_session = None  # keep-alive session for token refreshes
+		self._lock = threading.RLock()
+		self._counters = {"client_hits": 0, "client_creates": 0, "token_refreshes": 0, "spreadsheet_hits": 0, "spreadsheet_opens": 0, "worksheet_hits": 0, "worksheet_opens": 0}
+
+	def client(self, service_account_path: str | None = None):
+		"""Return the shared gspread.Client for a service account file (or OAuth when None)."""
+		import gspread
+		source = service_account_path or OAUTH
+		with self._lock:
+			gc = self._clients.get(source)
+			if gc is None:
+				credentials = self._credentials_factory(service_account_path)
+				gc = gspread.Client(auth=credentials, session=self._session_factory(credentials))
+				# same connect / read timeouts as the CSV fetches (see upstream.py)
+				gc.set_timeout((CONNECT_TIMEOUT, READ_TIMEOUT))
+				self._clients[source] = gc
+				self._counters["client_creates"] += 1
+			else:
+				self._counters["client_hits"] += 1
+		self._ensure_token(source, gc)
+		return gc
+
+	def spreadsheet(self, sheet_id: str, service_account_path: str | None = None):
+		"""Return a cached `Spreadsheet` handle, opening it on first use."""
+		source = service_account_path or OAUTH
+		key = (source, sheet_id)
+		with self._lock:
+			sh = self._spreadsheets.get(key)
+			if sh is not None:
+				self._counters["spreadsheet_hits"] += 1
+				self._ensure_token(source, sh.client)
+				return sh
+		sh = self.client(service_account_path).open_by_key(sheet_id)
+		with self._lock:
+			self._spreadsheets[key] = sh
+			self._counters["spreadsheet_opens"] += 1
+		return sh
+
+	def worksheet(self, sheet_id: str, tab_name: str | None = None, service_account_path: str | None = None, create: dict | None = None):
+		"""Return a cached `Worksheet` handle; `tab_name=None` means the first worksheet.
+
+		When the tab doesn't exist and `create` is given, it is added with
+		`add_worksheet(title=tab_name, **create)`.
+		"""
+		source = service_account_path or OAUTH
+		key = (source, sheet_id, tab_name)
+		with self._lock:
+			ws = self._worksheets.get(key)
+			if ws is not None:
+				self._counters["worksheet_hits"] += 1
+				self._ensure_token(source, ws.client)
+				return ws
+		sh = self.spreadsheet(sheet_id, service_account_path)
+		if tab_name is None:
+			ws = sh.get_worksheet(0)
+		else:
+			try:
+				ws = sh.worksheet(tab_name)
+			except Exception:
+				if create is None:
+					raise
+				ws = sh.add_worksheet(title=tab_name, **create)
+		with self._lock:
+			self._worksheets[key] = ws
+			self._counters["worksheet_opens"] += 1
+		return ws
+
+	def invalidate(self, sheet_id: str | None = None, tab_name: str | None = None) -> None:
+		"""Forget cached handles: one tab, one spreadsheet (and its tabs), or everything."""
+		with self._lock:
+			if sheet_id is None:
+				self._spreadsheets.clear()
+				self._worksheets.clear()
+				return
+			if tab_name is None:
+				for key in [k for k in self._spreadsheets if k[1] == sheet_id]:
+					del self._spreadsheets[key]
+			for key in [k for k in self._worksheets if k[1] == sheet_id and (tab_name is None or k[2] == tab_name)]:
+				del self._worksheets[key]
+
+	def stats(self) -> dict:
+		with self._lock:
+			return dict(self._counters)
+
+	def _ensure_token(self, source: str, gc) -> None:
+		"""Refresh the token in the background when it is about to expire.
+
+		The first token is fetched by the authorized session on its first request;
+		after that, requests never wait on a token exchange.
+		"""
+		credentials = gc.auth
+		expiry = getattr(credentials, "expiry", None)
+		if not getattr(credentials, "token", None) or expiry is None:
+			return
+		# google-auth keeps expiry as a naive UTC datetime
+		if expiry - datetime.utcnow() >= self.refresh_margin:
+			return
+		with self._lock:
+			if source in self._refreshing:
+				return
+			self._refreshing.add(source)
+		threading.Thread(target=self._refresh_token, args=(source, gc), name="sheets-token-refresh", daemon=True).start()
+
+	def _refresh_token(self, source: str, gc) -> None:
+		from google.auth.transport.requests import Request
+		try:
+			# refresh through a plain session: gspread's login() goes through the
+			# authorized session, which exchanges a second token on the way
+			gc.auth.refresh(Request(self._token_session()))
+			with self._lock:
+				self._counters["token_refreshes"] += 1
+		except Exception as e:
+			# the authorized session refreshes on its next request if this really expired
+			print(f"Background token refresh failed: {e}")
+		finally:
+			with self._lock:
+				self._refreshing.discard(source)
+
+	def _token_session(self):
+		import requests
+		with self._lock:
+			if self._auth_session is None:
+				self._auth_session = requests.Session()
+			return self._auth_session
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> SheetsClientManager:
+	"""Return the process-wide SheetsClientManager."""
+	global _manager
+	with _manager_lock:
+		if _manager is None:
+			_manager = SheetsClientManager()
+		return _manager
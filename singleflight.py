@@ -0,0 +1,110 @@
+"""Single-flight coalescing of identical upstream fetches.
+
+When many sessions start at once (a cold cache after a deploy, a burst of
+visitors from a social post) each script thread would otherwise make its own
+request for the same schedule CSV, jackpot cell or leaderboard tab. `do(key, fn)`
+runs `fn` once per key at a time: the first caller fetches, callers arriving
+while that fetch is in flight wait for it and get the same result (or the same
+exception). Keys are tuples like ("csv", url) or ("sheet", sheet_id, tab).
+`submit(key, fn, executor)` is the asynchronous form used by the page loaders:
+concurrent submits share one Future, so waiting sessions don't each tie up a
+pool thread.
+
+Nothing is cached after the call returns; that is the caches' job (cache.py,
+sync.py). This only collapses concurrent duplicates.
+"""
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+
+class _Call:
+	__slots__ = ("done", "value", "error")
+
+	def __init__(self):
+		self.done = threading.Event()
+		self.value = None
+		self.error = None
+
+
+class SingleFlight:
+	"""Per-key in-flight call table with coalescing counters."""
+
+	def __init__(self):
+		self.enabled = True
+		self._calls = {}
+		self._futures = {}
+		self._lock = threading.Lock()
+		self._counters = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+		self._coalesced_by_kind = Counter()
+
+	def do(self, key: tuple, fn):
+		"""Return `fn()`, sharing one execution among concurrent callers with the same key."""
+		if not self.enabled:
+			return fn()
+		with self._lock:
+			self._counters["calls"] += 1
+			call = self._calls.get(key)
+			leader = call is None
+			if leader:
+				call = self._calls[key] = _Call()
+				self._counters["executions"] += 1
+			else:
+				self._counters["coalesced"] += 1
+				self._coalesced_by_kind[key[0]] += 1
+		if not leader:
+			call.done.wait()
+			if call.error is not None:
+				raise call.error
+			return call.value
+		try:
+			call.value = fn()
+			return call.value
+		except Exception as e:
+			call.error = e
+			with self._lock:
+				self._counters["errors"] += 1
+			raise
+		finally:
+			with self._lock:
+				self._calls.pop(key, None)
+			call.done.set()
+
+	def submit(self, key: tuple, fn, executor) -> Future:
+		"""Submit `fn` to `executor` unless the same key is already running; share its Future."""
+		if not self.enabled:
+			return executor.submit(fn)
+		with self._lock:
+			self._counters["calls"] += 1
+			future = self._futures.get(key)
+			if future is not None:
+				self._counters["coalesced"] += 1
+				self._coalesced_by_kind[key[0]] += 1
+				return future
+			self._counters["executions"] += 1
+			future = self._futures[key] = executor.submit(fn)
+		future.add_done_callback(lambda f: self._finished(key, f))
+		return future
+
+	def _finished(self, key: tuple, future: Future) -> None:
+		with self._lock:
+			if self._futures.get(key) is future:
+				del self._futures[key]
+			if not future.cancelled() and future.exception() is not None:
+				self._counters["errors"] += 1
+
+	def stats(self) -> dict:
+		with self._lock:
+			out = dict(self._counters)
+			out["in_flight"] = len(self._calls) + len(self._futures)
+			out["coalesced_by_kind"] = dict(self._coalesced_by_kind)
+		return out
+
+	def reset_stats(self) -> None:
+		with self._lock:
+			self._counters = dict.fromkeys(self._counters, 0)
+			self._coalesced_by_kind.clear()
+
+
+# shared by every session in the process
+flights = SingleFlight()
@@ -0,0 +1,375 @@
+"""Embedded SQLite store: the local system of record for registrations, player
+counts and the jackpot.
+
+Reads are local queries against `bigslick.db` (WAL mode, so readers never wait
+on the writer) and writes are committed locally before anything talks to Google,
+so a Sheets outage never loses a registration. The sheets are kept in sync in
+the background:
+
+- registrations are pushed by `registration_queue.py`, which works off the
+  rows still marked unsynced here;
+- the jackpot (`JACKPOT_CSV_URL`) and player counts (`PLAYER_COUNTS_CSV_URL`, the
+  published CSV of the sheet made by `create_player_counts_gsheet.py`) are pulled
+  by `StoreSync` on the schedule of the venue's `refresh.RefreshPlan` (often
+  during tournaments, hourly otherwise), and it publishes changes to the
+  in-process feed in `live.py`.
+
+Registration counts per date, day and time are kept as running totals
+(`registration_totals`), so a count is a lookup of a few slots, not a scan of
+every registration ever taken. The flat files `registrations.csv` and
+`player_counts.csv` are append-only histories; `ingest.py` folds the rows added
+since the last pass into the totals and player counts on open and before every
+background pull.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from ingest import flat_files
+from live import hub
+from refresh import Policy, RefreshPlan
+from sync import ConditionalFetcher, fetch_csv, fetcher
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.environ.get("STORE_PATH", os.path.join(BASE_DIR, "bigslick.db"))
+REGISTRATION_FIELDS = ["timestamp", "day", "time", "name", "phone"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations (
+	id TEXT PRIMARY KEY,
+	timestamp TEXT NOT NULL,
+	day TEXT NOT NULL DEFAULT '',
+	time TEXT NOT NULL DEFAULT '',
+	name TEXT NOT NULL DEFAULT '',
+	phone TEXT NOT NULL DEFAULT '',
+	sheet_id TEXT,
+	tab TEXT,
+	service_account_path TEXT,
+	queued_at REAL NOT NULL,
+	synced_at REAL
+);
+CREATE INDEX IF NOT EXISTS registrations_by_day ON registrations(day, time);
+CREATE INDEX IF NOT EXISTS registrations_by_date ON registrations(substr(timestamp, 1, 10), day, time);
+CREATE INDEX IF NOT EXISTS registrations_unsynced ON registrations(queued_at) WHERE synced_at IS NULL AND sheet_id IS NOT NULL;
+
+-- running counts; source is "store" for the rows above, or the flat file a count came from
+CREATE TABLE IF NOT EXISTS registration_totals (
+	source TEXT NOT NULL,
+	date TEXT NOT NULL,
+	day TEXT NOT NULL,
+	time TEXT NOT NULL,
+	n INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY (source, date, day, time)
+);
+CREATE INDEX IF NOT EXISTS registration_totals_by_day ON registration_totals(day, time);
+
+-- source is the flat file a count came from, NULL for the sheet's
+CREATE TABLE IF NOT EXISTS player_counts (
+	date TEXT NOT NULL,
+	tournament TEXT NOT NULL,
+	players INTEGER NOT NULL DEFAULT 0,
+	updated_at REAL NOT NULL,
+	source TEXT,
+	PRIMARY KEY (date, tournament)
+);
+CREATE INDEX IF NOT EXISTS player_counts_by_tournament ON player_counts(tournament, date);
+
+CREATE TABLE IF NOT EXISTS kv (
+	key TEXT PRIMARY KEY,
+	value TEXT,
+	updated_at REAL NOT NULL
+);
+"""
+
+_ADD_TOTAL = (
+	"INSERT INTO registration_totals (source, date, day, time, n) VALUES (?, ?, ?, ?, ?)"
+	" ON CONFLICT(source, date, day, time) DO UPDATE SET n = n + excluded.n"
+)
+_SET_PLAYERS = (
+	"INSERT INTO player_counts (date, tournament, players, updated_at, source) VALUES (?, ?, ?, ?, ?)"
+	" ON CONFLICT(date, tournament) DO UPDATE SET players = excluded.players, updated_at = excluded.updated_at, source = excluded.source"
+	" WHERE players != excluded.players OR source IS NOT excluded.source"
+)
+_SET_VALUE = (
+	"INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?)"
+	" ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at"
+)
+
+
+class Store:
+	"""Thread-safe access to the SQLite file; one connection per thread."""
+
+	def __init__(self, path: str = STORE_PATH, import_legacy: bool = True):
+		self.path = path
+		self._local = threading.local()
+		self._write_lock = threading.Lock()
+		with self._write_lock, self._conn() as conn:
+			conn.executescript(SCHEMA)
+			# stores that predate player_counts.source
+			if "source" not in {r["name"] for r in conn.execute("PRAGMA table_info(player_counts)")}:
+				conn.execute("ALTER TABLE player_counts ADD COLUMN source TEXT")
+		# the flat files belong to the original venue only
+		self.tails = flat_files(self) if import_legacy else []
+		self._migrate_totals()
+		self.ingest()
+
+	def _conn(self) -> sqlite3.Connection:
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			conn = sqlite3.connect(self.path, timeout=10)
+			conn.row_factory = sqlite3.Row
+			conn.execute("PRAGMA journal_mode=WAL")
+			# registrations must survive a crash right after the form returns
+			conn.execute("PRAGMA synchronous=FULL")
+			self._local.conn = conn
+		return conn
+
+	def _write(self, sql: str, params=()) -> int:
+		with self._write_lock, self._conn() as conn:
+			return conn.execute(sql, params).rowcount
+
+	def _write_many(self, sql: str, rows: list) -> None:
+		with self._write_lock, self._conn() as conn:
+			conn.executemany(sql, rows)
+
+	# registrations
+
+	def add_registration(self, registration_id: str, registration: dict, sheet_id: str | None = None, tab: str | None = None, service_account_path: str | None = None) -> bool:
+		"""Record a registration; returns False if that id is already stored."""
+		values = [str(registration.get(f, "")) for f in REGISTRATION_FIELDS]
+		with self._write_lock, self._conn() as conn:
+			added = conn.execute(
+				"INSERT OR IGNORE INTO registrations (id, timestamp, day, time, name, phone, sheet_id, tab, service_account_path, queued_at)"
+				" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+				[registration_id, *values, sheet_id, tab, service_account_path, time.time()],
+			).rowcount == 1
+			if added:
+				conn.execute(_ADD_TOTAL, ("store", values[0][:10], values[1], values[2], 1))
+		return added
+
+	def unsynced_registrations(self) -> list:
+		"""Registrations bound for a sheet that haven't been confirmed there, oldest first."""
+		rows = self._conn().execute(
+			"SELECT * FROM registrations WHERE synced_at IS NULL AND sheet_id IS NOT NULL ORDER BY queued_at"
+		).fetchall()
+		return [dict(r) for r in rows]
+
+	def mark_synced(self, ids: list) -> None:
+		now = time.time()
+		self._write_many("UPDATE registrations SET synced_at = ? WHERE id = ?", [(now, rid) for rid in ids])
+
+	def registration_counts(self, day: str | None = None, date: str | None = None) -> dict:
+		"""{(day, time): registrations}, optionally for one weekday and/or one ISO date."""
+		sql = "SELECT day, time, SUM(n) AS n FROM registration_totals"
+		where, params = [], []
+		if date is not None:
+			where.append("date = ?")
+			params.append(date)
+		if day is not None:
+			where.append("day = ?")
+			params.append(day)
+		if where:
+			sql += " WHERE " + " AND ".join(where)
+		rows = self._conn().execute(sql + " GROUP BY day, time", params).fetchall()
+		return {(r["day"], r["time"]): r["n"] for r in rows}
+
+	# player counts
+
+	def set_player_counts(self, rows: list) -> None:
+		"""Upsert (date, tournament, players) rows."""
+		now = time.time()
+		self._write_many(_SET_PLAYERS, [(str(d), str(t), int(p), now, None) for d, t, p in rows])
+
+	def player_counts(self, date: str | None = None) -> dict:
+		"""{tournament: players} for one date, or {(date, tournament): players} for all."""
+		if date is not None:
+			rows = self._conn().execute("SELECT tournament, players FROM player_counts WHERE date = ?", (date,)).fetchall()
+			return {r["tournament"]: r["players"] for r in rows}
+		rows = self._conn().execute("SELECT date, tournament, players FROM player_counts").fetchall()
+		return {(r["date"], r["tournament"]): r["players"] for r in rows}
+
+	def player_count(self, date: str, tournament: str) -> int:
+		row = self._conn().execute(
+			"SELECT players FROM player_counts WHERE date = ? AND tournament = ?", (date, tournament)
+		).fetchone()
+		return row["players"] if row else 0
+
+	# jackpot and other single values
+
+	def get_value(self, key: str) -> str | None:
+		row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+		return row["value"] if row else None
+
+	def set_value(self, key: str, value: str) -> None:
+		self._write(_SET_VALUE, (key, value, time.time()))
+
+	def jackpot(self) -> str | None:
+		return self.get_value("jackpot")
+
+	def set_jackpot(self, amount: str) -> None:
+		self.set_value("jackpot", amount)
+
+	def stats(self) -> dict:
+		conn = self._conn()
+		return {
+			"registrations": conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0],
+			"unsynced_registrations": conn.execute(
+				"SELECT COUNT(*) FROM registrations WHERE synced_at IS NULL AND sheet_id IS NOT NULL"
+			).fetchone()[0],
+			"player_counts": conn.execute("SELECT COUNT(*) FROM player_counts").fetchone()[0],
+			**self.ingest_stats(),
+		}
+
+	# flat-file ingestion (ingest.py)
+
+	def ingest(self) -> int:
+		"""Fold rows appended to the flat files since the last pass; returns how many."""
+		return sum(tail.refresh() for tail in self.tails)
+
+	def apply_ingest(self, kind: str, source: str, delta: dict, key: str, state: str) -> None:
+		"""Apply one chunk's aggregates and the file offset after it, in one transaction."""
+		now = time.time()
+		with self._write_lock, self._conn() as conn:
+			if kind == "registrations":
+				conn.executemany(_ADD_TOTAL, [(source, d, day, t, n) for (d, day, t), n in delta.items()])
+			else:
+				conn.executemany(_SET_PLAYERS, [(d, t, p, now, source) for (d, t), p in delta.items()])
+			conn.execute(_SET_VALUE, (key, state, now))
+
+	def reset_ingest(self, kind: str, source: str, key: str, state: str) -> None:
+		"""Drop everything a flat file contributed and restart its offset (`state`), in one transaction."""
+		with self._write_lock, self._conn() as conn:
+			if kind == "registrations":
+				conn.execute("DELETE FROM registration_totals WHERE source = ?", (source,))
+			else:
+				conn.execute("DELETE FROM player_counts WHERE source = ?", (source,))
+			conn.execute(_SET_VALUE, (key, state, time.time()))
+
+	def _migrate_totals(self) -> None:
+		"""Build the totals once for a store that predates them."""
+		if self.get_value("totals_built"):
+			return
+		with self._write_lock, self._conn() as conn:
+			conn.execute(
+				"INSERT INTO registration_totals (source, date, day, time, n)"
+				" SELECT 'store', substr(timestamp, 1, 10), day, time, COUNT(*) FROM registrations"
+				" GROUP BY substr(timestamp, 1, 10), day, time"
+			)
+			conn.execute(_SET_VALUE, ("totals_built", "1", time.time()))
+		# files imported whole by an older version: those rows are in the store already
+		if self.get_value("legacy_imported"):
+			for tail in self.tails:
+				if tail.state() is None:
+					tail.skip_to_end()
+
+	def ingest_stats(self) -> dict:
+		"""Per flat file: rows, bytes and chunks ingested, current offset and last refresh time."""
+		return {f"{tail.kind}_{k}": v for tail in self.tails for k, v in tail.stats().items()}
+
+
+class StoreSync:
+	"""Background pull of the jackpot and player counts from their published sheets.
+
+	After every pull the current values are published to `live.hub`; sessions
+	read them from there, so this thread is the only upstream poller. A venue's
+	sync (see venues.py) brings its own fetcher and publishes under its topic prefix.
+
+	Each source is pulled when `plan` says it is due (see refresh.py); `jobs`
+	adds other sources the thread keeps fresh, e.g. {"leaderboard": fetch}.
+	Without a plan every source is pulled every `interval` seconds.
+	"""
+
+	def __init__(self, store: Store, jackpot_url: str | None, player_counts_url: str | None, interval: float = 15.0, using: ConditionalFetcher | None = None, prefix: str = "", plan: RefreshPlan | None = None, jobs: dict | None = None):
+		self.store = store
+		self.jackpot_url = jackpot_url
+		self.player_counts_url = player_counts_url
+		self.interval = interval
+		self.fetcher = fetcher if using is None else using
+		self.prefix = prefix
+		self.jobs = {
+			**({"jackpot": self.pull_jackpot} if jackpot_url else {}),
+			**({"player_counts": self.pull_player_counts} if player_counts_url else {}),
+			**(jobs or {}),
+		}
+		self.plan = plan or RefreshPlan(policies={source: Policy(interval, interval) for source in self.jobs})
+		self.last_error = None
+		self._stopped = threading.Event()
+		self._thread = threading.Thread(target=self._run, name=f"store-sync-{prefix.rstrip(':')}" if prefix else "store-sync", daemon=True)
+
+	def start(self) -> "StoreSync":
+		# last-known values are live immediately, before the first pull lands
+		self.publish()
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		"""Stop polling after the current pull."""
+		self._stopped.set()
+
+	def publish(self) -> None:
+		jackpot = self.store.jackpot()
+		if jackpot is not None:
+			hub.publish(self.prefix + "jackpot", jackpot)
+		hub.publish(self.prefix + "player_counts", self.store.player_counts())
+
+	def pull_jackpot(self) -> None:
+		# conditional GETs: an unchanged sheet costs a 304 and no parsing
+		amount, changed = self.fetcher.get(self.jackpot_url, lambda body: body.decode("utf-8").strip())
+		if changed or self.store.jackpot() is None:
+			self.store.set_jackpot(amount)
+
+	def pull_player_counts(self) -> None:
+		df = fetch_csv(self.player_counts_url, self.fetcher)
+		self.store.set_player_counts(df[["date", "tournament", "players"]].fillna(0).itertuples(index=False, name=None))
+
+	def sync_once(self) -> None:
+		"""Pull every source now, due or not."""
+		# rows appended to the flat files first, so the sheet's values land on top
+		self.store.ingest()
+		for source, pull in self.jobs.items():
+			self.plan.run(source, pull)
+
+	def _run(self) -> None:
+		while not self._stopped.is_set():
+			try:
+				self.store.ingest()
+				failed = None
+				for source, pull in self.jobs.items():
+					if not self.plan.due(source):
+						continue
+					try:
+						self.plan.run(source, pull)
+					except Exception as e:
+						failed = e
+						print(f"Store sync of {source} failed: {e}")
+				self.last_error = failed
+				self.publish()
+			except Exception as e:
+				self.last_error = e
+				print(f"Store sync failed: {e}")
+			self._stopped.wait(self.plan.sleep(self.jobs))
+
+
+_store = None
+_sync = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Store:
+	"""Return the process-wide Store."""
+	global _store
+	with _store_lock:
+		if _store is None:
+			_store = Store()
+		return _store
+
+
+def start_sync(jackpot_url: str | None = None, player_counts_url: str | None = None, plan: RefreshPlan | None = None, jobs: dict | None = None) -> StoreSync:
+	"""Start the background sheet pull once per process."""
+	global _sync
+	store = get_store()
+	with _store_lock:
+		if _sync is None:
+			_sync = StoreSync(store, jackpot_url, player_counts_url, float(os.environ.get("STORE_SYNC_INTERVAL", 15)), plan=plan, jobs=jobs).start()
+		return _sync
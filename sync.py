@@ -0,0 +1,291 @@
+"""Incremental sync of published Google Sheet CSVs.
+
+`ConditionalFetcher` remembers each URL's ETag / Last-Modified and sends them back
+as If-None-Match / If-Modified-Since. On a 304 (or a 200 with byte-identical
+content) the previously parsed result is returned without parsing anything.
+Requests go through upstream.py; a failing source is served from the last
+parsed result or the on-disk snapshot. Given a `table` (the schedule, the
+leaderboard export and other CSV frames), every parse of a new body is also
+kept as a typed columnar snapshot (columnar.py); a process's first request that
+would otherwise re-parse the body snapshot (a 304, or a failing source) opens
+that instead, memory-mapped.
+
+`ScheduleSync` sits on top for the schedule CSV: when the content did change it
+hashes every raw row and only re-normalizes rows it hasn't seen before, reusing
+the normalized form of unchanged rows. Days whose rows are unchanged keep the same
+content hash, so their cached card HTML (cards.py) is reused as well.
+"""
+import hashlib
+import io
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import columnar
+import metrics
+from schedule_schema import SCHEDULE_COLUMNS, normalize_schedule_df
+from singleflight import flights
+from upstream import CircuitOpenError, Response, upstream
+
+
+class ConditionalFetcher:
+	"""Conditional GETs with a per-URL parsed-result cache, failing over to the last good copy."""
+
+	def __init__(self):
+		self._state = {}  # url -> {"etag", "last_modified", "digest", "parsed"}
+		self._lock = threading.Lock()
+		self._counters = {"not_modified": 0, "unchanged_body": 0, "changed": 0, "error": 0, "failover": 0, "tables_read": 0, "tables_written": 0}
+
+	def get(self, url: str, parse, table=None):
+		"""Return `(parsed, changed)`; `parse(body_bytes)` only runs when content changed.
+
+		Requests go through `upstream` (timeouts, retries, circuit breaker). When the
+		source fails, the last parsed result is returned unchanged, or else its on-disk
+		snapshot is parsed; only with neither does the error propagate.
+
+		`table` (a `FrameTable` or `ScheduleSync`) turns parsed results into frames
+		and back, so they are kept as columnar snapshots and restored from them
+		instead of parsing a snapshot body again.
+		"""
+		with self._lock:
+			state = dict(self._state.get(url, {}))
+		snapshot = None
+		if "parsed" not in state:
+			# first request in this process: revalidate the last-known-good snapshot
+			snapshot = upstream.snapshot(url)
+			if snapshot is not None:
+				state = {"etag": snapshot.etag, "last_modified": snapshot.last_modified}
+		headers = {}
+		if state.get("etag"):
+			headers["If-None-Match"] = state["etag"]
+		if state.get("last_modified"):
+			headers["If-Modified-Since"] = state["last_modified"]
+		started = time.perf_counter()
+		try:
+			response = upstream.fetch(url, headers)
+		except Exception as e:
+			self._count("error", started)
+			return self._failover(url, state, snapshot, parse, table, e)
+		revalidated = response.status == 304
+		if revalidated:
+			self._count("not_modified", started)
+			if "parsed" in state:
+				return state["parsed"], False
+			# the snapshot on disk is still current: parse it instead of downloading
+			response = Response(200, snapshot.body, response.etag or snapshot.etag, response.last_modified or snapshot.last_modified)
+		digest = hashlib.sha256(response.body).hexdigest()
+		if "parsed" in state and digest == state.get("digest"):
+			# upstream without validators (or a weak cache) sent the same bytes again
+			self._count("unchanged_body", started)
+			parsed, changed = state["parsed"], False
+		else:
+			if not revalidated:
+				self._count("changed", started)
+				upstream.save_snapshot(url, response)
+			parsed = self._restore(url, digest, table) if revalidated else None
+			if parsed is None:
+				parsed = parse(response.body)
+				self._keep(url, digest, table, parsed)
+			changed = True
+		with self._lock:
+			self._state[url] = {"etag": response.etag, "last_modified": response.last_modified, "digest": digest, "parsed": parsed}
+		return parsed, changed
+
+	def _restore(self, url: str, digest: str, table):
+		"""The parsed result from `url`'s columnar snapshot of this exact body, or None."""
+		if table is None:
+			return None
+		loaded = columnar.load(upstream.table_path(url), digest=digest)
+		if loaded is None:
+			return None
+		with self._lock:
+			self._counters["tables_read"] += 1
+		return table.restore(url, *loaded)
+
+	def _keep(self, url: str, digest: str, table, parsed) -> None:
+		"""Write `parsed` as `url`'s columnar snapshot; never raises."""
+		if table is None:
+			return
+		try:
+			dumped = table.dump(url, parsed)
+			if dumped is None:
+				return
+			frame, meta = dumped
+			columnar.save(upstream.table_path(url), frame, digest=digest, url=url, **meta)
+		except (columnar.UnsupportedColumn, OSError) as e:
+			print(f"Columnar snapshot of {url} skipped: {e}")
+			return
+		with self._lock:
+			self._counters["tables_written"] += 1
+
+	def _failover(self, url: str, state: dict, snapshot: Response | None, parse, table, error: Exception):
+		if "parsed" in state:
+			parsed, changed = state["parsed"], False
+		else:
+			snapshot = snapshot or upstream.snapshot(url)
+			if snapshot is None:
+				raise error
+			digest = hashlib.sha256(snapshot.body).hexdigest()
+			parsed = self._restore(url, digest, table)
+			if parsed is None:
+				parsed = parse(snapshot.body)
+			changed = True
+			with self._lock:
+				self._state[url] = {"etag": snapshot.etag, "last_modified": snapshot.last_modified, "digest": digest, "parsed": parsed}
+		with self._lock:
+			self._counters["failover"] += 1
+		metrics.inc("upstream_failovers_total")
+		if not isinstance(error, CircuitOpenError):
+			print(f"Upstream failed, serving the last good copy of {url}: {error}")
+		return parsed, changed
+
+	def cached(self, url: str):
+		"""The last parsed result of `url` without a request, or None."""
+		with self._lock:
+			return self._state.get(url, {}).get("parsed")
+
+	def forget(self, url: str) -> None:
+		with self._lock:
+			self._state.pop(url, None)
+
+	def values(self) -> list:
+		"""The last parsed result of every URL."""
+		with self._lock:
+			return [state["parsed"] for state in self._state.values()]
+
+	def stats(self) -> dict:
+		with self._lock:
+			return dict(self._counters)
+
+	def _count(self, name: str, started: float) -> None:
+		metrics.observe("upstream_request_seconds", time.perf_counter() - started, outcome=name)
+		with self._lock:
+			self._counters[name] += 1
+
+
+def read_csv_bytes(body: bytes) -> pd.DataFrame:
+	return pd.read_csv(io.BytesIO(body))
+
+
+class FrameTable:
+	"""Columnar snapshots for a parse that returns a plain frame (dtypes as first inferred)."""
+
+	def dump(self, url: str, df: pd.DataFrame) -> tuple[pd.DataFrame, dict] | None:
+		return df, {}
+
+	def restore(self, url: str, df: pd.DataFrame, meta: dict) -> pd.DataFrame:
+		return df
+
+
+frame_table = FrameTable()
+
+
+class ScheduleSync:
+	"""Fetch + normalize the schedule CSV, re-normalizing only rows that changed."""
+
+	def __init__(self, fetcher: ConditionalFetcher):
+		self.fetcher = fetcher
+		self._normalized = {}  # url -> (header signature, normalized frame indexed by raw row hash, row hashes in order)
+		self._lock = threading.Lock()
+		self._counters = {"rows_normalized": 0, "rows_reused": 0, "rows_restored": 0}
+		self.changed_days = {}  # url -> days touched by the last content change
+
+	def load(self, url: str) -> pd.DataFrame:
+		"""Return the normalized schedule; a shared frame, so callers must copy before mutating."""
+		# concurrent sessions share one request (and one normalize) per URL
+		df, _changed = flights.do(
+			("schedule", url),
+			lambda: self.fetcher.get(url, lambda body: self._normalize_incremental(url, read_csv_bytes(body)), table=self),
+		)
+		return df
+
+	def _normalize_incremental(self, url: str, raw: pd.DataFrame) -> pd.DataFrame:
+		if raw.empty:
+			return normalize_schedule_df(raw)
+		signature = tuple(raw.columns)
+		hashes = pd.Index(pd.util.hash_pandas_object(raw, index=False).to_numpy())
+		with self._lock:
+			previous = self._normalized.get(url)
+		if previous is None or previous[0] != signature:
+			# first load or the header row changed: everything is new
+			prev_frame = None
+			reused_mask = np.zeros(len(raw), dtype=bool)
+		else:
+			prev_frame = previous[1]
+			reused_mask = hashes.isin(prev_frame.index)
+		new_rows = raw[~reused_mask]
+		fresh = normalize_schedule_df(new_rows) if not new_rows.empty else pd.DataFrame(columns=SCHEDULE_COLUMNS)
+		fresh.index = hashes[~reused_mask]
+		parts = [fresh]
+		changed_days = set(fresh["day"].astype(str))
+		if prev_frame is not None:
+			parts.append(prev_frame.loc[hashes[reused_mask].unique()])
+			removed = prev_frame[~prev_frame.index.isin(hashes)]
+			changed_days |= set(removed["day"].astype(str))
+		by_hash = pd.concat([p for p in parts if not p.empty])
+		by_hash = by_hash[~by_hash.index.duplicated()]
+		out = by_hash.loc[hashes].reset_index(drop=True)
+		# content version of the normalized schedule; copies keep it (see week.py)
+		version = hashlib.blake2b(hashes.to_numpy().tobytes() + repr(signature).encode(), digest_size=16)
+		out.attrs["version"] = version.hexdigest()
+		with self._lock:
+			self._normalized[url] = (signature, by_hash, hashes)
+			self._counters["rows_normalized"] += int((~reused_mask).sum())
+			self._counters["rows_reused"] += int(reused_mask.sum())
+			self.changed_days[url] = changed_days
+		return out
+
+	# columnar snapshots (see ConditionalFetcher.get): the normalized rows in
+	# order, indexed by raw row hash, so a restart restores the reuse state too
+
+	def dump(self, url: str, out: pd.DataFrame) -> tuple[pd.DataFrame, dict] | None:
+		with self._lock:
+			entry = self._normalized.get(url)
+		if entry is None:
+			# an empty sheet: nothing normalized to keep
+			return None
+		signature, by_hash, hashes = entry
+		frame = by_hash.loc[hashes]
+		frame.attrs["version"] = out.attrs.get("version")
+		return frame, {"signature": list(signature)}
+
+	def restore(self, url: str, frame: pd.DataFrame, meta: dict) -> pd.DataFrame:
+		# set_axis without a copy: the typed columns stay memory-mapped
+		out = frame.set_axis(pd.RangeIndex(len(frame)), copy=False)
+		by_hash = frame if frame.index.is_unique else frame[~frame.index.duplicated()]
+		with self._lock:
+			self._normalized[url] = (tuple(meta["signature"]), by_hash, frame.index)
+			self._counters["rows_restored"] += len(frame)
+			self.changed_days[url] = set(out["day"].astype(str))
+		return out
+
+	def values(self) -> list:
+		"""The normalized rows kept for reuse, one frame per URL."""
+		with self._lock:
+			return [frame for _signature, frame, _hashes in self._normalized.values()]
+
+	def stats(self) -> dict:
+		with self._lock:
+			return dict(self._counters, **self.fetcher.stats())
+
+
+fetcher = ConditionalFetcher()
+schedule_sync = ScheduleSync(fetcher)
+
+
+def gviz_csv_url(sheet_id: str, tab: str) -> str:
+	"""CSV export URL of one tab of a public Google Sheet."""
+	return f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={tab}"
+
+
+def fetch_csv(url: str, using: ConditionalFetcher | None = None) -> pd.DataFrame:
+	"""Conditionally fetch and parse any CSV URL (e.g. the gviz leaderboard export).
+
+	`using` is the fetcher that keeps the validators and parsed copy (a venue's
+	own, see venues.py); default the process-wide one.
+	"""
+	using = fetcher if using is None else using
+	df, _changed = flights.do(("csv", url), lambda: using.get(url, read_csv_bytes, table=frame_table))
+	return df
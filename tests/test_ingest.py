@@ -0,0 +1,80 @@
+"""Replacing a flat file drops what the old one contributed (ingest.py, store.py)."""
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ingest import CsvTail  # noqa: E402
+from store import Store  # noqa: E402
+
+REGISTRATIONS = "timestamp,day,time,name,phone\n"
+PLAYER_COUNTS = "date,tournament,players\n"
+
+
+class ReplacedFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = Store(os.path.join(self.directory.name, "store.db"), import_legacy=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_registrations_replaced_by_header_only_file(self):
+        path = self.write("registrations.csv", REGISTRATIONS + "".join(
+            f"2026-10-1{i}T19:00:00,Monday,19:00,Player {i},555\n" for i in range(3)
+        ))
+        tail = CsvTail(self.store, path, "registrations")
+        self.assertEqual(tail.refresh(), 3)
+        self.assertEqual(self.store.registration_counts(), {("Monday", "19:00"): 3})
+
+        self.write("registrations.csv", REGISTRATIONS)
+        self.assertEqual(tail.refresh(), 0)
+        self.assertEqual(self.store.registration_counts(), {})
+        self.assertEqual(tail.state()["offset"], len(REGISTRATIONS))
+        # the new file is now the known one: not replaced again on the next refresh
+        tail.refresh()
+        self.assertEqual(tail.stats()["resets"], 1)
+
+    def test_registrations_replaced_by_unsettled_first_row(self):
+        path = self.write("registrations.csv", REGISTRATIONS + "2026-10-12T19:00:00,Monday,19:00,A,1\n" * 2)
+        tail = CsvTail(self.store, path, "registrations")
+        tail.refresh()
+        # a first row still being written (no newline, just modified) is not read yet
+        self.write("registrations.csv", REGISTRATIONS + "2026-10-13T20:00:00,Tuesday,20")
+        self.assertEqual(tail.refresh(), 0)
+        self.assertEqual(self.store.registration_counts(), {})
+        tail.refresh()
+        self.assertEqual(tail.stats()["resets"], 1)
+
+    def test_player_counts_replaced(self):
+        path = self.write("player_counts.csv", PLAYER_COUNTS + "2026-10-12,Monday NLH,40\n2026-10-12,Monday PLO,12\n")
+        tail = CsvTail(self.store, path, "player_counts")
+        self.assertEqual(tail.refresh(), 2)
+        # a count pulled from the sheet is not the file's to drop
+        self.store.set_player_counts([("2026-10-13", "Tuesday NLH", 30)])
+
+        self.write("player_counts.csv", PLAYER_COUNTS + "2026-10-19,Monday NLH,25\n")
+        self.assertEqual(tail.refresh(), 1)
+        self.assertEqual(self.store.player_counts(), {
+            ("2026-10-19", "Monday NLH"): 25,
+            ("2026-10-13", "Tuesday NLH"): 30,
+        })
+
+        self.write("player_counts.csv", PLAYER_COUNTS)
+        self.assertEqual(tail.refresh(), 0)
+        self.assertEqual(self.store.player_counts(), {("2026-10-13", "Tuesday NLH"): 30})
+        tail.refresh()
+        self.assertEqual(tail.stats()["resets"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Overlapping profiled reruns each record only their own work (profiler.py)."""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import profiler  # noqa: E402
+from loaders import PageLoads, Source  # noqa: E402
+
+
+@profiler.timed("work")
+def work() -> int:
+    return 1
+
+
+class OverlappingProfilesTest(unittest.TestCase):
+    def test_each_profile_records_only_its_rerun(self):
+        barrier = threading.Barrier(2)
+        profiles = {}
+
+        def rerun(label: str, calls: int, fetched: int) -> None:
+            with profiler.profile_rerun(label) as profile:
+                profiles[label] = profile
+                # both profiles are running from here until both reruns are done
+                barrier.wait()
+                for _ in range(calls):
+                    work()
+                loads = PageLoads([Source("data", lambda: [work() for _ in range(fetched)], 5)])
+                self.assertEqual(len(loads.get("data")), fetched)
+                barrier.wait()
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.dict(os.environ, {"PROFILE_RERUNS": "1"}), \
+                mock.patch.object(profiler, "PROFILE_DIR", directory):
+            threads = [threading.Thread(target=rerun, args=("a", 3, 2)), threading.Thread(target=rerun, args=("b", 7, 4))]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(profiles["a"].functions["work"][0], 3 + 2)
+        self.assertEqual(profiles["b"].functions["work"][0], 7 + 4)
+
+    def test_unprofiled_rerun_records_nothing(self):
+        with mock.patch.dict(os.environ, {"PROFILE_RERUNS": ""}):
+            with profiler.profile_rerun("off") as profile:
+                work()
+        self.assertIsNone(profile)
+        self.assertIsNone(profiler._current.get())
+
+
+if __name__ == "__main__":
+    unittest.main()
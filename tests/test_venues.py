@@ -0,0 +1,70 @@
+"""An open session's live panel keeps working after its venue is evicted (venues.py, app.py)."""
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import venues  # noqa: E402
+from live import hub  # noqa: E402
+
+
+def live_script():
+    # what the fragment's timer re-runs: the arguments it got at the last full rerun
+    import app
+    app.live_panel("", None, "north")
+
+
+class EvictedVenueLivePanelTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "venues.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"default": "home", "venues": [
+                {"id": "home", "name": "Home"},
+                {"id": "north", "name": "North", "store_path": os.path.join(self.directory.name, "north.db")},
+                {"id": "south", "name": "South", "store_path": os.path.join(self.directory.name, "south.db")},
+            ]}, f)
+        self.registry = venues.VenueRegistry(path, max_active=1)
+        self._registry, venues._registry = venues._registry, self.registry
+
+    def tearDown(self):
+        for state in list(self.registry._states.values()):
+            state.close()
+        # let the stopped sync threads finish their pass before the store files go
+        for thread in threading.enumerate():
+            if thread.name.startswith("store-sync-"):
+                thread.join(5)
+        venues._registry = self._registry
+        self.directory.cleanup()
+
+    def test_fragment_rerun_after_eviction(self):
+        north = self.registry.get("north")
+        north.store().set_jackpot("12,345")
+        north.start_sync()
+
+        at = AppTest.from_function(live_script, default_timeout=60).run()
+        self.assertFalse(at.exception)
+        self.assertIn("$12,345", at.markdown[0].value)
+
+        # another venue's visit evicts this one: its sync stops, its topics are dropped
+        self.registry.get("south")
+        self.assertTrue(north.closed)
+        self.assertIsNone(hub.latest("north:jackpot"))
+
+        at.run()
+        self.assertFalse(at.exception)
+        self.assertIn("$12,345", at.markdown[0].value)
+        reopened = self.registry._states["north"]
+        self.assertIsNot(reopened, north)
+        self.assertIsNotNone(reopened._sync)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,283 @@
+"""Shared upstream fetch layer: timeouts, retries, circuit breakers and snapshots.
+
+Every request for a published sheet (schedule, gviz leaderboard export, jackpot
+and player counts, all through `sync.ConditionalFetcher`) goes through
+`upstream.fetch()`:
+
+- separate connect and read timeouts (`UPSTREAM_CONNECT_TIMEOUT`, default 3 s,
+  covers TCP + TLS; `UPSTREAM_READ_TIMEOUT`, default 10 s, per blocking read)
+  and an overall `UPSTREAM_DEADLINE` (default 15 s) per fetch, retries included,
+  so a slow Google never holds a thread for long;
+- up to `UPSTREAM_RETRIES` (default 2) retries of connection errors (connect
+  timeouts included, read timeouts not), 429s and 5xx, after a full-jitter exponential backoff (`UPSTREAM_BACKOFF`,
+  default 0.2 s, doubled per attempt);
+- a circuit breaker per source URL: after `UPSTREAM_BREAKER_FAILURES`
+  (default 3) failed fetches in a row it opens and fetches fail at once,
+  without touching the network, for `UPSTREAM_BREAKER_RESET` seconds (default
+  30); then a single probe is let through and closes it again on success.
+
+Changed bodies are saved as last-known-good snapshots under `SNAPSHOT_DIR`
+(default `snapshots/`), written atomically with their validators. When a source
+fails or its breaker is open the fetcher serves what it already parsed, or
+else the snapshot, so a degraded upstream costs milliseconds instead of a
+blocked worker thread, and a freshly started process still renders while
+Google is down. A snapshot's ETag is also sent on a process's first request,
+so a restart gets a 304 instead of the full body.
+
+The gspread fallbacks use the same timeouts (sheets_client.py) and go through
+the breakers with `guard()`.
+"""
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+
+import metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(BASE_DIR, "snapshots"))
+CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", 3))
+READ_TIMEOUT = float(os.environ.get("UPSTREAM_READ_TIMEOUT", 10))
+DEADLINE = float(os.environ.get("UPSTREAM_DEADLINE", 15))
+RETRIES = int(os.environ.get("UPSTREAM_RETRIES", 2))
+BACKOFF = float(os.environ.get("UPSTREAM_BACKOFF", 0.2))
+BREAKER_FAILURES = int(os.environ.get("UPSTREAM_BREAKER_FAILURES", 3))
+BREAKER_RESET = float(os.environ.get("UPSTREAM_BREAKER_RESET", 30))
+
+USER_AGENT = "bigslick-social-club/1.0"
+_CHUNK = 64 * 1024
+
+
+class CircuitOpenError(Exception):
+	"""The source's breaker is open; nothing was sent."""
+
+
+@dataclass
+class Response:
+	status: int  # 200, or 304 for a conditional request that matched
+	body: bytes
+	etag: str | None = None
+	last_modified: str | None = None
+
+
+class _ConnectTimeout:
+	# connect (and the TLS handshake) under the connect timeout, then read under the request's
+	def connect(self):
+		read_timeout = self.timeout
+		self.timeout = CONNECT_TIMEOUT
+		try:
+			super().connect()
+		finally:
+			self.timeout = read_timeout
+		self.sock.settimeout(read_timeout)
+
+
+class _HTTPConnection(_ConnectTimeout, http.client.HTTPConnection):
+	pass
+
+
+class _HTTPSConnection(_ConnectTimeout, http.client.HTTPSConnection):
+	pass
+
+
+class _HTTPHandler(urllib.request.HTTPHandler):
+	def http_open(self, req):
+		return self.do_open(_HTTPConnection, req)
+
+
+class _HTTPSHandler(urllib.request.HTTPSHandler):
+	def https_open(self, req):
+		return self.do_open(_HTTPSConnection, req, context=self._context)
+
+
+class CircuitBreaker:
+	"""Closed -> open after `failures` failures in a row -> one probe after `reset_after` s."""
+
+	CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+	def __init__(self, name: str, failures: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET):
+		self.name = name
+		self.failures = failures
+		self.reset_after = reset_after
+		self.state = self.CLOSED
+		self._failed = 0
+		self._opened_at = 0.0
+		self._lock = threading.Lock()
+
+	def allow(self) -> bool:
+		"""Whether a request may go out now; claims the probe when half-open."""
+		with self._lock:
+			if self.state == self.CLOSED:
+				return True
+			if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_after:
+				self.state = self.HALF_OPEN
+				return True
+			return False
+
+	def success(self) -> None:
+		with self._lock:
+			self.state = self.CLOSED
+			self._failed = 0
+
+	def failure(self) -> None:
+		with self._lock:
+			self._failed += 1
+			if self.state == self.HALF_OPEN or self._failed >= self.failures:
+				if self.state != self.OPEN:
+					print(f"Upstream breaker for {self.name} opened after {self._failed} failures")
+				self.state = self.OPEN
+				self._opened_at = time.monotonic()
+
+
+def _retryable(error: Exception) -> bool:
+	if isinstance(error, urllib.error.HTTPError):
+		return error.code == 429 or error.code >= 500
+	if isinstance(error, TimeoutError):
+		# a read timeout: the server is slow, a second wait would only double it
+		return False
+	# URLError (DNS, refused, reset, connect timeout), truncated reads
+	return isinstance(error, (urllib.error.URLError, ConnectionError, http.client.HTTPException))
+
+
+class Upstream:
+	"""HTTP GETs with timeouts, jittered retries, per-source breakers and on-disk snapshots."""
+
+	def __init__(self, snapshot_dir: str = SNAPSHOT_DIR):
+		self.snapshot_dir = snapshot_dir
+		self._breakers = {}
+		self._lock = threading.Lock()
+		self._counters = {"requests": 0, "retries": 0, "failures": 0, "short_circuits": 0, "snapshots_written": 0, "snapshots_read": 0}
+		self._opener = urllib.request.build_opener(_HTTPHandler(), _HTTPSHandler())
+
+	def set_handlers(self, *handlers) -> None:
+		"""Add urllib handlers to every request (e.g. a benchmark rerouting a host); none resets."""
+		self._opener = urllib.request.build_opener(_HTTPHandler(), _HTTPSHandler(), *handlers)
+
+	def breaker(self, source: str) -> CircuitBreaker:
+		with self._lock:
+			breaker = self._breakers.get(source)
+			if breaker is None:
+				breaker = self._breakers[source] = CircuitBreaker(source)
+			return breaker
+
+	def fetch(self, url: str, headers: dict | None = None) -> Response:
+		"""GET `url`; a 304 comes back as a Response, anything else non-2xx raises.
+
+		Raises CircuitOpenError at once while the URL's breaker is open.
+		"""
+		return self.guard(url, lambda: self._fetch_with_retries(url, headers or {}, time.monotonic() + DEADLINE))
+
+	def guard(self, source: str, fn):
+		"""Run `fn()` behind `source`'s breaker: fail fast while it is open, count the outcome."""
+		breaker = self.breaker(source)
+		if not breaker.allow():
+			self._count("short_circuits")
+			metrics.inc("upstream_short_circuits_total")
+			raise CircuitOpenError(f"circuit open for {source}")
+		try:
+			result = fn()
+		except Exception:
+			breaker.failure()
+			self._count("failures")
+			raise
+		breaker.success()
+		return result
+
+	def _fetch_with_retries(self, url: str, headers: dict, deadline: float) -> Response:
+		attempt = 0
+		while True:
+			try:
+				return self._request(url, headers, deadline)
+			except Exception as e:
+				if not _retryable(e) or attempt >= RETRIES:
+					raise
+				# full jitter: sessions retrying the same outage don't line up
+				delay = random.uniform(0, BACKOFF * 2 ** attempt)
+				if time.monotonic() + delay >= deadline:
+					raise
+				attempt += 1
+				self._count("retries")
+				metrics.inc("upstream_retries_total")
+				time.sleep(delay)
+
+	def _request(self, url: str, headers: dict, deadline: float) -> Response:
+		self._count("requests")
+		request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, **headers})
+		timeout = max(min(READ_TIMEOUT, deadline - time.monotonic()), 0.001)
+		try:
+			with self._opener.open(request, timeout=timeout) as response:
+				chunks = []
+				while True:
+					chunk = response.read(_CHUNK)
+					if not chunk:
+						break
+					chunks.append(chunk)
+					# a body trickling in under the read timeout still ends at the deadline
+					if time.monotonic() > deadline:
+						raise TimeoutError(f"{url} did not finish within {DEADLINE:g}s")
+				return Response(response.status, b"".join(chunks), response.headers.get("ETag"), response.headers.get("Last-Modified"))
+		except urllib.error.HTTPError as e:
+			if e.code == 304:
+				return Response(304, b"", e.headers.get("ETag"), e.headers.get("Last-Modified"))
+			raise
+
+	# last-known-good snapshots
+
+	def _snapshot_path(self, url: str) -> str:
+		return os.path.join(self.snapshot_dir, hashlib.sha1(url.encode()).hexdigest()[:20])
+
+	def save_snapshot(self, url: str, response: Response) -> None:
+		"""Keep `response` as `url`'s last-known-good body; never raises."""
+		path = self._snapshot_path(url)
+		meta = {"url": url, "etag": response.etag, "last_modified": response.last_modified, "saved_at": time.time()}
+		try:
+			os.makedirs(self.snapshot_dir, exist_ok=True)
+			# body first, then the metadata that points at it; both replaced atomically
+			for suffix, data in ((".body", response.body), (".json", json.dumps(meta).encode())):
+				tmp = f"{path}{suffix}.{os.getpid()}.{threading.get_ident()}.tmp"
+				with open(tmp, "wb") as f:
+					f.write(data)
+				os.replace(tmp, path + suffix)
+			self._count("snapshots_written")
+		except OSError as e:
+			print(f"Snapshot write for {url} failed: {e}")
+
+	def table_path(self, url: str) -> str:
+		"""Where `url`'s parsed, typed snapshot lives (see columnar.py)."""
+		return self._snapshot_path(url) + ".arrow"
+
+	def snapshot(self, url: str) -> Response | None:
+		"""`url`'s last-known-good response from disk, or None."""
+		path = self._snapshot_path(url)
+		try:
+			with open(path + ".json", encoding="utf-8") as f:
+				meta = json.load(f)
+			with open(path + ".body", "rb") as f:
+				body = f.read()
+		except (OSError, ValueError):
+			return None
+		if meta.get("url") != url:
+			return None
+		self._count("snapshots_read")
+		return Response(200, body, meta.get("etag"), meta.get("last_modified"))
+
+	def stats(self) -> dict:
+		with self._lock:
+			out = dict(self._counters)
+			breakers = dict(self._breakers)
+		out["open_breakers"] = sum(1 for b in breakers.values() if b.state != CircuitBreaker.CLOSED)
+		out["breakers"] = {source: int(b.state != CircuitBreaker.CLOSED) for source, b in breakers.items()}
+		return out
+
+	def _count(self, name: str) -> None:
+		with self._lock:
+			self._counters[name] += 1
+
+
+upstream = Upstream()
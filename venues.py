@@ -0,0 +1,306 @@
+"""Venue registry: each room's sources, and the caches that hold its data.
+
+`venues.json` (or the file at `VENUES_PATH`) lists the venues and names the
+default one; a page picks a venue with `?venue=<id>`. String values of the form
+"$NAME" are read from the environment when the file is loaded (an unset
+variable means the venue has no such source).
+
+A venue's data lives only in its `VenueState`: its own conditional fetcher,
+schedule cache, card / week / leaderboard LRUs, SQLite store, store-sync
+thread and live-feed topics (prefixed "<id>:"). What venues share holds no
+venue data (single-flight, the page-load pool, metrics), so a page for one
+venue never fetches or keeps another venue's schedule, leaderboard or jackpot.
+The default venue uses the process-wide instances (`cache.schedule_cache`,
+`sync.fetcher`, `store.get_store()`), which is what /metrics and serve.py see.
+
+`VenueRegistry` keeps the states of recently visited venues, most recent last:
+at most `VENUE_CACHE_MAX` of them and about `VENUE_CACHE_MB` of cached frames,
+boards and HTML in total (re-measured after a page load that changed them).
+Past either limit the least recently used venue is closed (its sync thread
+stops, its caches and topics are dropped) and rebuilt from its sources and its
+store file on the next visit. The default venue is never evicted.
+"""
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from cache import LRU, SWRCache, schedule_cache
+from live import hub
+from refresh import RefreshPlan
+from store import STORE_PATH, Store, StoreSync, get_store, start_sync
+from sync import ConditionalFetcher, ScheduleSync, fetch_csv, fetcher, gviz_csv_url, schedule_sync
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VENUES_PATH = os.environ.get("VENUES_PATH", os.path.join(BASE_DIR, "venues.json"))
+VENUE_CACHE_MAX = int(os.environ.get("VENUE_CACHE_MAX", 24))
+VENUE_CACHE_MB = float(os.environ.get("VENUE_CACHE_MB", 256))
+
+# per venue: two tabs x seven days x a couple of schedule versions / "today"s
+_CARDS_PER_VENUE = 64
+_BOARDS_PER_VENUE = 2
+_WEEKS_PER_VENUE = 2
+
+
+@dataclass(frozen=True)
+class Venue:
+	"""One room's configuration, as listed in venues.json."""
+
+	id: str
+	name: str
+	schedule_csv_url: str | None = None
+	local_schedule: str | None = None  # fallback file when the schedule fetch fails
+	leaderboard_sheet_id: str | None = None
+	leaderboard_tab: str = "Leaderboard"
+	jackpot_csv_url: str | None = None
+	player_counts_csv_url: str | None = None
+	form_url: str | None = None
+	store_path: str | None = None  # default: next to STORE_PATH, named after the id
+
+	@property
+	def leaderboard_csv_url(self) -> str | None:
+		return gviz_csv_url(self.leaderboard_sheet_id, self.leaderboard_tab) if self.leaderboard_sheet_id else None
+
+
+def _resolve(value):
+	if isinstance(value, str) and value.startswith("$"):
+		return os.environ.get(value[1:]) or None
+	return value
+
+
+def load_venues(path: str = VENUES_PATH) -> tuple[str, dict]:
+	"""Read the registry file; returns (default venue id, {id: Venue})."""
+	with open(path, encoding="utf-8") as f:
+		config = json.load(f)
+	known = {f.name for f in fields(Venue)}
+	venues = {}
+	for entry in config["venues"]:
+		unknown = set(entry) - known
+		if unknown:
+			raise ValueError(f"{path}: unknown keys for venue {entry.get('id')!r}: {sorted(unknown)}")
+		venue = Venue(**{k: _resolve(v) for k, v in entry.items()})
+		if venue.id in venues:
+			raise ValueError(f"{path}: duplicate venue id {venue.id!r}")
+		venues[venue.id] = venue
+	default = config.get("default") or next(iter(venues))
+	if default not in venues:
+		raise ValueError(f"{path}: default venue {default!r} is not listed")
+	return default, venues
+
+
+def approx_bytes(obj, _seen=None) -> int:
+	"""Rough deep size of cached values: frames, arrays, strings and containers of them."""
+	seen = set() if _seen is None else _seen
+	if id(obj) in seen:
+		return 0
+	seen.add(id(obj))
+	if isinstance(obj, (pd.DataFrame, pd.Series)):
+		usage = obj.memory_usage(index=True, deep=True)
+		return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+	if isinstance(obj, np.ndarray):
+		if obj.dtype == object:
+			return obj.nbytes + sum(sys.getsizeof(x) for x in obj.ravel())
+		return obj.nbytes
+	if isinstance(obj, dict):
+		return sys.getsizeof(obj) + sum(approx_bytes(k, seen) + approx_bytes(v, seen) for k, v in obj.items())
+	if isinstance(obj, (list, tuple, set, frozenset)):
+		return sys.getsizeof(obj) + sum(approx_bytes(x, seen) for x in obj)
+	if hasattr(obj, "__dict__") and not isinstance(obj, type):
+		# Leaderboard, Week, DayView
+		return sys.getsizeof(obj) + approx_bytes(vars(obj), seen)
+	return sys.getsizeof(obj)
+
+
+class VenueState:
+	"""Everything one venue keeps in memory, and its background sync."""
+
+	def __init__(self, venue: Venue, default: bool = False):
+		self.config = venue
+		self.default = default
+		if default:
+			self.fetcher = fetcher
+			self.schedule_sync = schedule_sync
+			self.schedule_cache = schedule_cache
+		else:
+			self.fetcher = ConditionalFetcher()
+			self.schedule_sync = ScheduleSync(self.fetcher)
+			self.schedule_cache = SWRCache(ttl=schedule_cache.ttl, name=f"schedule[{venue.id}]")
+		self.cards = LRU(_CARDS_PER_VENUE)
+		self.boards = LRU(_BOARDS_PER_VENUE)
+		self.weeks = LRU(_WEEKS_PER_VENUE)
+		# refresh timing from the schedule this venue has loaded (see refresh.py)
+		schedule_url = venue.schedule_csv_url
+		self.plan = RefreshPlan(lambda: self.schedule_cache.peek(schedule_url) if schedule_url else None)
+		self.prefix = "" if default else f"{venue.id}:"
+		self.bytes = 0
+		self.closed = False
+		self._store = None
+		self._sync = None
+		self._measured = None
+		self._lock = threading.Lock()
+
+	@property
+	def id(self) -> str:
+		return self.config.id
+
+	def topic(self, name: str) -> str:
+		"""This venue's live-feed topic (see live.py)."""
+		return self.prefix + name
+
+	def fetch_csv(self, url: str) -> pd.DataFrame:
+		return fetch_csv(url, self.fetcher)
+
+	def store(self) -> Store:
+		"""This venue's SQLite store, opened on first use."""
+		if self.default:
+			return get_store()
+		with self._lock:
+			if self._store is None:
+				root, ext = os.path.splitext(STORE_PATH)
+				self._store = Store(self.config.store_path or f"{root}-{self.id}{ext}", import_legacy=False)
+			return self._store
+
+	def fetch_leaderboard_csv(self) -> pd.DataFrame | None:
+		"""The leaderboard tab's CSV export, or None when the venue has no leaderboard."""
+		url = self.config.leaderboard_csv_url
+		return self.fetch_csv(url) if url else None
+
+	def read_leaderboard_csv(self) -> pd.DataFrame:
+		"""A page's copy of the leaderboard: the background pull's while it is fresh, else fetched now."""
+		url = self.config.leaderboard_csv_url
+		return self.plan.read("leaderboard", lambda: self.fetch_csv(url), lambda: self.fetcher.cached(url))
+
+	def start_sync(self) -> StoreSync:
+		"""Start this venue's background pull (jackpot, player counts, leaderboard) once."""
+		jobs = {"leaderboard": self.fetch_leaderboard_csv} if self.config.leaderboard_csv_url else {}
+		if self.default:
+			return start_sync(self.config.jackpot_csv_url, self.config.player_counts_csv_url, self.plan, jobs)
+		store = self.store()
+		with self._lock:
+			if self._sync is None and not self.closed:
+				self._sync = StoreSync(
+					store, self.config.jackpot_csv_url, self.config.player_counts_csv_url,
+					float(os.environ.get("STORE_SYNC_INTERVAL", 15)), self.fetcher, self.prefix, self.plan, jobs,
+				).start()
+			return self._sync
+
+	def measure(self) -> int:
+		"""Re-measure the cached data if anything was fetched or built since last time."""
+		marker = (
+			self.fetcher.stats()["changed"],
+			self.schedule_cache.stats()["entries"],
+			self.cards.stats()["stores"],
+			self.boards.stats()["stores"],
+			self.weeks.stats()["stores"],
+		)
+		if marker != self._measured:
+			values = [
+				*self.schedule_cache.values(),
+				*self.fetcher.values(),
+				*self.schedule_sync.values(),
+				*self.cards.values(),
+				*self.boards.values(),
+				*self.weeks.values(),
+			]
+			self.bytes = approx_bytes(values)
+			self._measured = marker
+		return self.bytes
+
+	def close(self) -> None:
+		"""Stop the sync thread and drop every cached value (eviction)."""
+		with self._lock:
+			self.closed = True
+			if self._sync is not None:
+				self._sync.stop()
+				self._sync = None
+			self._store = None
+		self.schedule_cache.invalidate()
+		self.cards.clear()
+		self.boards.clear()
+		self.weeks.clear()
+		hub.drop(self.prefix)
+		self.bytes = 0
+		print(f"Venue {self.id}: evicted")
+
+
+class VenueRegistry:
+	"""The configured venues and an LRU of their states, bounded by count and bytes."""
+
+	def __init__(self, path: str = VENUES_PATH, max_active: int = VENUE_CACHE_MAX, max_bytes: float = VENUE_CACHE_MB * 2**20):
+		self.path = path
+		self.default_id, self.venues = load_venues(path)
+		self.max_active = max(1, max_active)
+		self.max_bytes = max_bytes
+		self._states = OrderedDict()  # id -> VenueState, least recently used first
+		self._lock = threading.Lock()
+		self._counters = {"opened": 0, "evicted": 0}
+
+	def venue(self, venue_id: str | None = None) -> Venue:
+		"""The configured venue (default when `venue_id` is None); KeyError if unknown."""
+		return self.venues[venue_id or self.default_id]
+
+	def get(self, venue_id: str | None = None) -> VenueState:
+		"""The venue's state, opened on first use and marked most recently used."""
+		venue = self.venue(venue_id)
+		with self._lock:
+			state = self._states.get(venue.id)
+			if state is not None:
+				self._states.move_to_end(venue.id)
+				return state
+			state = VenueState(venue, default=venue.id == self.default_id)
+			self._states[venue.id] = state
+			self._counters["opened"] += 1
+			evicted = self._evict(keep=venue.id)
+		for old in evicted:
+			old.close()
+		return state
+
+	def account(self, state: VenueState) -> None:
+		"""Re-measure `state` after its page loaded and evict others past the byte budget."""
+		state.measure()
+		with self._lock:
+			evicted = self._evict(keep=state.id)
+		for old in evicted:
+			old.close()
+
+	def _evict(self, keep: str) -> list:
+		evicted = []
+		for venue_id in list(self._states):
+			total = sum(s.bytes for s in self._states.values())
+			if len(self._states) <= self.max_active and total <= self.max_bytes:
+				break
+			if venue_id in (keep, self.default_id):
+				continue
+			evicted.append(self._states.pop(venue_id))
+			self._counters["evicted"] += 1
+		return evicted
+
+	def stats(self) -> dict:
+		with self._lock:
+			states = list(self._states.values())
+			out = dict(self._counters)
+		out.update(
+			configured=len(self.venues),
+			active=len(states),
+			bytes=sum(s.bytes for s in states),
+			venue_bytes={s.id: s.bytes for s in states},
+		)
+		return out
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> VenueRegistry:
+	"""Return the process-wide registry, loading venues.json on first use."""
+	global _registry
+	with _registry_lock:
+		if _registry is None:
+			_registry = VenueRegistry()
+		return _registry
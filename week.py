@@ -0,0 +1,122 @@
+"""Precomputed week model behind the Home and Poker Schedule tabs.
+
+Every rerun used to re-derive the same things from the schedule frame: weekday
+order through a per-row lookup, a string sort on start times, a regroup by day,
+this week's dates from UTC and the date labels of every expander and card.
+`get_week(df)` does all of it once per schedule version and ISO week and returns
+an immutable `Week` the tabs read directly:
+
+- days are ordered by a categorical Monday..Sunday and rows by their parsed
+  start time (the schedule's typed `start_minutes`), so "9:00" sorts before "10:00";
+- dates are resolved in the club's timezone (`CLUB_TIMEZONE`, default
+  America/New_York), so "today" flips at local midnight, not UTC midnight;
+- every day carries a content key, so the card cache (cards.py) needs no
+  per-rerun hashing.
+
+Today's weekday is looked up on the cached week, so midnight needs no rebuild;
+a new ISO week or a changed schedule does.
+"""
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from cache import LRU
+from cards import rows_hash
+from singleflight import flights
+
+DAYS_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+TIMEZONE = ZoneInfo(os.environ.get("CLUB_TIMEZONE", "America/New_York"))
+
+_MAX_WEEKS = 4
+_weeks = LRU(_MAX_WEEKS)
+
+
+def local_now() -> datetime:
+	return datetime.now(TIMEZONE)
+
+
+@dataclass(frozen=True)
+class DayView:
+	"""One weekday of the schedule, ready to render."""
+
+	name: str
+	date: date
+	long_date: str  # "October 13, 2026" (Poker Schedule cards)
+	label: str  # "Mon, Oct 13 - <tournament names>" (Home expander)
+	rows: pd.DataFrame  # that day's rows sorted by start time; treat as read-only
+	rows_key: str  # content hash of `rows`, the card cache key
+
+
+@dataclass(frozen=True)
+class Week:
+	version: str
+	iso_week: tuple  # (ISO year, ISO week number)
+	monday: date
+	days: tuple  # DayView, Monday first, only days that have tournaments
+
+	def today_name(self, now: datetime | None = None) -> str:
+		return (now or local_now()).strftime("%A")
+
+
+def schedule_version(df: pd.DataFrame) -> str:
+	"""The frame's content version: set by sync.ScheduleSync, else hashed here."""
+	return df.attrs.get("version") or rows_hash(df)
+
+
+def _start_minutes(frame: pd.DataFrame) -> pd.Series:
+	if "start_minutes" in frame:
+		# parsed once per row when the schedule was normalized; -1 is "not a time"
+		return frame["start_minutes"].where(frame["start_minutes"] >= 0)
+	parsed = pd.to_datetime(frame["time"].astype(str).str.strip(), format="mixed", errors="coerce")
+	return parsed.dt.hour * 60 + parsed.dt.minute
+
+
+def build_week(df: pd.DataFrame, version: str, today: date) -> Week:
+	iso_year, iso_week, _ = today.isocalendar()
+	monday = today - timedelta(days=today.weekday())
+	frame = df.copy()
+	frame["day"] = frame["day"].astype(str)
+	order = pd.Categorical(frame["day"], categories=DAYS_ORDER, ordered=True)
+	frame = (
+		frame.assign(_day=order, _start=_start_minutes(frame))
+		.dropna(subset=["_day"])
+		.sort_values(["_day", "_start", "time"], kind="stable", na_position="last")
+	)
+	days = []
+	for offset, name in enumerate(DAYS_ORDER):
+		rows = frame[frame["_day"] == name].drop(columns=["_day", "_start"])
+		if rows.empty:
+			continue
+		day_date = monday + timedelta(days=offset)
+		names = ", ".join(n for n in rows["notes"].astype(str) if n != "nan" and n.strip())
+		short_date = f"{name[:3]}, {day_date.strftime('%b')} {day_date.day:02d}"
+		days.append(DayView(
+			name=name,
+			date=day_date,
+			long_date=day_date.strftime("%B %d, %Y"),
+			label=f"{short_date} - {names or 'Tournament'}",
+			rows=rows,
+			rows_key=rows_hash(rows),
+		))
+	return Week(version=version, iso_week=(iso_year, iso_week), monday=monday, days=tuple(days))
+
+
+def get_week(df: pd.DataFrame, now: datetime | None = None, weeks: LRU | None = None) -> Week:
+	"""The `Week` for this schedule and the current local ISO week, built once.
+
+	`weeks` is the LRU to keep it in (a venue's own, see venues.py); default the module's.
+	"""
+	weeks = _weeks if weeks is None else weeks
+	today = (now or local_now()).date()
+	version = schedule_version(df)
+	key = (version, *today.isocalendar()[:2])
+	week = weeks.get(key)
+	if week is not None:
+		return week
+	# sessions that miss together build it once
+	week = flights.do(("week", *key), lambda: build_week(df, version, today))
+	weeks.put(key, week)
+	return week